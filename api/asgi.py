@@ -0,0 +1,16 @@
+import sys
+import os
+from pathlib import Path
+
+# Add the project directory to the Python path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+# Set Django settings module
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pw_merchants.settings')
+
+# Serves the /api/live/ event stream (see vercel.json); every other path
+# goes through api/wsgi.py
+from django.core.asgi import get_asgi_application
+
+app = get_asgi_application()
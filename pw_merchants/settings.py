@@ -98,6 +98,31 @@ else:
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# The in-process default is per worker; point CACHE_BACKEND/CACHE_LOCATION at a
+# shared store (e.g. the database cache) when running several workers.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='pw-merchants'),
+    }
+}
+
+# Cached home/events listings: how long a rendering lives, and how stale the
+# ticket figures on it may get after a sale (event edits show up at once)
+EVENT_LISTING_CACHE_TTL = config('EVENT_LISTING_CACHE_TTL', default=300, cast=int)
+EVENT_LISTING_INVENTORY_TTL = config('EVENT_LISTING_INVENTORY_TTL', default=5, cast=int)
+
+# Seconds the staff dashboard's headline figures (/api/dashboard/summary/) are cached
+DASHBOARD_SUMMARY_TTL = config('DASHBOARD_SUMMARY_TTL', default=10, cast=int)
+
+# Bookings (pending, confirmed or completed) a day can take, and seconds the
+# month availability calendar (/api/availability/) is cached
+BOOKINGS_PER_DAY = config('BOOKINGS_PER_DAY', default=2, cast=int)
+AVAILABILITY_CACHE_TTL = config('AVAILABILITY_CACHE_TTL', default=60, cast=int)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -151,6 +176,50 @@ else:
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Rendered ticket PDF cache (in-process LRU size and on-disk store)
+TICKET_PDF_CACHE_SIZE = config('TICKET_PDF_CACHE_SIZE', default=128, cast=int)
+TICKET_PDF_CACHE_DIR = config('TICKET_PDF_CACHE_DIR', default='')
+# Bounds applied to that disk store by `manage.py prune_ticket_pdf_cache`
+TICKET_PDF_CACHE_MAX_AGE_DAYS = config('TICKET_PDF_CACHE_MAX_AGE_DAYS', default=30, cast=int)
+TICKET_PDF_CACHE_MAX_MB = config('TICKET_PDF_CACHE_MAX_MB', default=512, cast=int)
+# Worker processes for ZIP exports run by `manage.py export_event_tickets`
+# (0 = one per CPU, 1 = no pool); web exports always render in-process
+TICKET_EXPORT_WORKERS = config('TICKET_EXPORT_WORKERS', default=0, cast=int)
+# Largest single-PDF export the web endpoint builds; the whole document is
+# held until it is saved, so bigger exports must use format=zip or the command
+TICKET_EXPORT_PDF_MAX_TICKETS = config('TICKET_EXPORT_PDF_MAX_TICKETS', default=500, cast=int)
+
+# Key for signing ticket QR payloads (defaults to one derived from SECRET_KEY).
+# Gate devices that validate QR codes offline must be configured with it.
+TICKET_SIGNING_KEY = config('TICKET_SIGNING_KEY', default='')
+
+# Seconds a ticket hold keeps stock reserved while the Paystack popup is open
+TICKET_HOLD_TTL = config('TICKET_HOLD_TTL', default=600, cast=int)
+
+# Most tickets one order (and so one hold) may take
+TICKET_MAX_PER_ORDER = config('TICKET_MAX_PER_ORDER', default=20, cast=int)
+
+# Unexpired holds one IP address may keep open at once. Buyers behind a
+# shared mobile carrier address count together, so keep it generous.
+TICKET_HOLDS_PER_CLIENT = config('TICKET_HOLDS_PER_CLIENT', default=10, cast=int)
+
+# Days deletions are remembered for dashboard delta syncs; a dashboard idle
+# for longer reloads its lists in full
+SYNC_TOMBSTONE_DAYS = config('SYNC_TOMBSTONE_DAYS', default=30, cast=int)
+
+# Live updates (/api/live/): how often each open stream checks the cache for
+# new messages, how long a stream lasts before the browser reconnects, and
+# how long a message stays available for reconnecting browsers to replay
+LIVE_POLL_SECONDS = config('LIVE_POLL_SECONDS', default=1, cast=float)
+LIVE_STREAM_SECONDS = config('LIVE_STREAM_SECONDS', default=300, cast=int)
+LIVE_MESSAGE_TTL = config('LIVE_MESSAGE_TTL', default=120, cast=int)
+
+# Idempotency-Key handling for the write endpoints: how long a stored response
+# is replayed for, and how long an unfinished first attempt holds its key
+# before a retry may take it over
+IDEMPOTENCY_KEY_HOURS = config('IDEMPOTENCY_KEY_HOURS', default=24, cast=int)
+IDEMPOTENCY_LOCK_SECONDS = config('IDEMPOTENCY_LOCK_SECONDS', default=60, cast=int)
+
 # Third-party API keys
 PAYSTACK_PUBLIC_KEY = config('PAYSTACK_PUBLIC_KEY', default='')
 PAYSTACK_SECRET_KEY = config('PAYSTACK_SECRET_KEY', default='')
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Event, Booking, Ticket, Payment, Inquiry
+from .models import Event, Booking, Ticket, Payment, Inquiry, TicketInventory, TicketHold, DailySalesRollup, BookingDay
 
 
 @admin.register(Event)
@@ -7,7 +7,12 @@ class EventAdmin(admin.ModelAdmin):
     list_display = ['name', 'event_type', 'date', 'location', 'tickets_sold', 'tickets_available', 'is_active']
     list_filter = ['event_type', 'is_active', 'date']
     search_fields = ['name', 'location', 'description']
-    readonly_fields = ['id', 'created_at', 'updated_at', 'tickets_sold', 'tickets_available']
+    readonly_fields = ['id', 'created_at', 'updated_at', 'tickets_sold', 'tickets_available',
+                       'issued_quantity', 'sold_quantity', 'verified_quantity', 'revenue']
+
+    def get_queryset(self, request):
+        # Load the sold/available figures for the whole page in one go
+        return super().get_queryset(request).with_inventory()
     fieldsets = (
         ('Basic Information', {
             'fields': ('name', 'description', 'event_type', 'featured_image')
@@ -16,7 +21,8 @@ class EventAdmin(admin.ModelAdmin):
             'fields': ('date', 'location', 'max_capacity', 'price_per_ticket', 'is_active')
         }),
         ('Statistics', {
-            'fields': ('tickets_sold', 'tickets_available'),
+            'fields': ('tickets_sold', 'tickets_available', 'issued_quantity', 'sold_quantity',
+                       'verified_quantity', 'revenue'),
             'classes': ('collapse',)
         }),
         ('Timestamps', {
@@ -26,6 +32,32 @@ class EventAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(TicketInventory)
+class TicketInventoryAdmin(admin.ModelAdmin):
+    list_display = ['event', 'ticket_type', 'price_per_ticket', 'total_quantity', 'remaining_quantity']
+    list_filter = ['ticket_type', 'event']
+    readonly_fields = ['id', 'created_at', 'updated_at']
+
+
+@admin.register(TicketHold)
+class TicketHoldAdmin(admin.ModelAdmin):
+    list_display = ['inventory', 'quantity', 'expires_at', 'created_at']
+    readonly_fields = ['id', 'inventory', 'quantity', 'expires_at', 'created_at']
+
+
+@admin.register(DailySalesRollup)
+class DailySalesRollupAdmin(admin.ModelAdmin):
+    list_display = ['event', 'day', 'ticket_type', 'tickets_sold', 'quantity_sold', 'revenue', 'checkins']
+    list_filter = ['ticket_type', 'day']
+    readonly_fields = ['event', 'day', 'ticket_type', 'tickets_sold', 'quantity_sold', 'revenue', 'checkins']
+
+
+@admin.register(BookingDay)
+class BookingDayAdmin(admin.ModelAdmin):
+    list_display = ['day', 'booked']
+    readonly_fields = ['day', 'booked']
+
+
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
     list_display = ['quote_id', 'client_name', 'event_type', 'event_date', 'guests', 'total', 'status']
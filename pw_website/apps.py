@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PwWebsiteConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pw_website'
+
+    def ready(self):
+        from . import signals  # noqa: F401
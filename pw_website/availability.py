@@ -0,0 +1,133 @@
+"""Which days are free for new bookings, a month at a time.
+
+A day is unavailable when it is today or in the past, when an active event
+is scheduled on it, or when it already holds ``BOOKINGS_PER_DAY`` bookings
+that are pending, confirmed or completed. Those bookings are counted in
+``BookingDay`` rows, the same counters Booking.save checks the cap against,
+so the page and the insert agree. A month is answered with one range query
+over BookingDay and one grouped query over Event; both filter with plain
+ranges on the stored column, so their indexes stay usable. The answer
+is cached for ``AVAILABILITY_CACHE_TTL`` seconds and dropped as soon as a
+booking or event in that month changes (see signals).
+"""
+import calendar
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import BookingDay, Event
+
+
+MESSAGES = {
+    None: '{day} is available for booking!',
+    'past': 'Please select a future date',
+    'busy': 'We are currently busy for {day}. Please try another day.',
+}
+
+
+def _cache_key(year, month):
+    return f'pw:availability:{year:04d}-{month:02d}'
+
+
+# Calendar years that can be asked about; far years would overflow the
+# month's end date (9999-12) and are of no use for bookings anyway
+MIN_YEAR, MAX_YEAR = 2000, 2100
+
+
+def parse_month(value):
+    """``YYYY-MM`` as ``(year, month)``; raises ValueError otherwise"""
+    try:
+        year, month = (int(part) for part in value.split('-'))
+        date(year, month, 1)
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError('month must be YYYY-MM')
+    _check_year(year)
+    return year, month
+
+
+def _check_year(year):
+    if not MIN_YEAR <= year <= MAX_YEAR:
+        raise ValueError(f'Dates must be between {MIN_YEAR} and {MAX_YEAR}')
+
+
+def _month_bounds(year, month):
+    first = date(year, month, 1)
+    return first, first + timedelta(days=calendar.monthrange(year, month)[1])
+
+
+def _build_month(year, month):
+    first, after = _month_bounds(year, month)
+    bookings = dict(
+        BookingDay.objects.filter(day__gte=first, day__lt=after, booked__gt=0)
+        .order_by().values_list('day', 'booked')
+    )
+    tz = timezone.get_current_timezone()
+    events = dict(
+        Event.objects.filter(
+            is_active=True,
+            date__gte=timezone.make_aware(datetime.combine(first, time.min), tz),
+            date__lt=timezone.make_aware(datetime.combine(after, time.min), tz),
+        )
+        .annotate(day=TruncDate('date', tzinfo=tz))
+        .values('day').annotate(count=Count('id')).order_by()
+        .values_list('day', 'count')
+    )
+    return {'bookings': bookings, 'events': events}
+
+
+def _month_counts(year, month):
+    key = _cache_key(year, month)
+    counts = cache.get(key)
+    if counts is None:
+        counts = _build_month(year, month)
+        cache.set(key, counts, settings.AVAILABILITY_CACHE_TTL)
+    return counts
+
+
+def _reason(day, today, counts):
+    if day <= today:
+        return 'past'
+    if counts['events'].get(day) or counts['bookings'].get(day, 0) >= settings.BOOKINGS_PER_DAY:
+        return 'busy'
+    return None
+
+
+def month_availability(year, month):
+    """Every day of the month as ``{'date', 'available', 'reason'}`` (reason: None, past or busy)"""
+    first, after = _month_bounds(year, month)
+    counts = _month_counts(year, month)
+    today = timezone.localdate()
+    days = []
+    day = first
+    while day < after:
+        reason = _reason(day, today, counts)
+        days.append({'date': day.isoformat(), 'available': reason is None, 'reason': reason})
+        day += timedelta(days=1)
+    return days
+
+
+def day_availability(day):
+    """``(available, message)`` for one date, read from its month's cached counts.
+
+    Raises ValueError for a date outside MIN_YEAR..MAX_YEAR.
+    """
+    _check_year(day.year)
+    reason = _reason(day, timezone.localdate(), _month_counts(day.year, day.month))
+    return reason is None, MESSAGES[reason].format(day=day.strftime('%B %d, %Y'))
+
+
+def invalidate_availability(day):
+    """Forget the cached month holding ``day`` (a date, datetime or ISO string)"""
+    if isinstance(day, str):
+        try:
+            day = date.fromisoformat(day[:10])
+        except ValueError:
+            return
+    if isinstance(day, datetime):
+        day = timezone.localdate(day) if timezone.is_aware(day) else day.date()
+    if isinstance(day, date):
+        cache.delete(_cache_key(day.year, day.month))
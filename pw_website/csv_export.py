@@ -0,0 +1,181 @@
+"""Streaming CSV exports of tickets, payments and bookings for accounting.
+
+Rows are read with ``.values_list()`` through ``QuerySet.iterator(chunk_size=...)``
+(a server-side cursor on PostgreSQL) and written one line at a time, so the
+staff endpoint and the ``export_csv`` management command use the same small
+amount of memory for ten rows or a million.
+"""
+import csv
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from .models import Booking, Payment, Ticket
+
+
+CSV_CHUNK_SIZE = 2000
+
+
+class ExportSpec:
+    """What one export reads: base queryset, columns and the fields its filters use"""
+
+    def __init__(self, queryset, columns, date_field, statuses, event_field=None):
+        self.queryset = queryset
+        self.columns = columns
+        self.date_field = date_field
+        # status name -> filter kwargs
+        self.statuses = statuses
+        self.event_field = event_field
+
+
+def _status_choices(choices):
+    return {value: {'status': value} for value, _ in choices}
+
+
+EXPORTS = {
+    'tickets': ExportSpec(
+        Ticket.objects.all(),
+        [
+            ('ticket_id', 'ticket_id'),
+            ('event', 'event__name'),
+            ('event_date', 'event__date'),
+            ('ticket_type', 'ticket_type'),
+            ('quantity', 'quantity'),
+            ('price_per_ticket', 'price_per_ticket'),
+            ('amount_paid', 'amount_paid'),
+            ('customer_name', 'customer_name'),
+            ('customer_email', 'customer_email'),
+            ('phone', 'phone'),
+            ('order_reference', 'order_reference'),
+            ('purchase_date', 'purchase_date'),
+            ('verified', 'verified'),
+            ('verified_at', 'verified_at'),
+            ('verified_by', 'verified_by'),
+        ],
+        date_field='purchase_date',
+        statuses={
+            'verified': {'verified': True},
+            'unverified': {'verified': False},
+            'sold': {'customer_name__gt': ''},
+            'unsold': {'customer_name': ''},
+        },
+        event_field='event_id',
+    ),
+    'payments': ExportSpec(
+        Payment.objects.all(),
+        [
+            ('payment_id', 'id'),
+            ('transaction_reference', 'transaction_reference'),
+            ('payment_date', 'payment_date'),
+            ('status', 'status'),
+            ('payment_method', 'payment_method'),
+            ('amount', 'amount'),
+            ('payer_name', 'payer_name'),
+            ('phone', 'phone'),
+            ('email', 'email'),
+            ('ticket_id', 'ticket__ticket_id'),
+            ('event', 'ticket__event__name'),
+            ('booking_quote_id', 'booking__quote_id'),
+            ('notes', 'notes'),
+        ],
+        date_field='payment_date',
+        statuses=_status_choices(Payment.PAYMENT_STATUS),
+        event_field='ticket__event_id',
+    ),
+    'bookings': ExportSpec(
+        Booking.objects.all(),
+        [
+            ('quote_id', 'quote_id'),
+            ('status', 'status'),
+            ('client_name', 'client_name'),
+            ('phone', 'phone'),
+            ('email', 'email'),
+            ('event_type', 'event_type'),
+            ('event_date', 'event_date'),
+            ('venue', 'venue'),
+            ('guests', 'guests'),
+            ('package_type', 'package_type'),
+            ('subtotal', 'subtotal'),
+            ('delivery_cost', 'delivery_cost'),
+            ('tax', 'tax'),
+            ('total', 'total'),
+            ('deposit_required', 'deposit_required'),
+            ('created_at', 'created_at'),
+        ],
+        date_field='event_date',
+        statuses=_status_choices(Booking.BOOKING_STATUS),
+    ),
+}
+
+
+def _date_bound(spec, day):
+    """``day`` as a value comparable with the export's date field (midnight for datetimes)"""
+    field = spec.queryset.model._meta.get_field(spec.date_field)
+    if field.get_internal_type() == 'DateTimeField':
+        return timezone.make_aware(datetime.combine(day, time.min))
+    return day
+
+
+def export_rows(kind, event_id=None, date_from=None, date_to=None, status=None):
+    """The ``.values_list()`` rows of an export, oldest first; raises ValueError on bad filters.
+
+    ``date_from`` and ``date_to`` are inclusive dates. They are turned into a
+    plain range on the date field, so the filter can use its index.
+    """
+    spec = EXPORTS.get(kind)
+    if spec is None:
+        raise ValueError(f"Unknown export '{kind}'. Choose from: {', '.join(EXPORTS)}")
+
+    rows = spec.queryset
+    if event_id:
+        if not spec.event_field:
+            raise ValueError(f"{kind} can't be filtered by event")
+        rows = rows.filter(**{spec.event_field: event_id})
+    if date_from:
+        rows = rows.filter(**{f'{spec.date_field}__gte': _date_bound(spec, date_from)})
+    if date_to:
+        rows = rows.filter(**{f'{spec.date_field}__lt': _date_bound(spec, date_to + timedelta(days=1))})
+    if status:
+        if status not in spec.statuses:
+            raise ValueError(f"status must be one of: {', '.join(spec.statuses)}")
+        rows = rows.filter(**spec.statuses[status])
+
+    return rows.order_by(spec.date_field, 'id').values_list(*(lookup for _, lookup in spec.columns))
+
+
+# Spreadsheets run text cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return f'{value:.2f}'
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Customer-typed text (names, notes) must open as text, not a formula
+        return "'" + value
+    return value
+
+
+class _Echo:
+    """File-like object whose write() hands the line straight back to the caller"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(kind, rows):
+    """Yield the export as CSV text, header first, one line per row"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow([header for header, _ in EXPORTS[kind].columns])
+    for row in rows.iterator(chunk_size=CSV_CHUNK_SIZE):
+        yield writer.writerow([_cell(value) for value in row])
+
+
+def parse_date(value):
+    """``YYYY-MM-DD`` as a date, None when blank; raises ValueError otherwise"""
+    return date.fromisoformat(value) if value else None
@@ -0,0 +1,119 @@
+"""Headline figures for the staff dashboard in one cached payload.
+
+Each table is read once: bookings, tickets and payments with a single
+conditional aggregate (``Count``/``Sum`` with ``filter=``) each, and events
+with one ``.values()`` query over their ticket counters that gives both the
+per-event breakdown and the event totals. The result is cached for
+``DASHBOARD_SUMMARY_TTL`` seconds, so dashboards refreshing together share
+one computation.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import Booking, Event, Payment, Ticket
+
+
+CACHE_KEY = 'pw:dashboard:summary'
+
+
+def _by_status(choices, prefix, aggregate, field):
+    """One conditional aggregate per status choice, named ``{prefix}_{status}``"""
+    return {f'{prefix}_{value}': aggregate(field, filter=Q(status=value)) for value, _ in choices}
+
+
+def _split(stats, prefix, choices):
+    return {value: stats[f'{prefix}_{value}'] or 0 for value, _ in choices}
+
+
+def _booking_summary():
+    stats = Booking.objects.order_by().aggregate(
+        bookings=Count('id'),
+        total_value=Sum('total'),
+        **_by_status(Booking.BOOKING_STATUS, 'count', Count, 'id'),
+    )
+    return {
+        'total': stats['bookings'],
+        'total_value': float(stats['total_value'] or 0),
+        'by_status': _split(stats, 'count', Booking.BOOKING_STATUS),
+    }
+
+
+def _ticket_summary():
+    return Ticket.objects.order_by().aggregate(
+        total=Count('id'),
+        sold=Count('id', filter=~Q(customer_name='')),
+        unsold=Count('id', filter=Q(customer_name='')),
+        verified=Count('id', filter=Q(verified=True)),
+    )
+
+
+def _payment_summary():
+    stats = Payment.objects.order_by().aggregate(
+        total=Count('id'),
+        **_by_status(Payment.PAYMENT_STATUS, 'count', Count, 'id'),
+        **_by_status(Payment.PAYMENT_STATUS, 'amount', Sum, 'amount'),
+    )
+    return {
+        'total': stats['total'],
+        'by_status': _split(stats, 'count', Payment.PAYMENT_STATUS),
+        'amount_by_status': {
+            value: float(amount) for value, amount in _split(stats, 'amount', Payment.PAYMENT_STATUS).items()
+        },
+    }
+
+
+def _event_summary(now):
+    rows = Event.objects.values(
+        'id', 'name', 'date', 'is_active', 'max_capacity',
+        'issued_quantity', 'sold_quantity', 'verified_quantity', 'revenue',
+    )
+    breakdown = []
+    totals = {'total': 0, 'upcoming': 0, 'active': 0, 'tickets_issued': 0,
+              'tickets_sold': 0, 'tickets_verified': 0, 'ticket_revenue': 0.0}
+    for row in rows:
+        upcoming = row['date'] >= now
+        revenue = float(row['revenue'])
+        totals['total'] += 1
+        totals['upcoming'] += upcoming
+        totals['active'] += row['is_active']
+        totals['tickets_issued'] += row['issued_quantity']
+        totals['tickets_sold'] += row['sold_quantity']
+        totals['tickets_verified'] += row['verified_quantity']
+        totals['ticket_revenue'] += revenue
+        breakdown.append({
+            'id': str(row['id']),
+            'name': row['name'],
+            'date': row['date'].isoformat(),
+            'upcoming': upcoming,
+            'max_capacity': row['max_capacity'],
+            'tickets_issued': row['issued_quantity'],
+            'tickets_sold': row['sold_quantity'],
+            'tickets_verified': row['verified_quantity'],
+            'revenue': revenue,
+        })
+    return totals, breakdown
+
+
+def build_summary():
+    """Compute the summary (four queries, one per table)"""
+    now = timezone.now()
+    event_totals, breakdown = _event_summary(now)
+    return {
+        'generated_at': now.isoformat(),
+        'bookings': _booking_summary(),
+        'events': event_totals,
+        'tickets': _ticket_summary(),
+        'payments': _payment_summary(),
+        'per_event': breakdown,
+    }
+
+
+def dashboard_summary():
+    """The summary, recomputed at most once per DASHBOARD_SUMMARY_TTL"""
+    summary = cache.get(CACHE_KEY)
+    if summary is None:
+        summary = build_summary()
+        cache.set(CACHE_KEY, summary, settings.DASHBOARD_SUMMARY_TTL)
+    return summary
@@ -0,0 +1,93 @@
+"""Delta sync for the staff dashboard.
+
+The dashboard loads each list once, then polls ``/api/sync/?since=<token>``
+for the events, tickets, bookings and payments created or changed since the
+token was issued (by their indexed ``updated_at``) and for the ids deleted
+since then (``Tombstone`` rows written by a post_delete signal). Each answer
+carries the token for the next poll.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from .list_fields import BOOKING_FIELDS, EVENT_FIELDS, PAYMENT_FIELDS, TICKET_FIELDS, event_values, field_lookups
+from .models import Booking, Event, Payment, Ticket, Tombstone
+
+
+# updated_at is stamped when a row is saved but the row only shows up once its
+# transaction commits. Re-reading this far behind the token picks up writes
+# that were still in flight at the previous poll; clients apply rows as
+# upserts, so seeing one twice is harmless.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+SYNC_SOURCES = {
+    'events': (Event, EVENT_FIELDS),
+    'tickets': (Ticket, TICKET_FIELDS),
+    'bookings': (Booking, BOOKING_FIELDS),
+    'payments': (Payment, PAYMENT_FIELDS),
+}
+
+
+def _changed_rows(model, spec, since):
+    lookups = field_lookups(spec, spec)
+    if model is Event:
+        # Ticket sales and deletes move tickets_available and the lowest price
+        # (a ticket delete touches its event, see signals.touch_event_on_ticket_delete)
+        events = Event.objects.filter(
+            Q(updated_at__gte=since) | Q(pk__in=Ticket.objects.filter(updated_at__gte=since).values('event_id'))
+        )
+        return event_values(events.order_by(), lookups)
+    return model.objects.filter(updated_at__gte=since).order_by().values(*lookups)
+
+
+def encode_token(moment):
+    return urlsafe_base64_encode(moment.isoformat().encode('utf-8'))
+
+
+def decode_token(token):
+    """The moment a sync token was issued; raises ValueError for anything else"""
+    try:
+        moment = datetime.fromisoformat(urlsafe_base64_decode(token).decode('utf-8'))
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid sync token')
+    if timezone.is_naive(moment):
+        raise ValueError('Invalid sync token')
+    return moment
+
+
+def changes_since(since):
+    """Rows changed and ids deleted since ``since`` (a decoded token), plus the next token.
+
+    ``since=None``, or a token older than the tombstones we keep, answers
+    ``reset: true`` and no rows: the client has to reload its lists in full.
+    """
+    now = timezone.now()
+    payload = {'token': encode_token(now)}
+    if since is None or since < now - timedelta(days=settings.SYNC_TOMBSTONE_DAYS):
+        payload['reset'] = True
+        return payload
+
+    since -= SYNC_OVERLAP
+    payload['reset'] = False
+    deleted = {key: [] for key in SYNC_SOURCES}
+    kinds = {model._meta.model_name: key for key, (model, _) in SYNC_SOURCES.items()}
+    tombstones = Tombstone.objects.filter(deleted_at__gte=since).values_list('model', 'object_id')
+    for model_name, object_id in tombstones:
+        if model_name in kinds:
+            deleted[kinds[model_name]].append(str(object_id))
+
+    for key, (model, spec) in SYNC_SOURCES.items():
+        rows = _changed_rows(model, spec, since)
+        payload[key] = [{name: field.value(row) for name, field in spec.items()} for row in rows]
+    payload['deleted'] = deleted
+    return payload
+
+
+def prune_tombstones(now=None):
+    """Delete tombstones no token can still ask for; returns how many went"""
+    cutoff = (now or timezone.now()) - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+    return Tombstone.objects.filter(deleted_at__lt=cutoff).delete()[0]
@@ -0,0 +1,155 @@
+"""Offline gate support: ticket manifests and bulk upload of offline scans.
+
+Scanners download a compact manifest for one event, validate codes locally
+while the WiFi is down and later upload the scans they accepted. Ticket codes
+are never shipped in clear: each is hashed with a per-event salt, and the
+scanner hashes what it reads the same way before looking it up.
+"""
+import hashlib
+import hmac
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Ticket
+from .ticket_payload import InvalidTicketPayload, resolve_scanned_code
+
+
+MANIFEST_FORMAT = 1
+HASH_LENGTH = 16
+
+
+def manifest_salt(event):
+    """Per-event salt, so manifests of different events cannot be correlated"""
+    key = (getattr(settings, 'TICKET_SIGNING_KEY', '') or settings.SECRET_KEY).encode('utf-8')
+    return hmac.new(key, f'gate-manifest:{event.id}'.encode('utf-8'), hashlib.sha256).hexdigest()[:16]
+
+
+def code_hash(salt, code):
+    """Hash a ticket code the way scanners do: sha256(salt + code), truncated"""
+    return hashlib.sha256(f'{salt}{code}'.encode('utf-8')).hexdigest()[:HASH_LENGTH]
+
+
+def manifest_version(event):
+    """Cheap token that changes whenever a ticket is added, removed or checked in"""
+    stats = event.tickets.aggregate(
+        count=Count('id'),
+        verified=Count('id', filter=Q(verified=True)),
+        last_purchase=Max('purchase_date'),
+        last_verified=Max('verified_at'),
+    )
+    raw = '|'.join(str(stats[k]) for k in ('count', 'verified', 'last_purchase', 'last_verified'))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]
+
+
+def build_manifest(event, version=None):
+    """Return the manifest dict for ``event``
+
+    Each ticket is a ``[hash, quantity, verified]`` row to keep the payload small.
+    """
+    salt = manifest_salt(event)
+    rows = event.tickets.values_list('ticket_id', 'quantity', 'verified').order_by()
+    return {
+        'format': MANIFEST_FORMAT,
+        'event_id': str(event.id),
+        'event_name': event.name,
+        'version': version or manifest_version(event),
+        'generated_at': timezone.now().isoformat(),
+        'hash': {'algorithm': 'sha256', 'salt': salt, 'length': HASH_LENGTH},
+        'fields': ['hash', 'quantity', 'verified'],
+        'tickets': [
+            [code_hash(salt, code), quantity or 1, 1 if verified else 0]
+            for code, quantity, verified in rows.iterator(chunk_size=2000)
+        ],
+    }
+
+
+def _scan_time(value, now):
+    """When the scan happened (``now`` when the device sent none); ValueError if unreadable"""
+    if value in (None, ''):
+        return now
+    try:
+        scanned_at = parse_datetime(value) if isinstance(value, str) else None
+    except ValueError:
+        # Well-formed but impossible, e.g. month 13
+        scanned_at = None
+    if scanned_at is None:
+        raise ValueError('Invalid scanned_at timestamp')
+    if timezone.is_naive(scanned_at):
+        scanned_at = timezone.make_aware(scanned_at)
+    # Device clocks drift; never record a check-in in the future
+    return min(scanned_at, now)
+
+
+def reconcile_scans(event, device_id, scans):
+    """Apply a batch of offline scans for ``event`` in one transaction
+
+    Scans are replayed in the order they happened. The earliest scan of a
+    still-unverified ticket admits it (keeping the offline timestamp and the
+    device as ``verified_by``); any other scan of an admitted ticket is a
+    conflict, unless it is the same device re-uploading its own scan.
+
+    Returns:
+        dict: ``admitted``, ``duplicates``, ``conflicts`` and ``rejected`` lists
+    """
+    now = timezone.now()
+    device_id = (device_id or 'offline-gate')[:100]
+    result = {'admitted': [], 'duplicates': [], 'conflicts': [], 'rejected': []}
+
+    parsed = []
+    for scan in scans:
+        # One malformed scan is rejected on its own; it never fails the upload
+        raw = scan.get('code') if isinstance(scan, dict) else scan
+        if not isinstance(raw, str):
+            result['rejected'].append({'code': raw, 'reason': 'Ticket code must be a string'})
+            continue
+        try:
+            code, payload = resolve_scanned_code(raw)
+        except InvalidTicketPayload as e:
+            result['rejected'].append({'code': raw, 'reason': str(e)})
+            continue
+        if not code or not isinstance(code, str):
+            result['rejected'].append({'code': raw, 'reason': 'Missing ticket code'})
+            continue
+        if payload and payload.event_id and payload.event_id != event.id:
+            result['rejected'].append({'code': code, 'reason': 'Ticket belongs to another event'})
+            continue
+        try:
+            scanned_at = _scan_time(scan.get('scanned_at') if isinstance(scan, dict) else None, now)
+        except ValueError as e:
+            result['rejected'].append({'code': code, 'reason': str(e)})
+            continue
+        parsed.append((scanned_at, code))
+    parsed.sort(key=lambda item: item[0])
+
+    with transaction.atomic():
+        tickets = {
+            t.ticket_id: t
+            for t in Ticket.objects.select_for_update().filter(
+                event=event, ticket_id__in={code for _, code in parsed}
+            )
+        }
+        for scanned_at, code in parsed:
+            ticket = tickets.get(code)
+            entry = {'code': code, 'scanned_at': scanned_at.isoformat()}
+            if ticket is None:
+                result['rejected'].append(dict(entry, reason='Unknown ticket for this event'))
+                continue
+
+            if not (ticket.verified and ticket.verified_at):
+                if Ticket.objects.filter(pk=ticket.pk).check_in(device_id, at=scanned_at):
+                    ticket.verified, ticket.verified_at, ticket.verified_by = True, scanned_at, device_id
+                    result['admitted'].append(dict(entry, quantity=ticket.quantity or 1))
+                    continue
+                ticket.refresh_from_db(fields=['verified', 'verified_at', 'verified_by'])
+
+            entry.update(admitted_at=ticket.verified_at.isoformat(), admitted_by=ticket.verified_by)
+            if ticket.verified_by == device_id:
+                result['duplicates'].append(entry)
+            else:
+                result['conflicts'].append(entry)
+
+    return result
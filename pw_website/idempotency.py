@@ -0,0 +1,113 @@
+"""Idempotency-Key support for the write endpoints.
+
+Payment callbacks on flaky mobile connections get retried, and a retried
+``store_ticket`` or booking POST used to run the whole write again. A POST
+carrying an ``Idempotency-Key`` header now runs its view once per key: the
+first request claims an ``IdempotencyKey`` row and a successful (2xx)
+response is stored on it. Retries are answered from the row without running
+the view again (marked ``Idempotent-Replayed: true``). Reusing a key with a
+different body gets 422, and a retry arriving while the first attempt is
+still running gets 409. A failed attempt releases its key so the client can
+simply try again. Rows are kept for IDEMPOTENCY_KEY_HOURS (see the
+``prune_idempotency_keys`` command).
+"""
+import functools
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+def _request_hash(request):
+    digest = hashlib.sha256()
+    for part in (request.method.encode('utf-8'), request.path.encode('utf-8'), request.body):
+        digest.update(part)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _error(message, status):
+    return JsonResponse({'success': False, 'message': message}, status=status)
+
+
+def _claim(scope, key, request_hash):
+    """``(record, True)`` when this request now owns the key, else ``(existing row or None, False)``"""
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(scope=scope, key=key, request_hash=request_hash), True
+    except IntegrityError:
+        pass
+    record = IdempotencyKey.objects.filter(scope=scope, key=key).first()
+    if record is None or record.status_code is not None or record.request_hash != request_hash:
+        return record, False
+    if record.created_at < timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS):
+        # The first attempt died without answering; take its claim over
+        now = timezone.now()
+        taken = IdempotencyKey.objects.filter(
+            pk=record.pk, status_code__isnull=True, created_at=record.created_at
+        ).update(created_at=now)
+        if taken:
+            record.created_at = now
+            return record, True
+    return record, False
+
+
+def _replay(record):
+    response = HttpResponse(bytes(record.body), status=record.status_code, content_type=record.content_type)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(view):
+    """Run ``view`` at most once per Idempotency-Key; other requests pass straight through.
+
+    Only POST requests that send the header are tracked. Keys are scoped to
+    the view, so one payment reference can key both a ticket and a booking.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get(HEADER, '').strip()
+        if request.method != 'POST' or not key:
+            return view(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return _error(f'{HEADER} must be at most {MAX_KEY_LENGTH} characters', 400)
+
+        request_hash = _request_hash(request)
+        record, owned = _claim(view.__name__, key, request_hash)
+        if not owned:
+            if record is not None and record.request_hash != request_hash:
+                return _error(f'This {HEADER} was already used for a different request', 422)
+            if record is None or record.status_code is None:
+                return _error(f'A request with this {HEADER} is still being processed', 409)
+            return _replay(record)
+
+        try:
+            response = view(request, *args, **kwargs)
+        except BaseException:
+            record.delete()
+            raise
+        if 200 <= response.status_code < 300 and not response.streaming:
+            record.status_code = response.status_code
+            record.content_type = response.get('Content-Type', '')
+            record.body = response.content
+            record.save(update_fields=['status_code', 'content_type', 'body'])
+        else:
+            record.delete()
+        return response
+
+    return wrapper
+
+
+def prune_idempotency_keys(now=None):
+    """Delete keys older than IDEMPOTENCY_KEY_HOURS; returns how many went"""
+    cutoff = (now or timezone.now()) - timedelta(hours=settings.IDEMPOTENCY_KEY_HOURS)
+    return IdempotencyKey.objects.filter(created_at__lt=cutoff).delete()[0]
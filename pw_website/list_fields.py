@@ -0,0 +1,164 @@
+"""Column specs for the JSON list endpoints (tickets, bookings, events) and the
+dashboard delta sync, which also ships payments.
+
+Each endpoint describes its columns as ``name -> ListField``. Rows are read
+with ``.values()`` over just the lookups that the requested columns need, so
+no model instances are built. Clients can ask for a subset with
+``?fields=a,b,c``. With ``?format=columnar`` the rows come back as one array
+per column instead of one object per row.
+"""
+from django.db.models import Min, Q
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def _float(value):
+    return float(value or 0)
+
+
+def _str(value):
+    return str(value) if value is not None else None
+
+
+class ListField:
+    """A response column built from one or more ``.values()`` lookups"""
+
+    def __init__(self, *lookups, convert=None):
+        self.lookups = lookups
+        self.convert = convert
+
+    def value(self, row):
+        values = [row[lookup] for lookup in self.lookups]
+        if self.convert is not None:
+            return self.convert(*values)
+        return values[0]
+
+
+def _ticket_event(event_id, name, date, location):
+    if event_id is None:
+        return None
+    return {'id': str(event_id), 'name': name, 'date': _iso(date), 'location': location}
+
+
+TICKET_FIELDS = {
+    'id': ListField('id', convert=_str),
+    'ticket_id': ListField('ticket_id'),
+    'event': ListField('event__id', 'event__name', 'event__date', 'event__location', convert=_ticket_event),
+    'ticket_type': ListField('ticket_type'),
+    'price_per_ticket': ListField('price_per_ticket', convert=_float),
+    'quantity': ListField('quantity'),
+    'customer_name': ListField('customer_name'),
+    'customer_email': ListField('customer_email'),
+    'verified': ListField('verified'),
+    'purchased_at': ListField('purchase_date', convert=_iso),
+    'verified_at': ListField('verified_at', convert=_iso),
+}
+
+BOOKING_FIELDS = {
+    'id': ListField('id', convert=_str),
+    'quote_id': ListField('quote_id'),
+    'client_name': ListField('client_name'),
+    'phone': ListField('phone'),
+    'email': ListField('email'),
+    'event_type': ListField('event_type'),
+    'event_date': ListField('event_date', convert=_iso),
+    'venue': ListField('venue'),
+    'guests': ListField('guests'),
+    'package_type': ListField('package_type'),
+    'subtotal': ListField('subtotal', convert=_float),
+    'delivery_cost': ListField('delivery_cost', convert=_float),
+    'tax': ListField('tax', convert=_float),
+    'total': ListField('total', convert=_float),
+    'deposit_required': ListField('deposit_required', convert=_float),
+    'status': ListField('status'),
+    'created_at': ListField('created_at', convert=_iso),
+}
+
+
+def _featured_image_url(name):
+    if not name:
+        return None
+    from .models import Event
+    return Event._meta.get_field('featured_image').storage.url(name)
+
+
+# Read from Event.objects.with_tickets_sold() annotated with min_available_price
+EVENT_FIELDS = {
+    'id': ListField('id', convert=_str),
+    'name': ListField('name'),
+    'description': ListField('description'),
+    'event_type': ListField('event_type'),
+    'date': ListField('date', convert=_iso),
+    'location': ListField('location'),
+    'max_capacity': ListField('max_capacity'),
+    'tickets_available': ListField(
+        'max_capacity', 'inventory_tickets_sold', convert=lambda capacity, sold: capacity - sold
+    ),
+    # Backward-compatible "price" for the UI: lowest available ticket price
+    'min_ticket_price': ListField('min_available_price', convert=_float),
+    'price_per_ticket': ListField('min_available_price', convert=_float),
+    'featured_image': ListField('featured_image', convert=_featured_image_url),
+}
+
+
+def event_values(events, lookups):
+    """``events.values(*lookups)``, joining the tickets only when a lookup needs them"""
+    if 'inventory_tickets_sold' in lookups:
+        events = events.with_tickets_sold()
+    if 'min_available_price' in lookups:
+        events = events.annotate(min_available_price=Min(
+            'tickets__price_per_ticket', filter=Q(tickets__customer_name='')
+        ))
+    return events.values(*lookups)
+
+
+PAYMENT_FIELDS = {
+    'id': ListField('id', convert=_str),
+    'booking': ListField('booking_id', convert=_str),
+    'ticket': ListField('ticket_id', convert=_str),
+    'payer_name': ListField('payer_name'),
+    'amount': ListField('amount', convert=_float),
+    'payment_method': ListField('payment_method'),
+    'transaction_reference': ListField('transaction_reference'),
+    'payment_date': ListField('payment_date', convert=_iso),
+    'status': ListField('status'),
+}
+
+
+def requested_fields(request, spec):
+    """Column names asked for with ``?fields=``, in spec order; every column by default.
+
+    Raises ValueError naming any unknown column.
+    """
+    raw = request.GET.get('fields', '')
+    wanted = {name.strip() for name in raw.split(',') if name.strip()}
+    if not wanted:
+        return list(spec)
+    unknown = wanted - spec.keys()
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(sorted(unknown))}. Available: {', '.join(spec)}"
+        )
+    return [name for name in spec if name in wanted]
+
+
+def field_lookups(spec, names, *extra):
+    """The ``.values()`` lookups for ``names`` plus any ``extra`` ones (e.g. paging keys)"""
+    lookups = dict.fromkeys(extra)
+    for name in names:
+        lookups.update(dict.fromkeys(spec[name].lookups))
+    return list(lookups)
+
+
+def wants_columnar(request):
+    return request.GET.get('format') == 'columnar'
+
+
+def render_rows(request, rows, spec, names):
+    """Rows as a list of objects, or as ``{column: [values...]}`` for ``format=columnar``"""
+    fields = [(name, spec[name]) for name in names]
+    if wants_columnar(request):
+        return {name: [field.value(row) for row in rows] for name, field in fields}
+    return [{name: field.value(row) for name, field in fields} for row in rows]
@@ -0,0 +1,53 @@
+"""Cache for the public event listings on the home and events pages.
+
+Cached listings are keyed by a stamp with two parts. The first is a version
+that Event saves and deletes bump, so edits show up at once. The second is an
+inventory stamp that ticket changes advance at most once every
+``EVENT_LISTING_INVENTORY_TTL`` seconds, so a busy sale re-renders the pages
+a few times a minute instead of on every ticket sold.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+VERSION_KEY = 'pw:listings:version'
+INVENTORY_CHANGED_KEY = 'pw:listings:inventory-changed'
+INVENTORY_STAMP_KEY = 'pw:listings:inventory-stamp'
+
+
+def invalidate_listings():
+    """Drop every cached listing (an event was added, edited or removed)"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def mark_inventory_changed():
+    """Note that ticket figures changed; listings catch up within the inventory TTL"""
+    cache.set(INVENTORY_CHANGED_KEY, time.time(), None)
+
+
+def listing_stamp():
+    """The current cache stamp for listings, for queryset and fragment keys"""
+    values = cache.get_many([VERSION_KEY, INVENTORY_CHANGED_KEY, INVENTORY_STAMP_KEY])
+    version = values.get(VERSION_KEY, 0)
+    changed = values.get(INVENTORY_CHANGED_KEY, 0)
+    stamp = values.get(INVENTORY_STAMP_KEY, 0)
+    now = time.time()
+    if changed > stamp and now - stamp >= settings.EVENT_LISTING_INVENTORY_TTL:
+        stamp = now
+        cache.set(INVENTORY_STAMP_KEY, stamp, None)
+    return f'{version}.{int(stamp * 1000)}'
+
+
+def cached_listing(name, stamp, build, *parts):
+    """Return ``build()`` cached under ``name``, the stamp and any extra key parts"""
+    key = ':'.join(['pw:listings', name, stamp, *map(str, parts)])
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, settings.EVENT_LISTING_CACHE_TTL)
+    return value
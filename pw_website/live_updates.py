@@ -0,0 +1,108 @@
+"""Server-Sent Events push channel for ticket sales, check-ins and booking changes.
+
+Writers append small messages to a numbered log in the Django cache once
+their transaction commits. Each ``/api/live/`` stream is an async generator
+that watches the log's sequence number and forwards new messages, so
+connected browsers cost one cache read per ``LIVE_POLL_SECONDS`` instead of
+their own database polling. With a shared cache backend (Redis, Memcached)
+messages reach streams served by every worker; LocMemCache only reaches
+streams in the same process.
+
+The stream needs an ASGI server: the Procfile runs ``pw_merchants.asgi``
+under uvicorn workers, and on Vercel ``/api/live/`` is routed to
+``api/asgi.py`` (streams there end at the function timeout and the browser
+reconnects with Last-Event-ID). Under WSGI, e.g. ``runserver``, the endpoint
+answers 503 and the pages keep polling.
+"""
+import asyncio
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+SEQUENCE_KEY = 'pw:live:seq'
+MESSAGE_KEY = 'pw:live:msg:{}'
+
+# Streams further behind than this are told to reload instead of replaying
+MAX_REPLAY = 200
+HEARTBEAT_SECONDS = 15
+# Browsers reconnect this long after a stream ends (EventSource "retry")
+RECONNECT_MS = 3000
+
+
+def _append(kind, data):
+    try:
+        seq = cache.incr(SEQUENCE_KEY)
+    except ValueError:
+        cache.add(SEQUENCE_KEY, 0, None)
+        seq = cache.incr(SEQUENCE_KEY)
+    cache.set(MESSAGE_KEY.format(seq), {'kind': kind, 'data': data}, settings.LIVE_MESSAGE_TTL)
+
+
+def publish(kind, data):
+    """Send a message to connected streams once the current transaction commits"""
+    transaction.on_commit(lambda: _append(kind, data))
+
+
+def publish_event_stats(kind, event_ids):
+    """Send the current ticket counters of each event after commit.
+
+    ``kind`` is ``sale`` or ``checkin``; the counters are read when the
+    transaction commits, so one message carries every change made in it.
+    """
+    def send():
+        from .models import Event
+        for event in Event.objects.filter(pk__in=event_ids):
+            _append(kind, event.ticket_stats())
+
+    if event_ids:
+        transaction.on_commit(send)
+
+
+def _format(seq, kind, data):
+    return f'id: {seq}\nevent: {kind}\ndata: {json.dumps(data)}\n\n'
+
+
+async def stream(last_seq=None, event_id=None):
+    """Yield SSE frames for messages after ``last_seq`` until LIVE_STREAM_SECONDS pass.
+
+    ``last_seq`` is the browser's Last-Event-ID; new streams start at the
+    current end of the log. With ``event_id`` only that event's ``sale`` and
+    ``checkin`` messages are sent. A ``reset`` frame means messages were
+    missed and the page should reload its figures. Ending the stream every
+    few minutes lets EventSource reconnect (with Last-Event-ID) and keeps
+    workers from being pinned.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.LIVE_STREAM_SECONDS
+    idle_since = loop.time()
+    if last_seq is None:
+        last_seq = await cache.aget(SEQUENCE_KEY, 0)
+    yield f'retry: {RECONNECT_MS}\n\n'
+
+    while loop.time() < deadline:
+        seq = await cache.aget(SEQUENCE_KEY, 0)
+        if seq < last_seq or seq - last_seq > MAX_REPLAY:
+            # Cache flushed or the client fell too far behind
+            yield _format(seq, 'reset', {})
+            last_seq = seq
+        elif seq > last_seq:
+            keys = [MESSAGE_KEY.format(n) for n in range(last_seq + 1, seq + 1)]
+            messages = await cache.aget_many(keys)
+            if len(messages) < len(keys):
+                yield _format(seq, 'reset', {})
+            else:
+                for n, key in enumerate(keys, last_seq + 1):
+                    message = messages[key]
+                    if event_id and message['data'].get('event_id') != event_id:
+                        continue
+                    yield _format(n, message['kind'], message['data'])
+            last_seq = seq
+            idle_since = loop.time()
+        elif loop.time() - idle_since >= HEARTBEAT_SECONDS:
+            # Comment line; keeps proxies from closing an idle connection
+            yield ': keep-alive\n\n'
+            idle_since = loop.time()
+        await asyncio.sleep(settings.LIVE_POLL_SECONDS)
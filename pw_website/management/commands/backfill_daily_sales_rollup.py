@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pw_website.models import DailySalesRollup, daily_sales_totals
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily sales rollup from the ticket rows. "
+        "Sales recorded while it runs may be missed, so run it when the box office is quiet."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', help='Only rebuild these events')
+
+    def handle(self, *args, **options):
+        event_ids = options['event_ids'] or None
+        with transaction.atomic():
+            totals = daily_sales_totals(event_ids)
+            existing = DailySalesRollup.objects.all()
+            if event_ids:
+                existing = existing.filter(event_id__in=event_ids)
+            existing.delete()
+            DailySalesRollup.objects.bulk_create(
+                [
+                    DailySalesRollup(event_id=event_id, day=day, ticket_type=ticket_type, **counts)
+                    for (event_id, day, ticket_type), counts in totals.items()
+                    if event_id
+                ],
+                batch_size=1000,
+            )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(totals)} daily sales row(s)"))
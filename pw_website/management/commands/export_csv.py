@@ -0,0 +1,43 @@
+import sys
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from pw_website.csv_export import EXPORTS, export_rows, iter_csv, parse_date
+
+
+class Command(BaseCommand):
+    help = "Stream tickets, payments or bookings to a CSV file for accounting"
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(EXPORTS))
+        parser.add_argument('output', help="Path of the CSV to write, or - for stdout")
+        parser.add_argument('--event', help='Only rows for this event UUID (tickets and payments)')
+        parser.add_argument('--from', dest='date_from', help='First date to include (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', help='Last date to include (YYYY-MM-DD)')
+        parser.add_argument('--status', help='Only rows with this status')
+
+    def handle(self, *args, **options):
+        try:
+            rows = export_rows(
+                options['kind'],
+                event_id=options['event'],
+                date_from=parse_date(options['date_from']),
+                date_to=parse_date(options['date_to']),
+                status=options['status'],
+            )
+        except (ValueError, ValidationError) as e:
+            raise CommandError(str(e))
+
+        lines = iter_csv(options['kind'], rows)
+        if options['output'] == '-':
+            for line in lines:
+                sys.stdout.write(line)
+            return
+
+        count = -1  # header
+        with open(options['output'], 'w', newline='', encoding='utf-8') as fh:
+            for line in lines:
+                fh.write(line)
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f"Exported {count} {options['kind']} to {options['output']}"))
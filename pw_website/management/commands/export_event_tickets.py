@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from pw_website.models import Event
+from pw_website.ticket_export import export_workers, filter_event_tickets, iter_tickets_pdf, iter_tickets_zip
+
+
+class Command(BaseCommand):
+    help = "Render an event's tickets into one multi-page PDF or a ZIP of per-ticket PDFs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_id', help='UUID of the event to export')
+        parser.add_argument('output', help='Path of the file to write')
+        parser.add_argument('--format', choices=['pdf', 'zip'], default='pdf')
+        parser.add_argument('--ticket-type', help='Only export this ticket type')
+        status = parser.add_mutually_exclusive_group()
+        status.add_argument('--verified', dest='verified', action='store_const', const=True,
+                            help='Only export checked-in tickets')
+        status.add_argument('--unverified', dest='verified', action='store_const', const=False,
+                            help='Only export tickets not yet checked in')
+        parser.add_argument('--sold', action='store_true', help='Skip unsold inventory tickets')
+        parser.add_argument('--codes', help='Comma-separated ticket codes to export')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Render processes for ZIP exports (default: TICKET_EXPORT_WORKERS)')
+
+    def handle(self, *args, **options):
+        try:
+            event = Event.objects.get(id=options['event_id'])
+        except (Event.DoesNotExist, ValueError):
+            raise CommandError(f"Event not found: {options['event_id']}")
+
+        codes = [c.strip() for c in (options['codes'] or '').split(',') if c.strip()]
+        tickets = filter_event_tickets(
+            event,
+            ticket_type=options['ticket_type'],
+            verified=options['verified'],
+            sold_only=options['sold'],
+            codes=codes or None,
+        )
+        count = tickets.count()
+
+        if options['format'] == 'zip':
+            chunks = iter_tickets_zip(tickets, workers=options['workers'] or export_workers())
+        else:
+            chunks = iter_tickets_pdf(tickets)
+
+        with open(options['output'], 'wb') as fh:
+            for chunk in chunks:
+                fh.write(chunk)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {count} tickets for {event.name} to {options['output']}"
+        ))
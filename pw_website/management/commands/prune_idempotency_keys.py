@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from pw_website.idempotency import prune_idempotency_keys
+
+
+class Command(BaseCommand):
+    help = "Delete stored Idempotency-Key responses older than IDEMPOTENCY_KEY_HOURS"
+
+    def handle(self, *args, **options):
+        pruned = prune_idempotency_keys()
+        self.stdout.write(self.style.SUCCESS(f"Pruned {pruned} idempotency key(s)"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from pw_website.delta_sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete delta-sync tombstones older than SYNC_TOMBSTONE_DAYS"
+
+    def handle(self, *args, **options):
+        pruned = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(f"Pruned {pruned} tombstone(s)"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from pw_website.ticket_cache import prune_ticket_pdf_cache
+
+
+class Command(BaseCommand):
+    help = "Trim the on-disk ticket PDF cache to TICKET_PDF_CACHE_MAX_AGE_DAYS and TICKET_PDF_CACHE_MAX_MB"
+
+    def handle(self, *args, **options):
+        pruned = prune_ticket_pdf_cache()
+        self.stdout.write(self.style.SUCCESS(f"Pruned {pruned} cached ticket PDF(s)"))
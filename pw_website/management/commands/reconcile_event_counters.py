@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from pw_website.models import EVENT_COUNTER_FIELDS, Event, event_counter_totals
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized ticket counters on each Event from its ticket rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', help='Only reconcile these events')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it')
+
+    def handle(self, *args, **options):
+        events = Event.objects.only('id', 'name', *EVENT_COUNTER_FIELDS)
+        if options['event_ids']:
+            events = events.filter(id__in=options['event_ids'])
+        events = list(events)
+
+        totals = event_counter_totals([event.id for event in events] if options['event_ids'] else None)
+        zero = dict.fromkeys(EVENT_COUNTER_FIELDS, 0)
+        drifted = 0
+        for event in events:
+            expected = totals.get(event.id, zero)
+            changes = {
+                field: value for field, value in expected.items()
+                if getattr(event, field) != value
+            }
+            if not changes:
+                continue
+            drifted += 1
+            summary = ', '.join(
+                f"{field} {getattr(event, field)} -> {value}" for field, value in changes.items()
+            )
+            self.stdout.write(f"{event.name} ({event.id}): {summary}")
+            if not options['dry_run']:
+                Event.objects.filter(pk=event.pk).update(**changes)
+
+        if options['dry_run']:
+            self.stdout.write(f"{drifted} event(s) out of sync")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Reconciled {drifted} event(s)"))
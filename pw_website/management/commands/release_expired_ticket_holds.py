@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from pw_website.models import TicketHold
+
+
+class Command(BaseCommand):
+    help = "Return the stock of expired ticket holds (abandoned checkouts) to sale"
+
+    def handle(self, *args, **options):
+        released = TicketHold.objects.expired().release()
+        self.stdout.write(self.style.SUCCESS(f"Released {released} expired hold(s)"))
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.18 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+def backfill_event_counters(apps, schema_editor):
+    Event = apps.get_model("pw_website", "Event")
+    Ticket = apps.get_model("pw_website", "Ticket")
+    sold = ~models.Q(customer_name="")
+    rows = (
+        Ticket.objects.values("event_id")
+        .annotate(
+            issued=models.Sum("quantity"),
+            sold=models.Sum("quantity", filter=sold),
+            verified=models.Sum("quantity", filter=models.Q(verified=True)),
+            revenue=models.Sum("amount_paid", filter=sold),
+        )
+        .order_by()
+    )
+    for row in rows:
+        Event.objects.filter(pk=row["event_id"]).update(
+            issued_quantity=row["issued"] or 0,
+            sold_quantity=row["sold"] or 0,
+            verified_quantity=row["verified"] or 0,
+            revenue=row["revenue"] or 0,
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pw_website", "0005_ticketinventory_alter_ticket_quantity_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="issued_quantity",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="sold_quantity",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="verified_quantity",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="revenue",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=14
+            ),
+        ),
+        migrations.RunPython(backfill_event_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.18 on 2026-10-18 09:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def backfill_ticket_inventory(apps, schema_editor):
+    """Seed inventory rows from the unsold batch tickets created on the dashboard"""
+    Ticket = apps.get_model("pw_website", "Ticket")
+    TicketInventory = apps.get_model("pw_website", "TicketInventory")
+    rows = (
+        Ticket.objects.values("event_id", "ticket_type")
+        .annotate(
+            stock=models.Sum("quantity", filter=models.Q(customer_name="")),
+            sold=models.Sum("quantity", filter=~models.Q(customer_name="")),
+            price=models.Max("price_per_ticket", filter=models.Q(customer_name="")),
+        )
+        .order_by()
+    )
+    for row in rows:
+        if not row["stock"]:
+            continue
+        TicketInventory.objects.get_or_create(
+            event_id=row["event_id"],
+            ticket_type=row["ticket_type"],
+            defaults={
+                "price_per_ticket": row["price"] or 0,
+                "total_quantity": row["stock"],
+                "remaining_quantity": max(row["stock"] - (row["sold"] or 0), 0),
+            },
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pw_website", "0006_event_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TicketHold",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("quantity", models.PositiveIntegerField()),
+                ("expires_at", models.DateTimeField(db_index=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "inventory",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="holds",
+                        to="pw_website.ticketinventory",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["expires_at"],
+            },
+        ),
+        migrations.RunPython(backfill_ticket_inventory, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,109 @@
+# Generated by Django 4.2.18 on 2026-10-18 09:58
+
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def backfill_daily_sales_rollup(apps, schema_editor):
+    Ticket = apps.get_model("pw_website", "Ticket")
+    DailySalesRollup = apps.get_model("pw_website", "DailySalesRollup")
+    tz = timezone.get_current_timezone()
+    totals = {}
+    sales = (
+        Ticket.objects.exclude(customer_name="")
+        .annotate(day=TruncDate("purchase_date", tzinfo=tz))
+        .values("event_id", "day", "ticket_type")
+        .annotate(
+            tickets_sold=models.Count("id"),
+            quantity_sold=models.Sum("quantity"),
+            revenue=models.Sum("amount_paid"),
+        )
+        .order_by()
+    )
+    checkins = (
+        Ticket.objects.filter(verified=True, verified_at__isnull=False)
+        .annotate(day=TruncDate("verified_at", tzinfo=tz))
+        .values("event_id", "day", "ticket_type")
+        .annotate(checkins=models.Sum("quantity"))
+        .order_by()
+    )
+    for rows in (sales, checkins):
+        for row in rows:
+            key = (row.pop("event_id"), row.pop("day"), row.pop("ticket_type"))
+            totals.setdefault(key, {}).update(
+                {field: value or 0 for field, value in row.items()}
+            )
+    DailySalesRollup.objects.bulk_create(
+        [
+            DailySalesRollup(event_id=event_id, day=day, ticket_type=ticket_type, **counts)
+            for (event_id, day, ticket_type), counts in totals.items()
+            if event_id
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pw_website", "0009_sync_tombstones"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailySalesRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "ticket_type",
+                    models.CharField(
+                        choices=[
+                            ("normal", "Normal"),
+                            ("regular", "Regular"),
+                            ("premium", "Premium"),
+                            ("vip", "VIP"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("tickets_sold", models.IntegerField(default=0)),
+                ("quantity_sold", models.IntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("checkins", models.IntegerField(default=0)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_sales",
+                        to="pw_website.event",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["day", "ticket_type"],
+                "indexes": [
+                    models.Index(fields=["day"], name="pw_website__day_e01188_idx")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailysalesrollup",
+            constraint=models.UniqueConstraint(
+                fields=("event", "day", "ticket_type"), name="unique_daily_sales_rollup"
+            ),
+        ),
+        migrations.RunPython(backfill_daily_sales_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.18 on 2026-10-18 10:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pw_website", "0010_dailysalesrollup"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="booking",
+            name="event_date",
+            field=models.DateField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="event",
+            name="date",
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
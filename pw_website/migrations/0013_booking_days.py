@@ -0,0 +1,47 @@
+# Generated by Django 4.2.18 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+def backfill_booking_days(apps, schema_editor):
+    Booking = apps.get_model("pw_website", "Booking")
+    BookingDay = apps.get_model("pw_website", "BookingDay")
+    days = (
+        Booking.objects.filter(status__in=("pending", "confirmed", "completed"))
+        .values("event_date")
+        .annotate(booked=models.Count("id"))
+        .order_by()
+    )
+    BookingDay.objects.bulk_create(
+        [BookingDay(day=row["event_date"], booked=row["booked"]) for row in days],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pw_website", "0012_idempotency_keys"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookingDay",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(unique=True)),
+                ("booked", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["day"],
+            },
+        ),
+        migrations.RunPython(backfill_booking_days, migrations.RunPython.noop),
+    ]
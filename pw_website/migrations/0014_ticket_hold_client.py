@@ -0,0 +1,17 @@
+# Generated by Django 4.2.18 on 2026-10-18 10:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pw_website", "0013_booking_days"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tickethold",
+            name="client",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
@@ -1,8 +1,59 @@
-from django.db import models
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
+from datetime import timedelta
 import uuid
 
+from .listing_cache import mark_inventory_changed
+from .live_updates import publish_event_stats
+
+
+def _group_ticket_types(rows):
+    """Fold (ticket_type, price_per_ticket, available_count) rows into per-type dicts"""
+    types_dict = {}
+    for ticket in rows:
+        ticket_type = ticket['ticket_type']
+        if ticket_type not in types_dict:
+            types_dict[ticket_type] = {
+                'type': ticket_type,
+                'price': float(ticket['price_per_ticket']),
+                'available': 0
+            }
+        types_dict[ticket_type]['available'] += ticket['available_count']
+    return list(types_dict.values())
+
+
+class EventQuerySet(models.QuerySet):
+    """QuerySet that can preload the inventory figures shown on listings"""
+
+    def with_tickets_sold(self):
+        """Annotate ``inventory_tickets_sold`` with one aggregate join on the event query"""
+        qs = self.annotate(
+            inventory_tickets_sold=models.Count('tickets', filter=models.Q(tickets__verified=True))
+        )
+        if not qs.query.order_by:
+            # Meta.ordering is not applied to GROUP BY queries
+            qs = qs.order_by(*self.model._meta.ordering)
+        return qs
+
+    def with_inventory(self):
+        """Annotate sold counts and prefetch the unsold tickets.
+
+        The unsold tickets of every fetched event come from one extra query
+        into ``unsold_tickets``; the inventory properties on Event then read
+        these values instead of querying per event.
+        """
+        return self.with_tickets_sold().prefetch_related(models.Prefetch(
+            'tickets',
+            queryset=Ticket.objects.filter(customer_name='').only(
+                'id', 'event_id', 'ticket_type', 'price_per_ticket'
+            ).order_by(),
+            to_attr='unsold_tickets',
+        ))
+
 
 class Event(models.Model):
     EVENT_TYPES = [
@@ -17,13 +68,24 @@ class Event(models.Model):
     name = models.CharField(max_length=200)
     description = models.TextField()
     event_type = models.CharField(max_length=20, choices=EVENT_TYPES, default='bush_party')
-    date = models.DateTimeField()
+    date = models.DateTimeField(db_index=True)
     location = models.CharField(max_length=300)
     max_capacity = models.PositiveIntegerField(default=100)
     is_active = models.BooleanField(default=True)
     featured_image = models.ImageField(upload_to='events/', blank=True, null=True)
+
+    # Denormalized ticket counters, kept in step with F() updates whenever a
+    # ticket is saved, deleted or checked in (see Ticket.save / check_in).
+    # `reconcile_event_counters` rebuilds them from the ticket rows.
+    issued_quantity = models.PositiveIntegerField(default=0, editable=False)
+    sold_quantity = models.PositiveIntegerField(default=0, editable=False)
+    verified_quantity = models.PositiveIntegerField(default=0, editable=False)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = EventQuerySet.as_manager()
 
     class Meta:
         ordering = ['-date']
@@ -33,33 +95,46 @@ class Event(models.Model):
 
     @property
     def tickets_sold(self):
+        if hasattr(self, 'inventory_tickets_sold'):
+            return self.inventory_tickets_sold
         return self.tickets.filter(verified=True).count()
 
     @property
     def tickets_available(self):
         return self.max_capacity - self.tickets_sold
+
+    def ticket_stats(self):
+        """Check-in and sales figures from the ticket counters.
+
+        Served publicly by /api/event-stats/ and the per-event live stream, so
+        revenue is left out.
+        """
+        total, verified = self.issued_quantity, self.verified_quantity
+        return {
+            'event_id': str(self.id),
+            'total_tickets': total,
+            'tickets_sold': self.sold_quantity,
+            'verified_tickets': verified,
+            'unverified_tickets': total - verified,
+            'verification_rate': round((verified / total * 100) if total > 0 else 0, 1),
+        }
     
     @property
     def available_ticket_types(self):
         """Get available ticket types with their prices for this event"""
-        from django.db import models
-        ticket_types = self.tickets.values('ticket_type', 'price_per_ticket').annotate(
-            available_count=models.Count('id')
-        ).filter(customer_name='')
-        
-        # Group by ticket type and get the price
-        types_dict = {}
-        for ticket in ticket_types:
-            ticket_type = ticket['ticket_type']
-            if ticket_type not in types_dict:
-                types_dict[ticket_type] = {
-                    'type': ticket_type,
-                    'price': float(ticket['price_per_ticket']),
-                    'available': 0
-                }
-            types_dict[ticket_type]['available'] += ticket['available_count']
-        
-        return list(types_dict.values())
+        if not hasattr(self, '_available_ticket_types'):
+            if hasattr(self, 'unsold_tickets'):
+                # Prefetched by EventQuerySet.with_inventory()
+                rows = [
+                    {'ticket_type': t.ticket_type, 'price_per_ticket': t.price_per_ticket, 'available_count': 1}
+                    for t in self.unsold_tickets
+                ]
+            else:
+                rows = self.tickets.values('ticket_type', 'price_per_ticket').annotate(
+                    available_count=models.Count('id')
+                ).filter(customer_name='')
+            self._available_ticket_types = _group_ticket_types(rows)
+        return self._available_ticket_types
     
     @property
     def min_ticket_price(self):
@@ -97,7 +172,7 @@ class Booking(models.Model):
     phone = models.CharField(max_length=20)
     email = models.EmailField(blank=True)
     event_type = models.CharField(max_length=50)
-    event_date = models.DateField()
+    event_date = models.DateField(db_index=True)
     venue = models.TextField()
     guests = models.PositiveIntegerField(validators=[MinValueValidator(10)])
     package_type = models.CharField(max_length=20, choices=PACKAGE_TYPES)
@@ -112,7 +187,10 @@ class Booking(models.Model):
     
     status = models.CharField(max_length=20, choices=BOOKING_STATUS, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    # Bookings in these states take up one of their day's BOOKINGS_PER_DAY slots
+    SLOT_STATUSES = ('pending', 'confirmed', 'completed')
 
     class Meta:
         ordering = ['-created_at']
@@ -120,6 +198,245 @@ class Booking(models.Model):
     def __str__(self):
         return f"{self.quote_id} - {self.client_name}"
 
+    def _slot_day(self, event_date=None, status=None):
+        """The day this booking (or the given date and status) holds a slot on, or None"""
+        if (status or self.status) not in self.SLOT_STATUSES:
+            return None
+        return self._meta.get_field('event_date').to_python(event_date or self.event_date)
+
+    def _stored_slot_day(self):
+        """The slot the row holds as currently stored, locked until the transaction ends"""
+        if self._state.adding:
+            return None
+        stored = Booking.objects.select_for_update().filter(pk=self.pk).values_list('event_date', 'status').first()
+        return self._slot_day(*stored) if stored else None
+
+    def save(self, *args, **kwargs):
+        """Save, taking a slot on the new day first; raises DayFullyBooked when it has none left.
+
+        Freeing the old slot happens in the same transaction, so moving or
+        cancelling a booking and the insert itself are all-or-nothing.
+        Deleted bookings give their slot back in a post_delete signal.
+        """
+        with transaction.atomic():
+            old, new = self._stored_slot_day(), self._slot_day()
+            if old != new:
+                if new:
+                    take_booking_slot(new)
+                if old:
+                    release_booking_slot(old)
+            super().save(*args, **kwargs)
+
+
+class DayFullyBooked(Exception):
+    """A booking was saved onto a day that already holds BOOKINGS_PER_DAY bookings"""
+
+    def __init__(self, day):
+        self.day = day
+        super().__init__(f'We are currently busy for {day:%B %d, %Y}. Please try another day.')
+
+
+class BookingDay(models.Model):
+    """How many bookings hold a slot on a day, so the daily cap is enforced by one UPDATE.
+
+    Kept by Booking.save and the post_delete signal; never edit by hand.
+    """
+    day = models.DateField(unique=True)
+    booked = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['day']
+
+    def __str__(self):
+        return f"{self.day}: {self.booked} booked"
+
+
+def take_booking_slot(day):
+    """Count one more booking on ``day``; raises DayFullyBooked when it is full.
+
+    The cap is checked by the UPDATE itself (``booked < BOOKINGS_PER_DAY``),
+    which the database serialises per row on SQLite and Postgres alike, so
+    two concurrent bookings cannot both take the last slot.
+    """
+    rows = BookingDay.objects.filter(day=day)
+    limit = settings.BOOKINGS_PER_DAY
+    for attempt in range(2):
+        if rows.filter(booked__lt=limit).update(booked=F('booked') + 1):
+            return
+        if attempt or limit < 1 or rows.exists():
+            break
+        try:
+            with transaction.atomic():
+                BookingDay.objects.create(day=day, booked=1)
+            return
+        except IntegrityError:
+            # Another transaction created the day after our update missed it
+            pass
+    raise DayFullyBooked(day)
+
+
+def release_booking_slot(day):
+    from .availability import invalidate_availability
+    BookingDay.objects.filter(day=day, booked__gt=0).update(booked=F('booked') - 1)
+    # The booking's post_save only knows its new date
+    invalidate_availability(day)
+
+
+EVENT_COUNTER_FIELDS = ('issued_quantity', 'sold_quantity', 'verified_quantity', 'revenue')
+
+
+def _apply_counter_deltas(deltas):
+    """Add ``{event_id: {counter: delta}}`` to the Event counters with F() updates.
+
+    The new figures are pushed to live dashboards once the transaction commits.
+    """
+    changed = {'checkin': [], 'sale': []}
+    for event_id, changes in deltas.items():
+        changes = {field: value for field, value in changes.items() if value}
+        if event_id and changes:
+            Event.objects.filter(pk=event_id).update(
+                **{field: F(field) + value for field, value in changes.items()}
+            )
+            changed['checkin' if 'verified_quantity' in changes else 'sale'].append(event_id)
+    for kind, event_ids in changed.items():
+        publish_event_stats(kind, event_ids)
+
+
+def event_counter_totals(event_ids=None):
+    """Recompute the Event counters from the ticket rows, keyed by event id"""
+    sold = ~models.Q(customer_name='')
+    rows = Ticket.objects.all()
+    if event_ids is not None:
+        rows = rows.filter(event_id__in=event_ids)
+    rows = rows.values('event_id').annotate(
+        issued_quantity=models.Sum('quantity'),
+        sold_quantity=models.Sum('quantity', filter=sold),
+        verified_quantity=models.Sum('quantity', filter=models.Q(verified=True)),
+        revenue=models.Sum('amount_paid', filter=sold),
+    ).order_by()
+    return {
+        row['event_id']: {field: row[field] or 0 for field in EVENT_COUNTER_FIELDS}
+        for row in rows
+    }
+
+
+def _apply_rollup_deltas(deltas):
+    """Add ``{(event_id, day, ticket_type): {field: delta}}`` to the daily sales rollup"""
+    for (event_id, day, ticket_type), changes in deltas.items():
+        changes = {field: value for field, value in changes.items() if value}
+        if not event_id or not changes:
+            continue
+        rows = DailySalesRollup.objects.filter(event_id=event_id, day=day, ticket_type=ticket_type)
+        increments = {field: F(field) + value for field, value in changes.items()}
+        if rows.update(**increments):
+            continue
+        try:
+            with transaction.atomic():
+                DailySalesRollup.objects.create(event_id=event_id, day=day, ticket_type=ticket_type, **changes)
+        except IntegrityError:
+            # Another transaction created the row after our update missed it
+            rows.update(**increments)
+
+
+class TicketQuerySet(models.QuerySet):
+    def _set_verified(self, values, verified, locked=None):
+        """Flip ``verified`` on matching rows and move their quantities in the Event counters.
+
+        ``locked`` are tickets the caller already read under a row lock; they
+        are used instead of reading the rows again. Returns the tickets this
+        call changed, with ``values`` applied to them in memory.
+        """
+        with transaction.atomic():
+            if locked is None:
+                locked = list(self.select_for_update(of=('self',)))
+            if not locked:
+                return []
+            now = timezone.now()
+            pks = [ticket.pk for ticket in locked]
+            changed = Ticket.objects.filter(pk__in=pks).filter(
+                models.Q(verified=not verified) | models.Q(verified_at__isnull=verified)
+            ).update(updated_at=now, **values)
+            if changed != len(locked):
+                # Someone else flipped some of these rows between our read and
+                # write (databases without row locks); count only our own
+                mine = set(Ticket.objects.filter(pk__in=pks, **values).values_list('pk', flat=True))
+                locked = [ticket for ticket in locked if ticket.pk in mine]
+
+            sign = 1 if verified else -1
+            deltas = {}
+            rollup = {}
+            checked_in_on = timezone.localdate(values['verified_at']) if verified else None
+            for ticket in locked:
+                quantity = ticket.quantity or 0
+                # Half-verified rows already count as verified
+                if ticket.verified != verified:
+                    deltas.setdefault(ticket.event_id, {'verified_quantity': 0})
+                    deltas[ticket.event_id]['verified_quantity'] += sign * quantity
+                # ...but only check-ins with a time have a day in the rollup
+                if ticket.verified and ticket.verified_at:
+                    key = (ticket.event_id, timezone.localdate(ticket.verified_at), ticket.ticket_type)
+                    rollup.setdefault(key, {'checkins': 0})['checkins'] -= quantity
+                if checked_in_on:
+                    key = (ticket.event_id, checked_in_on, ticket.ticket_type)
+                    rollup.setdefault(key, {'checkins': 0})['checkins'] += quantity
+                for field, value in values.items():
+                    setattr(ticket, field, value)
+                ticket.updated_at = now
+            _apply_counter_deltas(deltas)
+            _apply_rollup_deltas(rollup)
+            # Queryset updates send no post_save; check-ins change the listed figures
+            mark_inventory_changed()
+            return locked
+
+    @staticmethod
+    def _check_in_values(verified_by, at):
+        return {
+            'verified': True,
+            'verified_at': at or timezone.now(),
+            'verified_by': verified_by or 'System',
+        }
+
+    # Rows left half-verified (a flag without a timestamp) count as unverified
+    _NOT_CHECKED_IN = models.Q(verified=False) | models.Q(verified_at__isnull=True)
+
+    def check_in(self, verified_by=None, at=None):
+        """Mark every not-yet-verified ticket in this queryset as verified.
+
+        The state change is a conditional UPDATE, so concurrent scans of the
+        same ticket cannot both succeed. Rows left half-verified (a flag
+        without a timestamp) are treated as unverified. ``at`` overrides the
+        check-in time, e.g. for scans recorded offline. Returns the number of
+        tickets that were checked in by this call.
+        """
+        return len(self.filter(self._NOT_CHECKED_IN)._set_verified(
+            self._check_in_values(verified_by, at), verified=True
+        ))
+
+    def check_in_one(self, verified_by=None, event_id=None):
+        """Check in the one ticket of this queryset; returns ``(ticket, newly_verified)``.
+
+        The ticket is read once, under its row lock, and that read serves
+        both the check-in and the caller's answer. A ticket of another event
+        than ``event_id`` is returned unchanged. Raises Ticket.DoesNotExist.
+        """
+        with transaction.atomic():
+            ticket = self.select_for_update(of=('self',)).get()
+            if (event_id and ticket.event_id != event_id) or (ticket.verified and ticket.verified_at):
+                return ticket, False
+            changed = self._set_verified(self._check_in_values(verified_by, None), verified=True, locked=[ticket])
+            if not changed:
+                # Another scan won the race (databases without row locks)
+                ticket.refresh_from_db(fields=['verified', 'verified_at', 'verified_by', 'updated_at'])
+            return ticket, bool(changed)
+
+    def reset_check_in(self):
+        """Undo check-ins for every verified ticket in this queryset"""
+        return len(self.filter(verified=True)._set_verified({
+            'verified': False,
+            'verified_at': None,
+            'verified_by': '',
+        }, verified=False))
+
 
 class Ticket(models.Model):
     TICKET_TYPES = [
@@ -144,6 +461,9 @@ class Ticket(models.Model):
     verified_by = models.CharField(max_length=100, blank=True)
     purchase_date = models.DateTimeField(auto_now_add=True)
     order_reference = models.CharField(max_length=100, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = TicketQuerySet.as_manager()
 
     class Meta:
         ordering = ['-purchase_date']
@@ -151,13 +471,294 @@ class Ticket(models.Model):
     def __str__(self):
         return f"{self.ticket_id} - {self.customer_name}"
 
+    def _counter_contribution(self):
+        """What this ticket adds to its event's counters, as ``(event_id, counters)``"""
+        quantity = self.quantity or 0
+        sold = bool(self.customer_name)
+        return self.event_id, {
+            'issued_quantity': quantity,
+            'sold_quantity': quantity if sold else 0,
+            'verified_quantity': quantity if self.verified else 0,
+            'revenue': (self.amount_paid or 0) if sold else 0,
+        }
+
+    def _rollup_contribution(self):
+        """What this ticket adds to the daily sales rollup, as ``{(event_id, day, ticket_type): counts}``
+
+        A sale counts on its purchase day and a check-in on the day it happened.
+        """
+        quantity = self.quantity or 0
+        contribution = {}
+        if self.customer_name and self.purchase_date:
+            contribution[(self.event_id, timezone.localdate(self.purchase_date), self.ticket_type)] = {
+                'tickets_sold': 1,
+                'quantity_sold': quantity,
+                'revenue': self.amount_paid or 0,
+            }
+        if self.verified and self.verified_at:
+            key = (self.event_id, timezone.localdate(self.verified_at), self.ticket_type)
+            contribution.setdefault(key, {})['checkins'] = quantity
+        return contribution
+
+    # Fields the counters and the rollup are computed from
+    _COUNTED_FIELDS = (
+        'event_id', 'quantity', 'customer_name', 'verified', 'amount_paid',
+        'ticket_type', 'purchase_date', 'verified_at',
+    )
+
+    def _stored_copy(self):
+        """The counted fields of the row as currently stored, locked until the transaction ends"""
+        if self._state.adding or self.pk is None:
+            return None
+        stored = Ticket.objects.select_for_update().filter(pk=self.pk).values_list(
+            *self._COUNTED_FIELDS
+        ).first()
+        if stored is None:
+            return None
+        return Ticket(**dict(zip(self._COUNTED_FIELDS, stored)))
+
+    @staticmethod
+    def _counter_deltas(old, new):
+        deltas = {}
+        for ticket, sign in ((old, -1), (new, 1)):
+            if ticket is None:
+                continue
+            event_id, counters = ticket._counter_contribution()
+            bucket = deltas.setdefault(event_id, dict.fromkeys(EVENT_COUNTER_FIELDS, 0))
+            for field, value in counters.items():
+                bucket[field] += sign * value
+        return deltas
+
+    @staticmethod
+    def _rollup_deltas(old, new):
+        deltas = {}
+        for ticket, sign in ((old, -1), (new, 1)):
+            if ticket is None:
+                continue
+            for key, counts in ticket._rollup_contribution().items():
+                bucket = deltas.setdefault(key, dict.fromkeys(ROLLUP_FIELDS, 0))
+                for field, value in counts.items():
+                    bucket[field] += sign * value
+        return deltas
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            old = self._stored_copy()
+            super().save(*args, **kwargs)
+            _apply_counter_deltas(self._counter_deltas(old, self))
+            _apply_rollup_deltas(self._rollup_deltas(old, self))
+
+    def delete(self, *args, **kwargs):
+        """Delete; the post_delete signal takes the row as stored out of the counters"""
+        with transaction.atomic():
+            stored = self._stored_copy()
+            if stored is not None:
+                # Count what the database holds, not what this instance last read
+                for field in self._COUNTED_FIELDS:
+                    setattr(self, field, getattr(stored, field))
+            return super().delete(*args, **kwargs)
+
+    def _remove_from_counters(self):
+        _apply_counter_deltas(self._counter_deltas(self, None))
+        _apply_rollup_deltas(self._rollup_deltas(self, None))
+
     def verify_ticket(self, verified_by=None):
         """Mark ticket as verified"""
-        if not self.verified:
-            self.verified = True
-            self.verified_at = timezone.now()
-            self.verified_by = verified_by or 'System'
-            self.save()
+        if Ticket.objects.filter(pk=self.pk).check_in(verified_by):
+            self.refresh_from_db(fields=['verified', 'verified_at', 'verified_by'])
+
+
+ROLLUP_FIELDS = ('tickets_sold', 'quantity_sold', 'revenue', 'checkins')
+
+
+class DailySalesRollup(models.Model):
+    """Ticket sales and check-ins per event, day and ticket type.
+
+    Kept up to date with F() increments whenever a ticket is saved, deleted or
+    checked in (see Ticket.save, the ticket post_delete signal and
+    TicketQuerySet.check_in), so reports read a few rows per day instead of
+    scanning tickets. Sales count on their purchase day, check-ins on the day
+    they happened (site time zone).
+    `backfill_daily_sales_rollup` rebuilds it from the ticket rows.
+    """
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='daily_sales')
+    day = models.DateField()
+    ticket_type = models.CharField(max_length=10, choices=Ticket.TICKET_TYPES)
+    tickets_sold = models.IntegerField(default=0)
+    quantity_sold = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    checkins = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['day', 'ticket_type']
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'day', 'ticket_type'], name='unique_daily_sales_rollup'),
+        ]
+        indexes = [models.Index(fields=['day'])]
+
+    def __str__(self):
+        return f"{self.event_id} {self.day} {self.ticket_type}"
+
+
+def daily_sales_totals(event_ids=None):
+    """Recompute the rollup from the ticket rows: ``{(event_id, day, ticket_type): counts}``"""
+    tickets = Ticket.objects.all()
+    if event_ids is not None:
+        tickets = tickets.filter(event_id__in=event_ids)
+    tz = timezone.get_current_timezone()
+    totals = {}
+    sales = tickets.exclude(customer_name='').annotate(day=TruncDate('purchase_date', tzinfo=tz)).values(
+        'event_id', 'day', 'ticket_type'
+    ).annotate(
+        tickets_sold=models.Count('id'),
+        quantity_sold=models.Sum('quantity'),
+        revenue=models.Sum('amount_paid'),
+    ).order_by()
+    checkins = tickets.filter(verified=True, verified_at__isnull=False).annotate(
+        day=TruncDate('verified_at', tzinfo=tz)
+    ).values('event_id', 'day', 'ticket_type').annotate(checkins=models.Sum('quantity')).order_by()
+    for rows in (sales, checkins):
+        for row in rows:
+            key = (row.pop('event_id'), row.pop('day'), row.pop('ticket_type'))
+            bucket = totals.setdefault(key, dict.fromkeys(ROLLUP_FIELDS, 0))
+            bucket.update({field: value or 0 for field, value in row.items()})
+    return totals
+
+
+class TicketInventory(models.Model):
+    """Stock of one ticket type for an event.
+
+    ``remaining_quantity`` is only ever moved with conditional F() updates on
+    this row, so concurrent purchases of different types (or events) never
+    wait on each other and a type can't be sold below zero.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='ticket_inventory')
+    ticket_type = models.CharField(max_length=10, choices=Ticket.TICKET_TYPES)
+    price_per_ticket = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    total_quantity = models.PositiveIntegerField(default=0)
+    remaining_quantity = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['ticket_type']
+        unique_together = ('event', 'ticket_type')
+
+    def __str__(self):
+        return f"{self.event.name} - {self.get_ticket_type_display()} ({self.remaining_quantity}/{self.total_quantity})"
+
+    @classmethod
+    def for_ticket_type(cls, event, ticket_type=None):
+        """The inventory row selling ``ticket_type``, or the only row when no type is given.
+
+        None means the sale is not checked against per-type stock (the event
+        has none, or no type was given and it sells several). Raises
+        TicketInventory.DoesNotExist when the event sells per-type stock but
+        not the requested type.
+        """
+        rows = cls.objects.filter(event=event)
+        ticket_type = (ticket_type or '').strip().lower()
+        if not ticket_type:
+            rows = list(rows[:2])
+            return rows[0] if len(rows) == 1 else None
+        match = rows.filter(ticket_type=ticket_type).first()
+        if match is None and rows.exists():
+            raise cls.DoesNotExist(f'{ticket_type} tickets are not on sale for this event')
+        return match
+
+    def add_stock(self, quantity):
+        TicketInventory.objects.filter(pk=self.pk).update(
+            total_quantity=F('total_quantity') + quantity,
+            remaining_quantity=F('remaining_quantity') + quantity,
+            updated_at=timezone.now(),
+        )
+
+    def reserve(self, quantity):
+        """Take ``quantity`` off the remaining stock; False when there isn't enough.
+
+        Expired holds on this row are swept before giving up, so abandoned
+        checkouts don't keep a type looking sold out.
+        """
+        for attempt in range(2):
+            taken = TicketInventory.objects.filter(
+                pk=self.pk, remaining_quantity__gte=quantity
+            ).update(remaining_quantity=F('remaining_quantity') - quantity, updated_at=timezone.now())
+            if taken:
+                return True
+            if attempt == 0 and not self.holds.expired().release():
+                break
+        return False
+
+    def release(self, quantity):
+        """Put ``quantity`` back on the remaining stock"""
+        TicketInventory.objects.filter(pk=self.pk).update(
+            remaining_quantity=F('remaining_quantity') + quantity, updated_at=timezone.now()
+        )
+
+    def hold(self, quantity, ttl=None, client=''):
+        """Reserve stock for a checkout in progress; None when sold out"""
+        ttl = settings.TICKET_HOLD_TTL if ttl is None else ttl
+        with transaction.atomic():
+            if not self.reserve(quantity):
+                return None
+            return TicketHold.objects.create(
+                inventory=self,
+                quantity=quantity,
+                expires_at=timezone.now() + timedelta(seconds=ttl),
+                client=client,
+            )
+
+
+class TicketHoldQuerySet(models.QuerySet):
+    def expired(self, now=None):
+        return self.filter(expires_at__lte=now or timezone.now())
+
+    def active(self, now=None):
+        return self.filter(expires_at__gt=now or timezone.now())
+
+    def release(self):
+        """Delete these holds and return their stock; returns the number released"""
+        released = 0
+        for pk, inventory_id, quantity in self.values_list('pk', 'inventory_id', 'quantity'):
+            with transaction.atomic():
+                # Only whoever deletes the row gives the stock back, so a hold
+                # consumed by a purchase or swept twice is never double counted
+                if TicketHold.objects.filter(pk=pk).delete()[0]:
+                    TicketInventory(pk=inventory_id).release(quantity)
+                    released += 1
+        return released
+
+
+class TicketHold(models.Model):
+    """Stock reserved for a checkout until it is paid for or ``expires_at`` passes"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    inventory = models.ForeignKey(TicketInventory, on_delete=models.CASCADE, related_name='holds')
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+    # IP address of the buyer, for the TICKET_HOLDS_PER_CLIENT limit
+    client = models.CharField(max_length=64, blank=True, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = TicketHoldQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['expires_at']
+
+    def __str__(self):
+        return f"{self.quantity} x {self.inventory.ticket_type} until {self.expires_at:%Y-%m-%d %H:%M}"
+
+    @property
+    def is_expired(self):
+        return self.expires_at <= timezone.now()
+
+    def release(self):
+        """Give the held stock back (checkout abandoned)"""
+        return bool(TicketHold.objects.filter(pk=self.pk).release())
+
+    def consume(self):
+        """Turn the hold into a sale; False if it was already released or swept"""
+        return bool(TicketHold.objects.filter(pk=self.pk).delete()[0])
 
 
 class Payment(models.Model):
@@ -191,7 +792,7 @@ class Payment(models.Model):
     notes = models.TextField(blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['-payment_date']
@@ -235,3 +836,44 @@ class Inquiry(models.Model):
 
     def __str__(self):
         return f"{self.name} - {self.inquiry_type}"
+
+
+class Tombstone(models.Model):
+    """Marks a deleted event, ticket, booking or payment for dashboard delta syncs.
+
+    Recorded by a post_delete signal, so cascades and admin deletes are covered.
+    Rows older than SYNC_TOMBSTONE_DAYS are pruned by `prune_sync_tombstones`.
+    """
+    model = models.CharField(max_length=20)
+    object_id = models.UUIDField()
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['deleted_at']
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class IdempotencyKey(models.Model):
+    """The response a write endpoint gave to a request carrying an Idempotency-Key.
+
+    Claimed (status_code empty) before the view runs and filled in with its
+    response afterwards, so a retry is either answered from this row or told
+    the first attempt is still running. See pw_website.idempotency.
+    """
+    scope = models.CharField(max_length=100)
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    body = models.BinaryField(blank=True, default=b'')
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key'], name='unique_idempotency_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.key}"
@@ -0,0 +1,114 @@
+"""Booking quote arithmetic, in exact Decimal and without touching the database.
+
+``quote()`` prices one package, guest count and delivery distance; the
+booking views store its figures when a quote is accepted. ``quote_matrix()``
+prices every combination of several packages, guest counts and distances in
+one call for browsing and comparison pages. It works a dimension at a time:
+the subtotal and VAT of each package and guest count and the delivery cost
+of each distance are computed once and combined per cell, and the result is
+returned as parallel columns rather than one dict per cell.
+
+Amounts are rounded half-up to kobo (two places), matching the Booking
+money columns.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+from itertools import product
+
+
+PACKAGE_RATES = {
+    'palmwine': Decimal('15000'),
+    'cocktails': Decimal('25000'),
+    'flame': Decimal('35000'),
+    'full': Decimal('50000'),
+}
+VAT_RATE = Decimal('0.075')
+DEPOSIT_RATE = Decimal('0.5')
+# Delivery is charged per km on the whole distance once it is beyond this
+DELIVERY_FREE_KM = 10
+DELIVERY_RATE_PER_KM = Decimal('500')
+
+# Largest matrix the API will price in one request
+MAX_MATRIX_CELLS = 2000
+
+QUOTE_FIELDS = ('subtotal', 'delivery_cost', 'tax', 'total', 'deposit_required')
+
+CENT = Decimal('0.01')
+
+
+def _money(value):
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _count(value, name):
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be a whole number')
+    if number < 0:
+        raise ValueError(f'{name} cannot be negative')
+    return number
+
+
+def _rate(package):
+    try:
+        return PACKAGE_RATES[package]
+    except KeyError:
+        raise ValueError(f'Unknown package: {package}')
+
+
+def _services(rate, guests):
+    """``(subtotal, tax)`` for the per-guest part of a quote"""
+    subtotal = _money(rate * guests)
+    return subtotal, _money(subtotal * VAT_RATE)
+
+
+def delivery_cost(distance_km):
+    if distance_km <= DELIVERY_FREE_KM:
+        return _money(Decimal(0))
+    return _money(DELIVERY_RATE_PER_KM * distance_km)
+
+
+def _combine(subtotal, tax, delivery):
+    total = subtotal + delivery + tax
+    return subtotal, delivery, tax, total, _money(total * DEPOSIT_RATE)
+
+
+def quote(package, guests, distance_km=0):
+    """The price of one booking as a dict of Decimals (see QUOTE_FIELDS).
+
+    Raises ValueError for an unknown package or a guest count or distance
+    that is not a non-negative whole number.
+    """
+    guests = _count(guests, 'guests')
+    distance_km = _count(distance_km, 'distance_km')
+    subtotal, tax = _services(_rate(package), guests)
+    return dict(zip(QUOTE_FIELDS, _combine(subtotal, tax, delivery_cost(distance_km))))
+
+
+def quote_matrix(packages, guest_counts, distances=(0,)):
+    """Price every package × guest count × distance.
+
+    Returns ``{'package': [...], 'guests': [...], 'distance_km': [...],
+    'subtotal': [...], ...}``: one list per column, all the same length, in
+    package, then guests, then distance order. Raises ValueError like
+    ``quote()`` and when the matrix would exceed MAX_MATRIX_CELLS.
+    """
+    rates = {package: _rate(package) for package in packages}
+    guest_counts = [_count(guests, 'guests') for guests in guest_counts]
+    distances = [_count(distance, 'distance_km') for distance in distances]
+    if len(rates) * len(guest_counts) * len(distances) > MAX_MATRIX_CELLS:
+        raise ValueError(f'A quote matrix is limited to {MAX_MATRIX_CELLS} prices')
+
+    services = {
+        (package, guests): _services(rate, guests)
+        for (package, rate), guests in product(rates.items(), guest_counts)
+    }
+    deliveries = {distance: delivery_cost(distance) for distance in distances}
+
+    columns = {name: [] for name in ('package', 'guests', 'distance_km') + QUOTE_FIELDS}
+    for package, guests, distance in product(rates, guest_counts, distances):
+        subtotal, tax = services[package, guests]
+        row = (package, guests, distance) + _combine(subtotal, tax, deliveries[distance])
+        for column, value in zip(columns.values(), row):
+            column.append(value)
+    return columns
@@ -0,0 +1,82 @@
+"""Shared QR encoding for tickets.
+
+Encoding a payload (mode selection, Reed-Solomon error correction, mask
+scoring) is the expensive part of producing a QR code, so the module matrix
+is computed once per payload and kept in a bounded LRU. PNG, SVG and the PDF
+generator all render from that cached matrix.
+"""
+import json
+from functools import lru_cache
+from io import BytesIO
+
+import qrcode
+from PIL import Image
+
+
+QR_CACHE_SIZE = 1024
+QR_BORDER = 4
+
+
+def ticket_qr_payload(code, reference='', quantity=1):
+    """Return the canonical string encoded in a ticket's QR code"""
+    return json.dumps(
+        {'code': code, 'ref': reference, 'quantity': quantity},
+        separators=(',', ':'),
+    )
+
+
+@lru_cache(maxsize=QR_CACHE_SIZE)
+def qr_matrix(payload):
+    """Return the QR module matrix for ``payload`` (rows of bools, border included)"""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        border=QR_BORDER,
+    )
+    qr.add_data(payload)
+    qr.make(fit=True)
+    return tuple(tuple(row) for row in qr.get_matrix())
+
+
+def dark_runs(modules):
+    """Yield ``(start, length)`` for each run of dark modules in a row"""
+    start = None
+    for i, dark in enumerate(modules):
+        if dark and start is None:
+            start = i
+        elif not dark and start is not None:
+            yield start, i - start
+            start = None
+    if start is not None:
+        yield start, len(modules) - start
+
+
+def qr_png(payload, box_size=10):
+    """Render ``payload`` as PNG bytes, ``box_size`` pixels per module"""
+    matrix = qr_matrix(payload)
+    size = len(matrix)
+    img = Image.new('1', (size, size), 1)
+    img.putdata([0 if dark else 1 for row in matrix for dark in row])
+    img = img.resize((size * box_size, size * box_size), Image.NEAREST)
+
+    buffer = BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def qr_svg(payload, box_size=10):
+    """Render ``payload`` as a standalone SVG document"""
+    matrix = qr_matrix(payload)
+    size = len(matrix)
+    path = ''.join(
+        f'M{start},{y}h{length}v1h-{length}z'
+        for y, row in enumerate(matrix)
+        for start, length in dark_runs(row)
+    )
+    pixels = size * box_size
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{pixels}" height="{pixels}" '
+        f'viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="#fff"/>'
+        f'<path d="{path}" fill="#000"/></svg>'
+    )
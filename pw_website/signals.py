@@ -0,0 +1,94 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .availability import invalidate_availability
+from .listing_cache import invalidate_listings, mark_inventory_changed
+from .live_updates import publish
+from .models import Booking, Event, Payment, Ticket, Tombstone, release_booking_slot
+from .ticket_cache import invalidate_tickets
+
+
+@receiver([post_save, post_delete], sender=Ticket)
+def invalidate_ticket_pdf(sender, instance, **kwargs):
+    """Rendered PDFs for a ticket are stale once the ticket changes"""
+    invalidate_tickets([instance.ticket_id])
+
+
+@receiver(post_save, sender=Event)
+def invalidate_event_ticket_pdfs(sender, instance, created, **kwargs):
+    """Event name, date and location are printed on every ticket of the event"""
+    # Deleting an event cascades to its tickets, which send their own post_delete
+    if created:
+        return
+    invalidate_tickets(instance.tickets.values_list('ticket_id', flat=True))
+
+
+@receiver([post_save, post_delete], sender=Event)
+def invalidate_event_listings(sender, instance, **kwargs):
+    """Event edits show up on the cached home/events pages straight away"""
+    invalidate_listings()
+
+
+@receiver([post_save, post_delete], sender=Ticket)
+def refresh_listing_inventory(sender, instance, **kwargs):
+    """Ticket sales may leave the listed figures stale for EVENT_LISTING_INVENTORY_TTL"""
+    mark_inventory_changed()
+
+
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=Ticket)
+@receiver(post_delete, sender=Booking)
+@receiver(post_delete, sender=Payment)
+def record_sync_tombstone(sender, instance, **kwargs):
+    """Let dashboard delta syncs know the row is gone"""
+    Tombstone.objects.create(model=sender._meta.model_name, object_id=instance.pk)
+
+
+@receiver(post_delete, sender=Ticket)
+def remove_ticket_from_counters(sender, instance, origin=None, **kwargs):
+    """Take the ticket out of its event's counters and the daily sales rollup.
+
+    Queryset and admin deletes skip Ticket.delete. When the whole event is
+    deleted its counters and rollup rows go with it, so there is nothing to do.
+    """
+    if isinstance(origin, Event) or getattr(origin, 'model', None) is Event:
+        return
+    instance._remove_from_counters()
+
+
+@receiver(post_delete, sender=Ticket)
+def touch_event_on_ticket_delete(sender, instance, **kwargs):
+    """The event's availability changed, so it belongs in the next delta sync"""
+    Event.objects.filter(pk=instance.event_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Booking)
+def push_booking_change(sender, instance, created, **kwargs):
+    """New bookings and status changes show up on live dashboards"""
+    publish('booking', {
+        'id': str(instance.id),
+        'quote_id': instance.quote_id,
+        'status': instance.status,
+        'created': created,
+    })
+
+
+@receiver(post_delete, sender=Booking)
+def free_booking_slot(sender, instance, **kwargs):
+    """Give the day's slot back (queryset and admin deletes skip Booking.delete)"""
+    day = instance._slot_day()
+    if day:
+        release_booking_slot(day)
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def refresh_booking_availability(sender, instance, **kwargs):
+    """The booking may fill or free a slot on its date"""
+    invalidate_availability(instance.event_date)
+
+
+@receiver([post_save, post_delete], sender=Event)
+def refresh_event_availability(sender, instance, **kwargs):
+    """Days with an active event are not open for bookings"""
+    invalidate_availability(instance.date)
@@ -1,3 +1,1245 @@
-from django.test import TestCase
+import asyncio
+import base64
+import json
+import re
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from reportlab import rl_config
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from .csv_export import export_rows, iter_csv
+from .dashboard_summary import build_summary
+from .delta_sync import encode_token, prune_tombstones
+from .idempotency import _request_hash
+from .list_fields import event_values
+from .live_updates import MESSAGE_KEY, SEQUENCE_KEY, publish, stream
+from .models import (
+    EVENT_COUNTER_FIELDS, Booking, BookingDay, DailySalesRollup, Event, IdempotencyKey, Payment, Ticket, TicketHold,
+    TicketInventory, TicketQuerySet, Tombstone, event_counter_totals,
+)
+from .ticket_generator import generate_ticket_pdf, generate_tickets_pdf
+from .pricing import PACKAGE_RATES, QUOTE_FIELDS, quote, quote_matrix
+from .ticket_payload import PAYLOAD_PREFIX, sign_ticket_payload
+from .views import MAX_BATCH_VERIFY_CODES
+
+
+def make_event(**kwargs):
+    fields = {
+        'name': 'Bush Party',
+        'description': 'Test event',
+        'event_type': 'bush_party',
+        'date': timezone.now() + timedelta(days=7),
+        'location': 'Lagos',
+        'max_capacity': 100,
+    }
+    fields.update(kwargs)
+    return Event.objects.create(**fields)
+
+
+def make_ticket(event, code, **kwargs):
+    fields = {
+        'ticket_id': code,
+        'event': event,
+        'customer_name': 'Ada',
+        'customer_email': 'ada@example.com',
+        'quantity': 1,
+        'amount_paid': 5000,
+    }
+    fields.update(kwargs)
+    return Ticket.objects.create(**fields)
+
+
+def booking_payload(quote_id, day, **kwargs):
+    fields = {
+        'quote_id': quote_id,
+        'client_name': 'Ada',
+        'phone': '08000000000',
+        'event_type': 'birthday',
+        'event_date': day.isoformat(),
+        'venue': 'Lekki',
+        'guests': 50,
+        'package_type': 'palmwine',
+        'payment_amount': '1000.00',
+        'payment_reference': f'PAY-{quote_id}',
+    }
+    fields.update(kwargs)
+    return json.dumps(fields)
+
+
+def make_booking(quote_id, day, **kwargs):
+    fields = {
+        'quote_id': quote_id,
+        'client_name': 'Ada',
+        'phone': '08000000000',
+        'event_type': 'birthday',
+        'event_date': day,
+        'venue': 'Lekki',
+        'guests': 50,
+        'package_type': 'palmwine',
+    }
+    fields.update(kwargs)
+    return Booking.objects.create(**fields, **quote(fields['package_type'], fields['guests'], 0))
+
+
+class CheckInTests(TestCase):
+    def setUp(self):
+        self.event = make_event()
+        self.ticket = make_ticket(self.event, 'PMF-CHECKIN', quantity=2)
+        self.tickets = Ticket.objects.filter(pk=self.ticket.pk)
+
+    def test_second_check_in_changes_nothing(self):
+        self.assertEqual(self.tickets.check_in('gate-1'), 1)
+        self.assertEqual(self.tickets.check_in('gate-2'), 0)
+
+        self.ticket.refresh_from_db()
+        self.assertTrue(self.ticket.verified)
+        self.assertEqual(self.ticket.verified_by, 'gate-1')
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.verified_quantity, 2)
+
+    def test_reset_check_in(self):
+        self.tickets.check_in('gate-1')
+
+        self.assertEqual(self.tickets.reset_check_in(), 1)
+        self.assertEqual(self.tickets.reset_check_in(), 0)
+
+        self.ticket.refresh_from_db()
+        self.assertFalse(self.ticket.verified)
+        self.assertIsNone(self.ticket.verified_at)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.verified_quantity, 0)
+        # The ticket can be checked in again after a reset
+        self.assertEqual(self.tickets.check_in('gate-2'), 1)
+
+    def test_racing_scans_admit_the_ticket_once(self):
+        original = TicketQuerySet._set_verified
+        raced, other_gate = [], []
+
+        def other_gate_scans_first(queryset, *args, **kwargs):
+            # Without row locks (SQLite) a second gate can check the ticket in
+            # between this scan's read and its UPDATE
+            if not raced:
+                raced.append(True)
+                other_gate.append(self.tickets.check_in_one('gate-2'))
+            return original(queryset, *args, **kwargs)
+
+        with mock.patch.object(TicketQuerySet, '_set_verified', other_gate_scans_first):
+            ticket, newly_verified = self.tickets.check_in_one('gate-1')
+
+        self.assertTrue(other_gate[0][1])
+        self.assertFalse(newly_verified)
+        self.assertEqual(ticket.verified_by, 'gate-2')
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.verified_quantity, 2)
+        self.assertEqual(DailySalesRollup.objects.get(event=self.event).checkins, 2)
+
+    def test_verify_api_answers_from_the_locked_read(self):
+        url = '/api/verify-ticket/'
+        first = self.client.post(url, json.dumps({'code': 'PMF-CHECKIN'}), content_type='application/json').json()
+
+        with self.assertNumQueries(3):
+            second = self.client.post(url, json.dumps({'code': 'PMF-CHECKIN'}), content_type='application/json')
+
+        self.assertFalse(first['already_verified'])
+        self.assertTrue(second.json()['already_verified'])
+        self.assertEqual(second.json()['ticket_info']['code'], 'PMF-CHECKIN')
+
+    def test_half_verified_ticket_can_be_checked_in(self):
+        Ticket.objects.filter(pk=self.ticket.pk).update(verified=True, verified_at=None)
+
+        self.assertEqual(self.tickets.check_in('gate-1'), 1)
+        self.ticket.refresh_from_db()
+        self.assertIsNotNone(self.ticket.verified_at)
+
+
+class GateScanUploadTests(TestCase):
+    def setUp(self):
+        self.event = make_event()
+        make_ticket(self.event, 'PMF-GATE-1')
+        make_ticket(self.event, 'PMF-GATE-2')
+        self.client = Client(enforce_csrf_checks=True)
+        self.client.force_login(User.objects.create_user('gatekeeper', password='secret'))
+        self.url = f'/api/events/{self.event.id}/gate-scans/'
+
+    def upload(self, scans, csrf=True):
+        headers = {}
+        if csrf:
+            self.client.get('/login/')
+            headers['X-CSRFToken'] = self.client.cookies['csrftoken'].value
+        return self.client.post(
+            self.url, json.dumps({'device_id': 'gate-1', 'scans': scans}),
+            content_type='application/json', headers=headers,
+        )
+
+    def test_upload_needs_csrf_token(self):
+        response = self.upload([{'code': 'PMF-GATE-1'}], csrf=False)
+
+        # CSRF_FAILURE_VIEW redirects instead of answering 403
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Ticket.objects.get(ticket_id='PMF-GATE-1').verified)
+
+    def test_bad_scans_are_rejected_individually(self):
+        response = self.upload([
+            {'code': 'PMF-GATE-1', 'scanned_at': '2026-13-40T00:00:00'},
+            {'code': ['PMF-GATE-1']},
+            {'code': {'code': 'PMF-GATE-1'}},
+            {'code': 'PMF-GATE-2', 'scanned_at': '2026-01-10T21:14:03+01:00'},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([scan['code'] for scan in data['admitted']], ['PMF-GATE-2'])
+        self.assertEqual(len(data['rejected']), 3)
+        self.assertFalse(Ticket.objects.get(ticket_id='PMF-GATE-1').verified)
+
+
+class BatchVerifyTests(TestCase):
+    url = '/api/verify-ticket/batch/'
+
+    def setUp(self):
+        self.event = make_event()
+        make_ticket(self.event, 'PMF-BATCH-1', quantity=2)
+        make_ticket(self.event, 'PMF-BATCH-2')
+        make_ticket(self.event, 'PMF-BATCH-USED')
+        Ticket.objects.filter(ticket_id='PMF-BATCH-USED').check_in('gate-0')
+
+    def verify(self, codes):
+        return self.client.post(self.url, json.dumps({'codes': codes}), content_type='application/json')
+
+    def test_duplicates_and_used_codes(self):
+        response = self.verify(['PMF-BATCH-1', 'PMF-BATCH-1', 'PMF-BATCH-USED', 'PMF-BATCH-2', 'PMF-NOPE'])
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['verified_count'], 2)
+        results = data['results']
+        self.assertEqual([r['code'] for r in results],
+                         ['PMF-BATCH-1', 'PMF-BATCH-1', 'PMF-BATCH-USED', 'PMF-BATCH-2', 'PMF-NOPE'])
+        # The first occurrence admits the ticket, the repeat reports it as used
+        self.assertFalse(results[0]['already_verified'])
+        self.assertTrue(results[1]['already_verified'])
+        self.assertTrue(results[2]['already_verified'])
+        self.assertIn('gate-0', results[2]['message'])
+        self.assertFalse(results[3]['already_verified'])
+        self.assertFalse(results[4]['valid'])
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.verified_quantity, 4)
+
+    def test_second_batch_admits_nothing(self):
+        self.verify(['PMF-BATCH-1', 'PMF-BATCH-2'])
+        data = self.verify(['PMF-BATCH-2', 'PMF-BATCH-1']).json()
+
+        self.assertEqual(data['verified_count'], 0)
+        self.assertTrue(all(r['already_verified'] for r in data['results']))
+
+    def test_page_sends_codes_in_groups_the_api_accepts(self):
+        response = self.client.get('/verify/')
+
+        self.assertContains(response, f'const BATCH_VERIFY_SIZE = {MAX_BATCH_VERIFY_CODES};')
+
+    def test_malformed_codes_do_not_fail_the_batch(self):
+        data = self.verify([['PMF-BATCH-1'], {'code': 'PMF-BATCH-1'}, 'PMF-BATCH-2']).json()
+
+        self.assertEqual([r['valid'] for r in data['results']], [False, False, True])
+        self.assertEqual(data['verified_count'], 1)
+
+
+class EventInventoryTests(TestCase):
+    def test_with_inventory_preloads_ticket_types(self):
+        for index in range(2):
+            event = make_event(name=f'Event {index}')
+            make_ticket(event, f'PMF-SOLD-{index}', verified=True)
+            for number in range(3):
+                make_ticket(event, f'PMF-FREE-{index}-{number}', customer_name='',
+                            ticket_type='vip' if number else 'regular', price_per_ticket=5000 * (number + 1))
+
+        with self.assertNumQueries(2):
+            events = list(Event.objects.with_inventory())
+            types = [event.available_ticket_types for event in events]
+
+        self.assertEqual([event.inventory_tickets_sold for event in events], [1, 1])
+        self.assertEqual(sorted((t['type'], t['available']) for t in types[0]), [('regular', 1), ('vip', 2)])
+
+    def test_event_values_skip_the_prefetch(self):
+        make_ticket(make_event(), 'PMF-SOLD', verified=True)
+
+        rows = list(event_values(Event.objects.all(), ['id', 'inventory_tickets_sold']))
+        self.assertEqual(rows[0]['inventory_tickets_sold'], 1)
+
+
+class TicketCounterTests(TestCase):
+    def setUp(self):
+        self.event = make_event()
+        make_ticket(self.event, 'PMF-COUNT-1', quantity=2)
+        make_ticket(self.event, 'PMF-COUNT-2', quantity=3)
+        make_ticket(self.event, 'PMF-COUNT-FREE', customer_name='', amount_paid=0)
+        Ticket.objects.filter(ticket_id='PMF-COUNT-1').check_in('gate-1')
+
+    def assertCountersMatchTickets(self):
+        self.event.refresh_from_db()
+        totals = event_counter_totals([self.event.pk]).get(self.event.pk, dict.fromkeys(EVENT_COUNTER_FIELDS, 0))
+        self.assertEqual({field: getattr(self.event, field) for field in EVENT_COUNTER_FIELDS}, totals)
+        rollup = DailySalesRollup.objects.filter(event=self.event).aggregate(
+            quantity_sold=Sum('quantity_sold'), checkins=Sum('checkins')
+        )
+        self.assertEqual(rollup['quantity_sold'] or 0, totals['sold_quantity'])
+        self.assertEqual(rollup['checkins'] or 0, totals['verified_quantity'])
+
+    def test_queryset_delete_updates_counters(self):
+        self.assertCountersMatchTickets()
+
+        Ticket.objects.filter(ticket_id__in=['PMF-COUNT-1', 'PMF-COUNT-FREE']).delete()
+
+        self.assertCountersMatchTickets()
+        self.assertEqual(self.event.sold_quantity, 3)
+        self.assertEqual(self.event.verified_quantity, 0)
+
+    def test_instance_delete_counts_the_stored_row(self):
+        ticket = Ticket.objects.get(ticket_id='PMF-COUNT-2')
+        Ticket.objects.filter(pk=ticket.pk).check_in('gate-2')
+
+        # ticket still thinks it is unverified
+        ticket.delete()
+
+        self.assertCountersMatchTickets()
+        self.assertEqual(self.event.verified_quantity, 2)
+
+    def test_event_delete_cascades(self):
+        self.event.delete()
+
+        self.assertFalse(DailySalesRollup.objects.exists())
+
+
+class EventStatsTests(TestCase):
+    def test_public_stats_leave_out_revenue(self):
+        event = make_event()
+        make_ticket(event, 'PMF-STATS-1', quantity=2)
+
+        data = self.client.get(f'/api/event-stats/{event.id}/').json()
+
+        self.assertEqual(data['tickets_sold'], 2)
+        self.assertNotIn('revenue', data)
+
+
+class TicketHoldTests(TestCase):
+    url = '/api/ticket-holds/'
+
+    def setUp(self):
+        self.event = make_event()
+        self.inventory = TicketInventory.objects.create(
+            event=self.event, ticket_type='vip', price_per_ticket=10000, total_quantity=5, remaining_quantity=5
+        )
+
+    def remaining(self):
+        self.inventory.refresh_from_db()
+        return self.inventory.remaining_quantity
+
+    def post_hold(self, quantity, ticket_type='vip', **headers):
+        return self.client.post(self.url, json.dumps({
+            'event_id': str(self.event.id), 'ticket_type': ticket_type, 'quantity': quantity,
+        }), content_type='application/json', headers=headers)
+
+    def store_ticket(self, code, ticket_type, hold=None):
+        return self.client.post('/api/store-ticket/', json.dumps({
+            'code': code, 'ref': f'REF-{code}', 'customerName': 'Ada', 'amount': '10000', 'quantity': 1,
+            'event_id': str(self.event.id), 'ticket_type': ticket_type, 'hold': hold,
+        }), content_type='application/json')
+
+    def test_reserve_stops_at_zero(self):
+        self.assertTrue(self.inventory.reserve(4))
+        self.assertFalse(self.inventory.reserve(2))
+        self.assertTrue(self.inventory.reserve(1))
+        self.assertEqual(self.remaining(), 0)
+
+    def test_hold_sold_out_is_409(self):
+        self.assertEqual(self.post_hold(4).status_code, 200)
+
+        response = self.post_hold(2)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['remaining'], 1)
+        self.assertEqual(TicketHold.objects.count(), 1)
+
+    def test_expired_holds_are_swept_for_new_buyers(self):
+        hold = self.inventory.hold(5, ttl=-1)
+
+        self.assertIsNotNone(self.inventory.hold(3))
+        self.assertEqual(self.remaining(), 2)
+        # The swept hold can no longer be used or given back
+        self.assertFalse(hold.consume())
+        self.assertFalse(hold.release())
+        self.assertEqual(self.remaining(), 2)
+
+    def test_consume_and_release_happen_once(self):
+        sold, abandoned = self.inventory.hold(2), self.inventory.hold(2)
+        self.assertEqual(self.remaining(), 1)
+
+        self.assertTrue(sold.consume())
+        self.assertFalse(sold.consume())
+        self.assertFalse(sold.release())
+        self.assertTrue(abandoned.release())
+        self.assertFalse(abandoned.release())
+        self.assertEqual(self.remaining(), 3)
+
+    def test_expired_hold_can_still_be_consumed_before_the_sweep(self):
+        hold = self.inventory.hold(2, ttl=-1)
+
+        self.assertTrue(hold.is_expired)
+        self.assertTrue(hold.consume())
+        self.assertEqual(TicketHold.objects.expired().release(), 0)
+        self.assertEqual(self.remaining(), 3)
+
+    def test_type_without_stock_is_refused(self):
+        response = self.post_hold(1, ticket_type='regular')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.remaining(), 5)
+
+    def test_sale_of_another_type_does_not_use_the_hold(self):
+        hold = self.inventory.hold(1)
+
+        response = self.store_ticket('PMF-MISMATCH', 'regular', hold=str(hold.id))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Ticket.objects.filter(ticket_id='PMF-MISMATCH').exists())
+        self.assertTrue(TicketHold.objects.filter(pk=hold.pk).exists())
+        self.assertEqual(self.remaining(), 4)
+
+    def test_sale_without_a_type_uses_the_only_row(self):
+        response = self.store_ticket('PMF-UNTYPED', '')
+
+        self.assertEqual(response.status_code, 200)
+        ticket = Ticket.objects.get(ticket_id='PMF-UNTYPED')
+        self.assertEqual((ticket.ticket_type, ticket.price_per_ticket), ('vip', 10000))
+        self.assertEqual(self.remaining(), 4)
+
+    @override_settings(TICKET_MAX_PER_ORDER=3)
+    def test_hold_quantity_is_capped(self):
+        response = self.post_hold(4)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.remaining(), 5)
+
+    @override_settings(TICKET_HOLDS_PER_CLIENT=2)
+    def test_open_holds_are_limited_per_address(self):
+        self.assertEqual(self.post_hold(1).status_code, 200)
+        self.assertEqual(self.post_hold(1).status_code, 200)
+        self.assertEqual(self.post_hold(1).status_code, 429)
+        # Another buyer is not affected
+        self.assertEqual(self.post_hold(1, **{'X-Forwarded-For': '203.0.113.9'}).status_code, 200)
+
+        TicketHold.objects.filter(client='127.0.0.1').first().release()
+        self.assertEqual(self.post_hold(1).status_code, 200)
+
+
+class CsvExportTests(TestCase):
+    def test_formula_text_is_escaped(self):
+        event = make_event()
+        make_ticket(event, 'PMF-CSV-1', customer_name='=HYPERLINK("http://x.test","hi")', customer_email='@evil.test')
+        make_ticket(event, 'PMF-CSV-2', customer_name='-Ada', phone='+2348000000000')
+
+        lines = ''.join(iter_csv('tickets', export_rows('tickets', event_id=event.id))).splitlines()
+
+        self.assertIn("'=HYPERLINK", lines[1])
+        self.assertIn("'@evil.test", lines[1])
+        self.assertIn("'-Ada", lines[2])
+        self.assertIn("'+2348000000000", lines[2])
+        self.assertIn('5000.00', lines[1])
+
+
+class AvailabilityTests(TestCase):
+    url = '/api/availability/'
+
+    def test_month_out_of_range_is_400(self):
+        for month in ('9999-12', '0001-01', '2026-13', 'soon'):
+            with self.subTest(month=month):
+                self.assertEqual(self.client.get(self.url, {'month': month}).status_code, 400)
+
+    def test_month_in_range(self):
+        response = self.client.get(self.url, {'month': '2100-12'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['days']), 31)
+
+    def test_single_day_out_of_range_is_400(self):
+        response = self.client.get('/api/check-availability/', {'date': '9999-12-31'})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class IdempotencyTests(TestCase):
+    url = '/api/bookings/'
+
+    def setUp(self):
+        self.day = timezone.localdate() + timedelta(days=30)
+        self.body = booking_payload('PMF-Q-IDEM', self.day)
+
+    def post(self, body, key='pay-123'):
+        return self.client.post(self.url, body, content_type='application/json', headers={'Idempotency-Key': key})
+
+    def test_replay_returns_the_stored_response(self):
+        first = self.post(self.body)
+        second = self.post(self.body)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertNotIn('Idempotent-Replayed', first)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_key_reused_with_another_body_is_422(self):
+        self.post(self.body)
+
+        response = self.post(booking_payload('PMF-Q-OTHER', self.day))
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_key_still_in_flight_is_409(self):
+        # The first attempt has claimed the key but not answered yet
+        request = RequestFactory().post(self.url, self.body, content_type='application/json')
+        IdempotencyKey.objects.create(scope='bookings_api', key='pay-123', request_hash=_request_hash(request))
+
+        response = self.post(self.body)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Booking.objects.exists())
+
+    def test_failed_attempt_releases_the_key(self):
+        self.assertEqual(self.post(booking_payload('PMF-Q-IDEM', self.day, event_date='soon')).status_code, 400)
+
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+@override_settings(BOOKINGS_PER_DAY=2)
+class BookingCapTests(TestCase):
+    url = '/api/bookings/'
+
+    def setUp(self):
+        self.day = timezone.localdate() + timedelta(days=30)
+
+    def book(self, quote_id):
+        return self.client.post(self.url, booking_payload(quote_id, self.day), content_type='application/json')
+
+    def set_status(self, booking_id, status):
+        return self.client.post(
+            f'/api/bookings/{booking_id}/status/', json.dumps({'status': status}), content_type='application/json'
+        )
+
+    def booked(self):
+        return BookingDay.objects.get(day=self.day).booked
+
+    def test_third_booking_on_a_full_day_is_409(self):
+        self.assertEqual(self.book('PMF-Q-1').status_code, 200)
+        self.assertEqual(self.book('PMF-Q-2').status_code, 200)
+
+        response = self.book('PMF-Q-3')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Booking.objects.filter(event_date=self.day).count(), 2)
+        self.assertEqual(self.booked(), 2)
+
+    def test_cancelling_frees_the_slot(self):
+        booking_id = self.book('PMF-Q-1').json()['booking_id']
+        self.book('PMF-Q-2')
+
+        response = self.set_status(booking_id, 'cancelled')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.booked(), 1)
+        self.assertEqual(self.book('PMF-Q-3').status_code, 200)
+
+    def test_reopening_a_cancelled_booking_needs_a_slot(self):
+        booking_id = self.book('PMF-Q-1').json()['booking_id']
+        self.set_status(booking_id, 'cancelled')
+        self.book('PMF-Q-2')
+        self.book('PMF-Q-3')
+
+        response = self.set_status(booking_id, 'pending')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Booking.objects.get(pk=booking_id).status, 'cancelled')
+
+    def test_deleting_frees_the_slot(self):
+        self.book('PMF-Q-1')
+        self.book('PMF-Q-2')
+
+        Booking.objects.filter(quote_id='PMF-Q-1').delete()
+        self.assertEqual(self.booked(), 1)
+        Booking.objects.get(quote_id='PMF-Q-2').delete()
+        self.assertEqual(self.booked(), 0)
+        self.assertEqual(self.book('PMF-Q-3').status_code, 200)
+
+    def test_deleting_a_cancelled_booking_frees_nothing(self):
+        self.set_status(self.book('PMF-Q-1').json()['booking_id'], 'cancelled')
+        self.book('PMF-Q-2')
+
+        Booking.objects.filter(quote_id='PMF-Q-1').delete()
+
+        self.assertEqual(self.booked(), 1)
+
+
+def ticket_data(code, event_name='Bush Party'):
+    return {
+        'code': code,
+        'reference': f'REF-{code}',
+        'customer_name': 'Ada',
+        'quantity': 1,
+        'amount': 5000.0,
+        'event': {'name': event_name, 'date': 'Saturday', 'location': 'Lagos'},
+    }
+
+
+class TicketPdfTests(TestCase):
+    def test_render_leaves_the_global_stream_setting_alone(self):
+        before = rl_config.useA85
+
+        pdf = generate_ticket_pdf(ticket_data('PMF-PDF-1')).getvalue()
+
+        self.assertEqual(rl_config.useA85, before)
+        self.assertTrue(pdf.startswith(b'%PDF'))
+        self.assertNotIn(b'/ASCII85Decode', pdf)
+
+    def test_tickets_of_one_event_share_one_background_form(self):
+        pdf = generate_tickets_pdf([ticket_data('PMF-PDF-1'), ticket_data('PMF-PDF-2')], BytesIO()).getvalue()
+
+        self.assertEqual(len(re.findall(rb'/Type /Page\b', pdf)), 2)
+        self.assertEqual(len(re.findall(rb'/Subtype /Form\b', pdf)), 1)
+        self.assertEqual(len(re.findall(rb'/Subtype /Image\b', pdf)), 1)
+
+    def test_each_event_gets_its_own_form(self):
+        pdf = generate_tickets_pdf([ticket_data('PMF-PDF-1'), ticket_data('PMF-PDF-2', 'Other')], BytesIO()).getvalue()
+
+        self.assertEqual(len(re.findall(rb'/Subtype /Form\b', pdf)), 2)
+
+
+class TicketExportTests(TestCase):
+    def setUp(self):
+        self.event = make_event()
+        for number in range(3):
+            make_ticket(self.event, f'PMF-EXPORT-{number}')
+        self.client.force_login(User.objects.create_user('staff', password='secret'))
+        self.url = f'/api/events/{self.event.id}/tickets/export/'
+
+    def test_pdf_export_has_a_page_per_ticket(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        pdf = b''.join(response.streaming_content)
+        self.assertTrue(pdf.startswith(b'%PDF'))
+        self.assertTrue(pdf.rstrip().endswith(b'%%EOF'))
+        self.assertEqual(len(re.findall(rb'/Type /Page\b', pdf)), 3)
+        self.assertIn(b'/Count 3', pdf)
+
+    @override_settings(TICKET_EXPORT_PDF_MAX_TICKETS=2)
+    def test_large_pdf_export_is_refused(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'format': 'zip'}).status_code, 200)
+
+
+@override_settings(LIVE_POLL_SECONDS=0.01, LIVE_STREAM_SECONDS=0.1)
+class LiveUpdatesTests(TestCase):
+    def setUp(self):
+        cache.delete(SEQUENCE_KEY)
+
+    def publish(self, *messages):
+        with self.captureOnCommitCallbacks(execute=True):
+            for kind, data in messages:
+                publish(kind, data)
+
+    def frames(self, last_seq=None, event_id=None):
+        """``(id, event, data)`` of every message frame one stream sends"""
+        async def read():
+            return [frame async for frame in stream(last_seq, event_id)]
+
+        frames = []
+        for frame in asyncio.run(read()):
+            fields = dict(line.split(': ', 1) for line in frame.strip().splitlines() if ': ' in line)
+            if 'event' in fields:
+                frames.append((int(fields['id']), fields['event'], json.loads(fields['data'])))
+        return frames
+
+    def test_messages_are_numbered_and_replayed_in_order(self):
+        self.publish(('sale', {'event_id': 'a', 'tickets_sold': 1}), ('checkin', {'event_id': 'b'}))
+        self.publish(('booking', {'id': 'x'}))
+
+        self.assertEqual(self.frames(last_seq=0), [
+            (1, 'sale', {'event_id': 'a', 'tickets_sold': 1}),
+            (2, 'checkin', {'event_id': 'b'}),
+            (3, 'booking', {'id': 'x'}),
+        ])
+        self.assertEqual([frame[0] for frame in self.frames(last_seq=2)], [3])
+
+    def test_messages_wait_for_the_commit(self):
+        publish('sale', {'event_id': 'a'})
+
+        self.assertEqual(cache.get(SEQUENCE_KEY, 0), 0)
+
+    def test_event_stream_skips_other_events(self):
+        self.publish(('sale', {'event_id': 'a'}), ('sale', {'event_id': 'b'}), ('booking', {'id': 'x'}))
+
+        self.assertEqual(self.frames(last_seq=0, event_id='b'), [(2, 'sale', {'event_id': 'b'})])
+
+    def test_new_stream_starts_at_the_end_of_the_log(self):
+        self.publish(('sale', {'event_id': 'a'}))
+
+        self.assertEqual(self.frames(), [])
+
+    def test_lost_messages_ask_for_a_reset(self):
+        self.publish(('sale', {'event_id': 'a'}), ('sale', {'event_id': 'a'}))
+        cache.delete(MESSAGE_KEY.format(1))
+
+        self.assertEqual(self.frames(last_seq=0), [(2, 'reset', {})])
+        # A stream ahead of the log (cache flushed) is reset too
+        self.assertEqual(self.frames(last_seq=50), [(2, 'reset', {})])
+
+
+def retarget_payload(payload, code):
+    """``payload`` with its ticket code swapped for ``code``, keeping the original signature"""
+    token = payload[len(PAYLOAD_PREFIX):]
+    raw = base64.b32decode(token + '=' * (-len(token) % 8))
+    old_code = raw[19:-8]
+    body = raw[:19] + code.encode('utf-8').ljust(len(old_code), b'-')[:len(old_code)]
+    return PAYLOAD_PREFIX + base64.b32encode(body + raw[-8:]).decode('ascii').rstrip('=')
+
+
+class SignedQrTests(TestCase):
+    def setUp(self):
+        self.event = make_event()
+        self.ticket = make_ticket(self.event, 'PMF-SIGN-1', quantity=2)
+        make_ticket(self.event, 'PMF-SIGN-2')
+        self.payload = sign_ticket_payload('PMF-SIGN-1', self.event.id, 2)
+
+    def verify(self, code):
+        return self.client.post('/api/verify-ticket/', json.dumps({'code': code}), content_type='application/json')
+
+    def assertNotCheckedIn(self, *codes):
+        self.assertFalse(Ticket.objects.filter(ticket_id__in=codes, verified=True).exists())
+
+    def test_signed_payload_checks_the_ticket_in(self):
+        response = self.verify(self.payload)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['ticket_info']['code'], 'PMF-SIGN-1')
+        self.assertTrue(Ticket.objects.get(ticket_id='PMF-SIGN-1').verified)
+
+    def test_tampered_payload_is_rejected(self):
+        forged = retarget_payload(self.payload, 'PMF-SIGN-2')
+        middle = len(self.payload) // 2
+        flipped = self.payload[:middle] + ('A' if self.payload[middle] != 'A' else 'B') + self.payload[middle + 1:]
+
+        for payload in (forged, flipped, self.payload[:12]):
+            with self.subTest(payload=payload):
+                self.assertEqual(self.verify(payload).status_code, 400)
+        self.assertNotCheckedIn('PMF-SIGN-1', 'PMF-SIGN-2')
+
+    def test_payload_signed_with_another_key_is_rejected(self):
+        with override_settings(TICKET_SIGNING_KEY='not-our-key'):
+            foreign = sign_ticket_payload('PMF-SIGN-1', self.event.id, 2)
+
+        self.assertEqual(self.verify(foreign).status_code, 400)
+        self.assertNotCheckedIn('PMF-SIGN-1')
+
+    def test_payload_for_another_event_is_rejected(self):
+        other = sign_ticket_payload('PMF-SIGN-1', make_event(name='Other').id, 2)
+
+        self.assertEqual(self.verify(other).status_code, 400)
+        self.assertNotCheckedIn('PMF-SIGN-1')
+
+    def test_batch_and_gate_uploads_reject_forged_payloads(self):
+        forged = retarget_payload(self.payload, 'PMF-SIGN-2')
+
+        batch = self.client.post('/api/verify-ticket/batch/', json.dumps({'codes': [forged]}),
+                                 content_type='application/json').json()
+        self.assertFalse(batch['results'][0]['valid'])
+
+        self.client.force_login(User.objects.create_user('gatekeeper', password='secret'))
+        gate = self.client.post(f'/api/events/{self.event.id}/gate-scans/', json.dumps({
+            'device_id': 'gate-1', 'scans': [{'code': forged}],
+        }), content_type='application/json').json()
+        self.assertEqual(gate['admitted'], [])
+        self.assertEqual(len(gate['rejected']), 1)
+        self.assertNotCheckedIn('PMF-SIGN-1', 'PMF-SIGN-2')
+
+    def test_plain_and_legacy_codes_still_verify(self):
+        self.assertEqual(self.verify('PMF-SIGN-1').json()['already_verified'], False)
+        legacy = json.dumps({'code': 'PMF-SIGN-2', 'reference': 'REF', 'quantity': 1})
+        self.assertEqual(self.verify(legacy).json()['already_verified'], False)
+        self.assertEqual(Ticket.objects.filter(verified=True).count(), 2)
+
+
+class KeysetPagingTests(TestCase):
+    def setUp(self):
+        event = make_event()
+        same_moment = timezone.now() - timedelta(hours=1)
+        for i in range(7):
+            make_ticket(event, f'PMF-PAGE-{i}')
+        # Most rows share a purchase_date so the pages have to split on id
+        Ticket.objects.exclude(ticket_id='PMF-PAGE-6').update(purchase_date=same_moment)
+
+        today = timezone.localdate()
+        for i in range(5):
+            make_booking(f'PMF-Q-{i}', today + timedelta(days=30 + i))
+        Booking.objects.update(created_at=same_moment)
+
+    def walk(self, url, limit):
+        seen, cursor = [], None
+        for _ in range(10):
+            params = {'limit': limit}
+            if cursor:
+                params['cursor'] = cursor
+            page = self.client.get(url, params).json()
+            self.assertLessEqual(len(page['results']), limit)
+            seen += [row['id'] for row in page['results']]
+            cursor = page['next']
+            if cursor is None:
+                return seen
+        self.fail('paging did not finish')
+
+    def test_pages_cover_every_ticket_once_despite_equal_timestamps(self):
+        ids = self.walk('/api/tickets/', limit=2)
+
+        expected = [str(pk) for pk in Ticket.objects.order_by('-purchase_date', '-id').values_list('id', flat=True)]
+        self.assertEqual(ids, expected)
+
+    def test_pages_cover_every_booking_once_despite_equal_timestamps(self):
+        ids = self.walk('/api/bookings/', limit=2)
+
+        expected = [str(pk) for pk in Booking.objects.order_by('-created_at', '-id').values_list('id', flat=True)]
+        self.assertEqual(ids, expected)
+
+    def test_malformed_cursor_or_limit_is_400(self):
+        junk_cursor = base64.urlsafe_b64encode(b'no separator').decode('ascii')
+        for url in ('/api/tickets/', '/api/bookings/'):
+            for params in ({'cursor': 'not a cursor!'}, {'cursor': junk_cursor}, {'limit': 'ten'}, {'limit': 0}):
+                with self.subTest(url=url, params=params):
+                    self.assertEqual(self.client.get(url, params).status_code, 400)
+
+    def test_all_returns_the_legacy_array(self):
+        tickets = self.client.get('/api/tickets/', {'all': '1'}).json()
+        bookings = self.client.get('/api/bookings/', {'all': '1'}).json()
+
+        self.assertIsInstance(tickets, list)
+        self.assertEqual(len(tickets), 7)
+        self.assertEqual(tickets[0]['ticket_id'], 'PMF-PAGE-6')
+        self.assertIsInstance(bookings, list)
+        self.assertEqual(len(bookings), 5)
+
+
+class DeltaSyncTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('staff', password='secret'))
+        self.event = make_event()
+        self.ticket = make_ticket(self.event, 'PMF-SYNC-1')
+        self.booking = make_booking('PMF-Q-SYNC', timezone.localdate() + timedelta(days=30))
+        self.booking_payment = self.payment(booking=self.booking)
+        self.ticket_payment = self.payment(ticket=make_ticket(self.event, 'PMF-SYNC-2'))
+
+    def payment(self, **kwargs):
+        return Payment.objects.create(
+            payer_name='Ada', phone='08000000000', amount=5000, payment_method='cash', payment_date=timezone.now(),
+            status='completed', **kwargs,
+        )
+
+    def sync(self, token=None):
+        return self.client.get('/api/sync/', {'since': token} if token else {}).json()
+
+    def test_first_sync_resets_and_issues_a_token(self):
+        payload = self.sync()
+
+        self.assertTrue(payload['reset'])
+        self.assertNotIn('tickets', payload)
+        self.assertFalse(self.sync(payload['token'])['reset'])
+
+    def test_deletes_come_back_as_tombstones(self):
+        token = self.sync()['token']
+        ticket_id, booking_id = str(self.ticket.pk), str(self.booking.pk)
+        booking_payment_id, ticket_payment_id = str(self.booking_payment.pk), str(self.ticket_payment.pk)
+
+        self.ticket.delete()
+        self.booking.delete()
+        self.ticket_payment.delete()
+        payload = self.sync(token)
+
+        self.assertFalse(payload['reset'])
+        self.assertEqual(payload['deleted']['tickets'], [ticket_id])
+        self.assertEqual(payload['deleted']['bookings'], [booking_id])
+        self.assertCountEqual(payload['deleted']['payments'], [booking_payment_id, ticket_payment_id])
+        self.assertNotIn(ticket_id, [row['id'] for row in payload['tickets']])
+        # The event's availability moved, so it is sent again
+        self.assertEqual([row['id'] for row in payload['events']], [str(self.event.pk)])
+
+    def test_deletes_before_the_token_are_not_repeated(self):
+        self.ticket.delete()
+        Tombstone.objects.update(deleted_at=timezone.now() - timedelta(minutes=5))
+
+        payload = self.sync(self.sync()['token'])
+
+        self.assertEqual(payload['deleted']['tickets'], [])
+
+    @override_settings(SYNC_TOMBSTONE_DAYS=30)
+    def test_token_older_than_the_tombstones_forces_a_reload(self):
+        stale = encode_token(timezone.now() - timedelta(days=31))
+
+        payload = self.sync(stale)
+
+        self.assertTrue(payload['reset'])
+        self.assertNotIn('deleted', payload)
+        self.assertFalse(self.sync(payload['token'])['reset'])
+
+    @override_settings(SYNC_TOMBSTONE_DAYS=30)
+    def test_prune_keeps_tombstones_a_valid_token_can_ask_for(self):
+        self.ticket.delete()
+        self.booking.delete()
+        Tombstone.objects.filter(model='ticket').update(deleted_at=timezone.now() - timedelta(days=31))
+
+        self.assertEqual(prune_tombstones(), 1)
+        self.assertFalse(Tombstone.objects.filter(model='ticket').exists())
+        self.assertTrue(Tombstone.objects.filter(model='booking').exists())
+
+    def test_bad_token_is_400(self):
+        self.assertEqual(self.client.get('/api/sync/', {'since': 'garbage'}).status_code, 400)
+
+
+class BookingQuoteTests(TestCase):
+    def test_quote_adds_delivery_tax_and_deposit(self):
+        self.assertEqual(quote('palmwine', 50, 12), {
+            'subtotal': Decimal('750000.00'),
+            'delivery_cost': Decimal('6000.00'),
+            'tax': Decimal('56250.00'),
+            'total': Decimal('812250.00'),
+            'deposit_required': Decimal('406125.00'),
+        })
+
+    def test_delivery_is_free_up_to_ten_km(self):
+        self.assertEqual(quote('palmwine', 50, 10)['delivery_cost'], Decimal('0.00'))
+        self.assertEqual(quote('palmwine', 50, 11)['delivery_cost'], Decimal('5500.00'))
+
+    @mock.patch.dict(PACKAGE_RATES, {'sample': Decimal('0.60')})
+    def test_amounts_round_half_up_to_kobo(self):
+        pricing = quote('sample', 1)
+
+        # 0.045 VAT and a 0.325 deposit would round down under banker's rounding
+        self.assertEqual(pricing['tax'], Decimal('0.05'))
+        self.assertEqual(pricing['total'], Decimal('0.65'))
+        self.assertEqual(pricing['deposit_required'], Decimal('0.33'))
+
+    def test_matrix_cells_match_single_quotes(self):
+        matrix = quote_matrix(['palmwine', 'full'], [10, 75], [0, 25])
+
+        self.assertEqual(len(matrix['package']), 8)
+        for i, (package, guests, distance) in enumerate(zip(matrix['package'], matrix['guests'], matrix['distance_km'])):
+            expected = quote(package, guests, distance)
+            self.assertEqual({field: matrix[field][i] for field in QUOTE_FIELDS}, expected)
+
+    def test_bad_input_is_rejected(self):
+        for args in (('caviar', 50), ('palmwine', -1), ('palmwine', 'many'), ('palmwine', 50, -5)):
+            with self.subTest(args=args), self.assertRaises(ValueError):
+                quote(*args)
+
+    def test_matrix_api(self):
+        response = self.client.get('/api/booking-quote/matrix/', {'packages': 'palmwine', 'guests': '50,100', 'distances': '12'})
+
+        body = response.json()
+        self.assertEqual(body['count'], 2)
+        self.assertEqual(body['columns']['guests'], [50, 100])
+        self.assertEqual(body['columns']['total'], [812250.0, 1618500.0])
+        self.assertEqual(self.client.get('/api/booking-quote/matrix/').status_code, 400)
+        self.assertEqual(self.client.get('/api/booking-quote/matrix/', {'guests': '50', 'packages': 'caviar'}).status_code, 400)
+        self.assertFalse(Booking.objects.exists())
+
+    def post_quote(self, **kwargs):
+        fields = json.loads(booking_payload(None, timezone.localdate() + timedelta(days=30), distance_km=12))
+        fields.update(kwargs)
+        return self.client.post('/api/booking-quote/', json.dumps(fields), content_type='application/json')
+
+    def test_quote_without_accept_creates_no_booking(self):
+        body = self.post_quote().json()
+
+        self.assertFalse(body['accepted'])
+        self.assertEqual(body['pricing']['total'], 812250.0)
+        self.assertNotIn('booking_id', body)
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(self.post_quote(accept=False).json()['accepted'])
+        self.assertFalse(Booking.objects.exists())
+
+    def test_accepted_quote_is_stored_as_a_pending_booking(self):
+        body = self.post_quote(accept=True).json()
+
+        booking = Booking.objects.get(pk=body['booking_id'])
+        self.assertTrue(body['accepted'])
+        self.assertEqual(booking.quote_id, body['quote_id'])
+        self.assertEqual(booking.status, 'pending')
+        self.assertEqual(booking.total, Decimal('812250.00'))
+        self.assertEqual(booking.deposit_required, Decimal('406125.00'))
+
+
+class ListingCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.event = make_event(max_capacity=100)
+        self.clock = mock.patch('pw_website.listing_cache.time').start()
+        self.clock.time.return_value = 1000.0
+        self.addCleanup(mock.patch.stopall)
+
+    def events_page(self):
+        return self.client.get('/events/').content.decode()
+
+    @override_settings(EVENT_LISTING_INVENTORY_TTL=60)
+    def test_admissions_show_up_within_the_inventory_ttl(self):
+        self.assertIn('100 tickets remaining', self.events_page())
+
+        make_ticket(self.event, 'PMF-LIST-1', verified=True)
+        self.assertIn('99 tickets remaining', self.events_page())
+
+        # A second sale inside the TTL is served from the cache...
+        self.clock.time.return_value = 1010.0
+        make_ticket(self.event, 'PMF-LIST-2', verified=True)
+        self.assertIn('99 tickets remaining', self.events_page())
+
+        # ...and shows up once the TTL has passed
+        self.clock.time.return_value = 1061.0
+        self.assertIn('98 tickets remaining', self.events_page())
+
+    @override_settings(EVENT_LISTING_INVENTORY_TTL=60)
+    def test_ticket_delete_invalidates_the_listing(self):
+        ticket = make_ticket(self.event, 'PMF-LIST-1', verified=True)
+        self.assertIn('99 tickets remaining', self.events_page())
+
+        self.clock.time.return_value = 1061.0
+        ticket.delete()
+
+        self.assertIn('100 tickets remaining', self.events_page())
+
+    @override_settings(EVENT_LISTING_INVENTORY_TTL=60)
+    def test_event_edits_show_up_at_once(self):
+        self.assertIn('Bush Party', self.events_page())
+
+        self.event.name = 'Palm Wine Night'
+        self.event.save()
+        page = self.events_page()
+
+        self.assertIn('Palm Wine Night', page)
+        self.assertIn('Palm Wine Night', self.client.get('/').content.decode())
+
+
+class ConditionalListTests(TestCase):
+    def setUp(self):
+        self.event = make_event()
+        self.ticket = make_ticket(self.event, 'PMF-ETAG-1')
+        make_booking('PMF-Q-ETAG', timezone.localdate() + timedelta(days=30))
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_matching_etag_is_304(self):
+        for url in ('/api/tickets/', '/api/bookings/', '/api/events/'):
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                self.assertEqual(first.status_code, 200)
+                self.assertEqual(first['Cache-Control'], 'private, no-cache')
+
+                again = self.revalidate(url, first['ETag'])
+
+                self.assertEqual(again.status_code, 304)
+                self.assertEqual(again.content, b'')
+                self.assertEqual(again['ETag'], first['ETag'])
+
+    def test_if_modified_since_is_304(self):
+        first = self.client.get('/api/tickets/')
+
+        again = self.client.get('/api/tickets/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+
+        self.assertEqual(again.status_code, 304)
+
+    def test_edits_and_deletes_change_the_etag(self):
+        etag = self.client.get('/api/tickets/')['ETag']
+
+        self.ticket.customer_name = 'Bola'
+        self.ticket.save()
+        edited = self.revalidate('/api/tickets/', etag)
+        self.assertEqual(edited.status_code, 200)
+        self.assertEqual(edited.json()['results'][0]['customer_name'], 'Bola')
+
+        make_booking('PMF-Q-ETAG-2', timezone.localdate() + timedelta(days=31))
+        etag = self.client.get('/api/bookings/')['ETag']
+        # Deleting the older booking leaves no newer updated_at behind; the count still moves
+        Booking.objects.filter(quote_id='PMF-Q-ETAG').delete()
+        self.assertEqual(self.revalidate('/api/bookings/', etag).status_code, 200)
+
+    def test_event_edit_changes_the_ticket_list_etag(self):
+        etag = self.client.get('/api/tickets/')['ETag']
+
+        self.event.name = 'Palm Wine Night'
+        self.event.save()
+
+        self.assertEqual(self.revalidate('/api/tickets/', etag).status_code, 200)
+
+
+class ListFieldsTests(TestCase):
+    def setUp(self):
+        self.event = make_event()
+        make_ticket(self.event, 'PMF-COL-1', verified=True)
+        make_ticket(self.event, 'PMF-COL-2')
+        make_booking('PMF-Q-COL', timezone.localdate() + timedelta(days=30))
+
+    def test_unknown_field_is_400(self):
+        for url in ('/api/tickets/', '/api/bookings/', '/api/events/'):
+            with self.subTest(url=url):
+                response = self.client.get(url, {'fields': 'id,secret'})
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('Unknown field(s): secret', response.json()['message'])
+
+    def test_fields_picks_a_subset_in_spec_order(self):
+        full = self.client.get('/api/tickets/', {'all': '1'}).json()
+
+        rows = self.client.get('/api/tickets/', {'all': '1', 'fields': 'verified, ticket_id'}).json()
+
+        self.assertEqual([list(row) for row in rows], [['ticket_id', 'verified']] * 2)
+        self.assertEqual(rows, [{'ticket_id': row['ticket_id'], 'verified': row['verified']} for row in full])
+
+    def test_columnar_format(self):
+        full = self.client.get('/api/events/').json()
+
+        columns = self.client.get('/api/events/', {'format': 'columnar', 'fields': 'id,tickets_available'}).json()
+
+        self.assertEqual(columns, {
+            'id': [row['id'] for row in full],
+            'tickets_available': [row['tickets_available'] for row in full],
+        })
+        self.assertEqual(columns['tickets_available'], [99])
+
+    def test_columnar_pages_keep_the_cursor(self):
+        page = self.client.get('/api/tickets/', {'format': 'columnar', 'fields': 'ticket_id', 'limit': 1}).json()
+
+        self.assertEqual(len(page['results']['ticket_id']), 1)
+        self.assertIsNotNone(page['next'])
+
+
+class DashboardSummaryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_user('staff', password='secret'))
+        self.party = make_event()
+        self.gala = make_event(name='Gala', date=timezone.now() - timedelta(days=1))
+        make_ticket(self.party, 'PMF-SUM-1', quantity=2, amount_paid=10000)
+        make_ticket(self.party, 'PMF-SUM-2', customer_name='', amount_paid=0)
+        make_ticket(self.party, 'PMF-SUM-3').delete()
+        moved = make_ticket(self.party, 'PMF-SUM-4', quantity=3, amount_paid=15000)
+        moved.event = self.gala
+        moved.save()
+        make_ticket(self.gala, 'PMF-SUM-5', amount_paid=7500)
+        Ticket.objects.filter(ticket_id__in=['PMF-SUM-1', 'PMF-SUM-5']).check_in()
+
+    def expected_event_figures(self, tickets):
+        sold = ~Q(customer_name='')
+        figures = tickets.aggregate(
+            tickets_issued=Sum('quantity'),
+            tickets_sold=Sum('quantity', filter=sold),
+            tickets_verified=Sum('quantity', filter=Q(verified=True)),
+            revenue=Sum('amount_paid', filter=sold),
+        )
+        figures['revenue'] = float(figures['revenue'])
+        return figures
+
+    def test_totals_match_the_ticket_rows(self):
+        summary = self.client.get('/api/dashboard/summary/').json()
+
+        expected = self.expected_event_figures(Ticket.objects.all())
+        expected['ticket_revenue'] = expected.pop('revenue')
+        events = summary['events']
+        self.assertEqual({name: events[name] for name in expected}, expected)
+        self.assertEqual((events['total'], events['upcoming']), (2, 1))
+        self.assertEqual(summary['tickets'], Ticket.objects.aggregate(
+            total=Count('id'),
+            sold=Count('id', filter=~Q(customer_name='')),
+            unsold=Count('id', filter=Q(customer_name='')),
+            verified=Count('id', filter=Q(verified=True)),
+        ))
+
+    def test_per_event_figures_match_the_ticket_rows(self):
+        per_event = {row['id']: row for row in self.client.get('/api/dashboard/summary/').json()['per_event']}
+
+        for event in (self.party, self.gala):
+            with self.subTest(event=event.name):
+                expected = self.expected_event_figures(Ticket.objects.filter(event=event))
+                self.assertEqual({name: per_event[str(event.id)][name] for name in expected}, expected)
+
+    def test_summary_reads_each_table_once_and_is_cached(self):
+        with self.assertNumQueries(4):
+            build_summary()
+
+        first = self.client.get('/api/dashboard/summary/').json()
+        make_ticket(self.party, 'PMF-SUM-6')
+        self.assertEqual(self.client.get('/api/dashboard/summary/').json(), first)
+
+
+class DailySalesRollupTests(TestCase):
+    def setUp(self):
+        self.event = make_event()
+        self.other = make_event(name='Gala')
+        yesterday = timezone.now() - timedelta(days=1)
+        with mock.patch('django.utils.timezone.now', return_value=yesterday):
+            make_ticket(self.event, 'PMF-ROLL-OLD', quantity=2, ticket_type='vip', amount_paid=20000)
+
+    def rollup_rows(self):
+        # Moves, deletes and undone check-ins leave their old rows at zero; the backfill drops them
+        rows = DailySalesRollup.objects.exclude(tickets_sold=0, quantity_sold=0, revenue=0, checkins=0)
+        return list(rows.order_by('event_id', 'day', 'ticket_type').values_list(
+            'event_id', 'day', 'ticket_type', 'tickets_sold', 'quantity_sold', 'revenue', 'checkins'
+        ))
+
+    def assertRollupMatchesBackfill(self):
+        incremental = self.rollup_rows()
+        call_command('backfill_daily_sales_rollup', stdout=StringIO())
+        self.assertEqual(incremental, self.rollup_rows())
+        return incremental
+
+    def sell(self, code, **kwargs):
+        return self.client.post('/api/store-ticket/', json.dumps({
+            'code': code, 'ref': f'REF-{code}', 'customerName': 'Ada', 'amount': '5000', 'quantity': 1,
+            'event_id': str(self.event.id), **kwargs,
+        }), content_type='application/json')
+
+    def test_sale_and_check_in_match_the_backfill(self):
+        self.assertEqual(self.sell('PMF-ROLL-NEW').status_code, 200)
+        self.client.post('/api/verify-ticket/', json.dumps({'code': 'PMF-ROLL-OLD'}), content_type='application/json')
+
+        rows = self.assertRollupMatchesBackfill()
+
+        today, yesterday = timezone.localdate(), timezone.localdate() - timedelta(days=1)
+        self.assertEqual(
+            [(day, ticket_type, sold, checkins) for _, day, ticket_type, sold, _, _, checkins in rows],
+            [(yesterday, 'vip', 1, 0), (today, 'normal', 1, 0), (today, 'vip', 0, 2)],
+        )
+
+    def test_edits_moves_and_deletes_match_the_backfill(self):
+        ticket = make_ticket(self.event, 'PMF-ROLL-1', quantity=3)
+        make_ticket(self.event, 'PMF-ROLL-2').delete()
+        ticket.amount_paid = 4000
+        ticket.event = self.other
+        ticket.save()
+        Ticket.objects.filter(ticket_id__in=['PMF-ROLL-1', 'PMF-ROLL-OLD']).check_in()
+        Ticket.objects.filter(ticket_id='PMF-ROLL-OLD').reset_check_in()
+
+        self.assertRollupMatchesBackfill()
+
+    def test_backfill_can_rebuild_one_event(self):
+        make_ticket(self.other, 'PMF-ROLL-GALA')
+        DailySalesRollup.objects.update(revenue=0)
+
+        call_command('backfill_daily_sales_rollup', str(self.event.id), stdout=StringIO())
+
+        revenue = dict(DailySalesRollup.objects.values_list('event_id', 'revenue'))
+        self.assertEqual(revenue, {self.event.id: 20000, self.other.id: 0})
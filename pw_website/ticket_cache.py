@@ -0,0 +1,150 @@
+"""Two-tier cache for rendered ticket PDFs.
+
+Rendered PDFs are content-addressed: the key is a hash of the ``ticket_data``
+dict passed to ``generate_ticket_pdf``, so identical requests share one
+rendering. Entries live in a small in-process LRU backed by an on-disk store
+(so other workers and restarts benefit too), grouped per ticket code so a
+Ticket or Event save can drop every rendering of the affected tickets.
+The disk store is kept in bounds by ``prune_ticket_pdf_cache``, which drops
+renderings not used for TICKET_PDF_CACHE_MAX_AGE_DAYS and then the least
+recently used ones until it fits in TICKET_PDF_CACHE_MAX_MB.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .ticket_generator import generate_ticket_pdf
+
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+
+
+def _max_entries():
+    return getattr(settings, 'TICKET_PDF_CACHE_SIZE', 128)
+
+
+def _cache_dir():
+    return getattr(settings, 'TICKET_PDF_CACHE_DIR', None) or os.path.join(
+        tempfile.gettempdir(), 'pw_ticket_pdfs'
+    )
+
+
+def _code_dir(code):
+    # Ticket codes come from clients; hash them so they are always safe path parts
+    return os.path.join(_cache_dir(), hashlib.sha1(str(code).encode('utf-8')).hexdigest())
+
+
+def ticket_pdf_key(ticket_data):
+    """Return the content hash used as cache key and ETag for ``ticket_data``"""
+    raw = json.dumps(ticket_data, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _remember(code, key, pdf_bytes):
+    with _lock:
+        _memory[key] = (code, pdf_bytes)
+        _memory.move_to_end(key)
+        while len(_memory) > _max_entries():
+            _memory.popitem(last=False)
+
+
+def get_ticket_pdf(ticket_data):
+    """Return ``(pdf_bytes, key)`` for ``ticket_data``, rendering only on a miss"""
+    key = ticket_pdf_key(ticket_data)
+    code = ticket_data.get('code', '')
+
+    with _lock:
+        hit = _memory.get(key)
+        if hit is not None:
+            _memory.move_to_end(key)
+            return hit[1], key
+
+    path = os.path.join(_code_dir(code), f'{key}.pdf')
+    try:
+        with open(path, 'rb') as fh:
+            pdf_bytes = fh.read()
+        # Mark it used, so pruning removes the least recently used files first
+        os.utime(path)
+    except OSError:
+        pdf_bytes = None
+
+    if pdf_bytes is None:
+        pdf_bytes = generate_ticket_pdf(ticket_data).getvalue()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(pdf_bytes)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # Read-only or full disks only cost us the second tier
+            print(f"Ticket PDF cache write failed: {e}")
+
+    _remember(code, key, pdf_bytes)
+    return pdf_bytes, key
+
+
+def invalidate_tickets(codes):
+    """Drop every cached rendering for the given ticket codes"""
+    codes = set(codes)
+    if not codes:
+        return
+    with _lock:
+        for key in [k for k, (code, _) in _memory.items() if code in codes]:
+            del _memory[key]
+    for code in codes:
+        shutil.rmtree(_code_dir(code), ignore_errors=True)
+
+
+def prune_ticket_pdf_cache(now=None):
+    """Trim the on-disk store by age and then by total size; returns how many files went"""
+    now = now or time.time()
+    max_age = settings.TICKET_PDF_CACHE_MAX_AGE_DAYS * 86400
+    max_bytes = settings.TICKET_PDF_CACHE_MAX_MB * 1024 * 1024
+    files = []
+    removed = 0
+    for root, _, names in os.walk(_cache_dir()):
+        for name in names:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            # Temp files older than an hour were left behind by a failed write
+            stale = max_age if name.endswith('.pdf') else min(max_age, 3600)
+            if now - stat.st_mtime > stale:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+            elif name.endswith('.pdf'):
+                files.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            removed += 1
+            total -= size
+        except OSError:
+            pass
+
+    # Drop the per-code directories that are now empty
+    for root, dirs, _ in os.walk(_cache_dir(), topdown=False):
+        for name in dirs:
+            try:
+                os.rmdir(os.path.join(root, name))
+            except OSError:
+                pass
+    return removed
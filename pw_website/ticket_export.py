@@ -0,0 +1,165 @@
+"""Bulk ticket export: one multi-page PDF or a streamed ZIP of per-ticket PDFs.
+
+Both the staff endpoint and the ``export_event_tickets`` management command
+go through these generators. The ZIP is yielded ticket by ticket, so its
+memory stays flat for events with thousands of tickets. The single PDF is
+not: reportlab keeps every page until the document is saved, so its memory
+and the wait for the first byte grow with the ticket count, and the web
+endpoint refuses PDFs above TICKET_EXPORT_PDF_MAX_TICKETS. Web requests
+render in the worker handling them; only the management command, which runs
+in its own process, spreads ZIP renderings over a process pool.
+"""
+import os
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+
+from .ticket_payload import sign_ticket_payload
+from .ticket_generator import generate_tickets_pdf, render_ticket_pdf_bytes
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+def ticket_pdf_data(ticket):
+    """Build the ``generate_ticket_pdf`` payload for a stored Ticket"""
+    # Format event date
+    event_date = ''
+    if ticket.event and ticket.event.date:
+        try:
+            event_date = ticket.event.date.strftime("%A, %B %d, %Y • %I:%M %p")
+        except Exception:
+            event_date = str(ticket.event.date)
+
+    # Determine ticket type based on amount (>= 100,000 is Premium)
+    ticket_type = 'Premium' if (ticket.amount_paid or 0) >= 100000 else 'Regular'
+
+    return {
+        'code': ticket.ticket_id,
+        'reference': ticket.order_reference or 'N/A',
+        'customer_name': ticket.customer_name,
+        'quantity': ticket.quantity or 1,
+        'is_premium': (ticket.amount_paid or 0) >= 100000,
+        'ticket_type': ticket_type,
+        'amount': float(ticket.amount_paid) if ticket.amount_paid else 0,
+        'event': {
+            'name': ticket.event.name if ticket.event else 'Bush Party',
+            'date': event_date,
+            'location': ticket.event.location if ticket.event else 'Lagos beachfront'
+        },
+        'qr': sign_ticket_payload(ticket.ticket_id, ticket.event_id, ticket.quantity or 1),
+    }
+
+
+def filter_event_tickets(event, ticket_type=None, verified=None, sold_only=False, codes=None):
+    """Return the tickets of ``event`` matching the optional export filters"""
+    tickets = event.tickets.select_related('event').order_by('purchase_date', 'id')
+    if ticket_type:
+        tickets = tickets.filter(ticket_type=ticket_type)
+    if verified is not None:
+        tickets = tickets.filter(verified=verified)
+    if sold_only:
+        tickets = tickets.exclude(customer_name='')
+    if codes:
+        tickets = tickets.filter(ticket_id__in=codes)
+    return tickets
+
+
+def export_workers():
+    """Render processes for command-line ZIP exports (TICKET_EXPORT_WORKERS, 0 = one per CPU)"""
+    return getattr(settings, 'TICKET_EXPORT_WORKERS', 0) or os.cpu_count() or 1
+
+
+def _iter_ticket_data(tickets):
+    for ticket in tickets.iterator(chunk_size=500):
+        yield ticket_pdf_data(ticket)
+
+
+def _render_all(ticket_data_iter, workers):
+    """Yield ``(ticket_data, pdf_bytes)`` in order, rendering across a process pool
+
+    At most ``workers * 2`` renderings are in flight, so finished PDFs never
+    pile up faster than the consumer streams them out.
+    """
+    if workers <= 1:
+        for data in ticket_data_iter:
+            yield data, render_ticket_pdf_bytes(data)
+        return
+
+    try:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    except (OSError, NotImplementedError) as e:
+        # Some hosts (e.g. serverless runtimes) cannot fork worker processes
+        print(f"Ticket export falling back to in-process rendering: {e}")
+        yield from _render_all(ticket_data_iter, 1)
+        return
+
+    with executor:
+        pending = deque()
+        for data in ticket_data_iter:
+            pending.append((data, executor.submit(render_ticket_pdf_bytes, data)))
+            if len(pending) >= workers * 2:
+                done_data, future = pending.popleft()
+                yield done_data, future.result()
+        while pending:
+            done_data, future = pending.popleft()
+            yield done_data, future.result()
+
+
+class _ChunkSink:
+    """Write-only file object whose contents are drained by the caller"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_tickets_zip(tickets, workers=1):
+    """Yield a ZIP archive holding one PDF per ticket, chunk by chunk
+
+    ``workers`` above 1 starts a process pool for this export. Leave it at 1
+    inside web requests: every web worker would fork its own pool.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for data, pdf_bytes in _render_all(_iter_ticket_data(tickets), workers):
+            archive.writestr(f"ticket-{data['code']}.pdf", pdf_bytes)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+def iter_tickets_pdf(tickets):
+    """Yield one multi-page PDF holding every ticket, chunk by chunk
+
+    Nothing is yielded until every page is drawn: reportlab keeps the page
+    objects of a canvas in memory until ``save()``, which writes the file
+    to a temporary file that is then streamed out. Memory and time to the
+    first byte therefore grow with the number of tickets; use
+    ``iter_tickets_zip`` for large exports.
+    """
+    with tempfile.TemporaryFile() as output:
+        generate_tickets_pdf(_iter_ticket_data(tickets), output)
+        output.seek(0)
+        while True:
+            chunk = output.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
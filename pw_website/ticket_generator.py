@@ -1,6 +1,11 @@
 import os
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
 from io import BytesIO
-import qrcode
+from reportlab import rl_config
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import inch
@@ -12,6 +17,31 @@ from PIL import Image
 import barcode
 from barcode.writer import ImageWriter
 
+from .qr import dark_runs, qr_matrix, qr_png, ticket_qr_payload
+
+_streams_lock = threading.RLock()
+
+
+@contextmanager
+def _binary_streams():
+    """Write the streams of the documents built inside as raw Flate data.
+
+    ASCII85 wrapping is done in pure Python here and takes most of the time
+    of a single ticket, while inflating binary streams by a quarter.
+    reportlab only reads the process-wide ``rl_config.useA85`` flag, so it is
+    switched off while our document is built and saved and restored after.
+    Our own renderings take turns on the lock. A PDF built by other code in
+    another thread during that time is still valid, just larger.
+    """
+    with _streams_lock:
+        previous = rl_config.useA85
+        rl_config.useA85 = 0
+        try:
+            yield
+        finally:
+            rl_config.useA85 = previous
+
+
 def generate_barcode(code):
     """Generate Code128 barcode as PNG image"""
     code128 = barcode.get_barcode_class('code128')
@@ -21,73 +51,212 @@ def generate_barcode(code):
 
 def generate_qr_code(data):
     """Generate QR code as PNG image"""
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(data)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    
-    # Convert to bytes
-    img_byte_arr = BytesIO()
-    img.save(img_byte_arr, format='PNG')
-    img_byte_arr.seek(0)
-    return img_byte_arr.getvalue()
+    return qr_png(data)
 
-def generate_ticket_pdf(ticket_data):
-    """Generate a PDF ticket with barcode and QR code
-    
-    Args:
-        ticket_data (dict): Dictionary containing ticket information:
-            - code: Ticket code
-            - customer_name: Name of customer
-            - event: Dict containing event details (name, date, location)
-            - amount: Amount paid
-            - quantity: Number of tickets
-            - reference: Payment reference
-    
-    Returns:
-        BytesIO: PDF file as bytes
+def draw_qr_code(p, data, x, y, size):
+    """Draw a QR code as vector rectangles into a ``size`` square at (x, y)
+
+    Adjacent dark modules in a row are merged into one rectangle, which
+    keeps the content stream small without a PIL/PNG round trip.
     """
-    buffer = BytesIO()
-    
-    # Create the PDF object, using the BytesIO object as its "file."
-    p = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4  # Keep track of the usable dimensions
+    matrix = qr_matrix(data)
+    module = size / len(matrix)
+
+    p.saveState()
+    p.setFillColor(colors.black)
+    for row_index, row in enumerate(matrix):
+        row_y = y + size - (row_index + 1) * module
+        for start, length in dark_runs(row):
+            p.rect(x + start * module, row_y, length * module, module, stroke=0, fill=1)
+    p.restoreState()
+
 
-    # Register fonts if not already registered
+def draw_barcode(p, code, x, y, width, height):
+    """Draw a Code128 barcode as vector bars with the code printed underneath"""
+    code128 = barcode.get_barcode_class('code128')
+    quiet_zone = 10
+    bars = code128(code).build()[0]
+    module = width / (len(bars) + 2 * quiet_zone)
+    text_height = 10
+    font = _base_font()
+
+    p.saveState()
+    p.setFillColor(colors.black)
+    for start, length in dark_runs([bit == '1' for bit in bars]):
+        p.rect(x + (quiet_zone + start) * module, y + text_height,
+               length * module, height - text_height, stroke=0, fill=1)
+    p.setFont(font, 8)
+    p.drawCentredString(x + width / 2, y + 1, code)
+    p.restoreState()
+
+
+LOGO_PATH = os.path.join(os.path.dirname(__file__), '..', 'static', 'img', 'comp_logo.png')
+
+
+@lru_cache(maxsize=1)
+def _base_font():
+    """Resolve the base font once per process instead of on every ticket"""
     try:
         pdfmetrics.getFont('Helvetica')
-    except:
-        # If Helvetica isn't available, fall back to built-in fonts
+        return 'Helvetica'
+    except Exception:
+        # If Helvetica isn't available, fall back to a bundled TTF
         pdfmetrics.registerFont(TTFont('CustomFont', os.path.join(os.path.dirname(__file__), 'fonts', 'Arial.ttf')))
-        # Replace all Helvetica references with CustomFont
-        p._fontname = 'CustomFont'
-    
-    # Add company logo/header
-    logo_path = os.path.join(os.path.dirname(__file__), '..', 'static', 'img', 'comp_logo.png')
-    if os.path.exists(logo_path):
-        p.drawImage(logo_path, width/2 - 100, height - 150, width=200, preserveAspectRatio=True)
-    
-    # Title
-    p.setFont("Helvetica-Bold", 24)
-    p.drawCentredString(width/2, height - 100, "EVENT TICKET")
-    
-    # Event Details
-    p.setFont("Helvetica-Bold", 18)
-    p.drawString(50, height - 150, ticket_data['event']['name'])
-    
-    p.setFont("Helvetica", 14)
-    p.drawString(50, height - 170, f"Date: {ticket_data['event']['date']}")
-    p.drawString(50, height - 190, f"Location: {ticket_data['event']['location']}")
-    
+        return 'CustomFont'
+
+
+# The logo is drawn LOGO_WIDTH points wide; it is prepared at LOGO_DPI for print
+LOGO_WIDTH = 200
+LOGO_DPI = 300
+
+
+@lru_cache(maxsize=1)
+def _logo_jpeg():
+    """The logo flattened onto white, scaled to print size and JPEG-encoded, once per process.
+
+    reportlab copies JPEG data into the PDF as it is, so each ticket embeds
+    these bytes instead of re-compressing the full-size PNG, which used to
+    be most of the time spent on a single ticket.
+    """
+    if not os.path.exists(LOGO_PATH):
+        return None
+    with Image.open(LOGO_PATH) as source:
+        logo = source.convert('RGBA')
+    pixels = round(LOGO_WIDTH / 72 * LOGO_DPI)
+    if logo.width > pixels:
+        logo = logo.resize((pixels, round(logo.height * pixels / logo.width)), Image.LANCZOS)
+    # The logo sits on the white page, so flattening loses nothing and drops the soft mask
+    flat = Image.new('RGB', logo.size, 'white')
+    flat.paste(logo, mask=logo.getchannel('A'))
+    buffer = BytesIO()
+    flat.save(buffer, 'JPEG', quality=90)
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=1)
+def _logo_file():
+    """Path of the prepared logo written to a temporary file, once per process.
+
+    Given an image object, ``drawImage`` decodes it to RGB on every new
+    canvas just to name it; given a JPEG file it copies the bytes in as they
+    are, which leaves a single ticket with little background work.
+    """
+    data = _logo_jpeg()
+    if data is None:
+        return None
+    digest = hashlib.sha1(data).hexdigest()[:16]
+    path = os.path.join(tempfile.gettempdir(), f'pw-ticket-logo-{digest}.jpg')
+    if not os.path.exists(path):
+        partial = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(partial, 'wb') as fh:
+                fh.write(data)
+            os.replace(partial, path)
+        except OSError:
+            return None
+    return path
+
+
+def _logo_image():
+    """The logo for ``drawImage``: the prepared file, or the bytes when it can't be written"""
+    path = _logo_file()
+    if path is not None:
+        return path
+    data = _logo_jpeg()
+    return ImageReader(BytesIO(data)) if data else None
+
+
+class TicketTemplate:
+    """Static background shared by every ticket of one event.
+
+    Holds everything that does not depend on the ticket holder: the logo,
+    the title, the event block and the terms. It is drawn once per PDF
+    document as a form XObject and stamped onto each page with ``doForm``,
+    so multi-page documents embed the artwork a single time. reportlab forms
+    belong to one canvas, so a single-ticket document still draws the form;
+    what carries over between documents is the resolved font and the
+    prepared logo file (see ``_logo_file``), which keep that draw cheap.
+    """
+
+    def __init__(self, event_name, event_date, event_location):
+        self.event_name = event_name
+        self.event_date = event_date
+        self.event_location = event_location
+        digest = hashlib.sha1(
+            '\x1f'.join([event_name, event_date, event_location]).encode('utf-8')
+        ).hexdigest()[:16]
+        self.form_name = f'ticket_bg_{digest}'
+
+    def _draw(self, p):
+        width, height = A4
+        font = _base_font()
+        bold = f'{font}-Bold' if font == 'Helvetica' else font
+
+        # Add company logo/header
+        logo = _logo_image()
+        if logo is not None:
+            p.drawImage(logo, width/2 - LOGO_WIDTH/2, height - 150, width=LOGO_WIDTH, preserveAspectRatio=True)
+
+        # Title
+        p.setFont(bold, 24)
+        p.drawCentredString(width/2, height - 100, "EVENT TICKET")
+
+        # Event Details
+        p.setFont(bold, 18)
+        p.drawString(50, height - 150, self.event_name)
+
+        p.setFont(font, 14)
+        p.drawString(50, height - 170, f"Date: {self.event_date}")
+        p.drawString(50, height - 190, f"Location: {self.event_location}")
+
+        # Section heading for the holder details stamped per ticket
+        p.setFont(bold, 14)
+        p.drawString(50, height - 230, "TICKET HOLDER")
+
+        # Terms and conditions
+        p.setFont(font, 8)
+        p.drawString(50, 50, "Terms & Conditions:")
+        p.drawString(50, 40, "1. This ticket must be presented at the event entrance.")
+        p.drawString(50, 30, "2. The QR code will be scanned for verification.")
+        p.drawString(50, 20, "3. Not transferable. Valid only for the named ticket holder.")
+
+    def stamp(self, p):
+        """Draw the background onto the current page of canvas ``p``"""
+        if not p.hasForm(self.form_name):
+            p.beginForm(self.form_name)
+            self._draw(p)
+            p.endForm()
+        p.doForm(self.form_name)
+
+
+def get_ticket_template(event_name, event_date, event_location):
+    """Return the template for an event.
+
+    Its form name is derived from the rendered event fields, so tickets of
+    the same event share one form in a document and editing an Event's name,
+    date or location gives a new one.
+    """
+    return TicketTemplate(event_name, event_date, event_location)
+
+
+def draw_ticket_page(p, ticket_data, vector=True):
+    """Stamp the event template and the per-ticket fields onto the current page
+
+    With ``vector`` the QR code and barcode are drawn as rectangles directly
+    on the canvas; otherwise they are rasterised to PNG and embedded.
+    """
+    width, height = A4
+    font = _base_font()
+    bold = f'{font}-Bold' if font == 'Helvetica' else font
+
+    event = ticket_data['event']
+    template = get_ticket_template(
+        str(event['name']), str(event['date']), str(event['location'])
+    )
+    template.stamp(p)
+
     # Customer Details
-    p.setFont("Helvetica-Bold", 14)
-    p.drawString(50, height - 230, "TICKET HOLDER")
-    p.setFont("Helvetica", 12)
+    p.setFont(font, 12)
     p.drawString(50, height - 250, f"Name: {ticket_data['customer_name']}")
     # Ticket type: prefer explicit value if provided
     ticket_type = ticket_data.get('ticket_type')
@@ -96,38 +265,83 @@ def generate_ticket_pdf(ticket_data):
     p.drawString(50, height - 270, f"Ticket Type: {ticket_type}")
     p.drawString(50, height - 290, f"Quantity: {ticket_data['quantity']} {'tickets' if ticket_data['quantity'] > 1 else 'ticket'}")
     p.drawString(50, height - 310, f"Amount Paid: ₦{ticket_data['amount']:,.2f}")
-    
+
     # Generate and add QR code
-    qr_data = {
-        'code': ticket_data['code'],
-        'ref': ticket_data['reference'],
-        'quantity': ticket_data['quantity']
-    }
-    qr_image = generate_qr_code(str(qr_data))
-    qr_reader = ImageReader(BytesIO(qr_image))
-    p.drawImage(qr_reader, width - 200, height - 400, width=150, height=150)
-    
+    # Prefer the compact signed payload when the caller supplies one
+    qr_data = ticket_data.get('qr') or ticket_qr_payload(
+        ticket_data['code'], ticket_data['reference'], ticket_data['quantity']
+    )
+    if vector:
+        draw_qr_code(p, qr_data, width - 200, height - 400, 150)
+    else:
+        qr_image = generate_qr_code(qr_data)
+        qr_reader = ImageReader(BytesIO(qr_image))
+        p.drawImage(qr_reader, width - 200, height - 400, width=150, height=150)
+
     # Add barcode
-    barcode_image = generate_barcode(ticket_data['code'])
-    barcode_reader = ImageReader(BytesIO(barcode_image))
-    p.drawImage(barcode_reader, 50, height - 400, width=300, height=50)
-    
+    if vector:
+        draw_barcode(p, ticket_data['code'], 50, height - 400, 300, 50)
+    else:
+        barcode_image = generate_barcode(ticket_data['code'])
+        barcode_reader = ImageReader(BytesIO(barcode_image))
+        p.drawImage(barcode_reader, 50, height - 400, width=300, height=50)
+
     # Add ticket code
-    p.setFont("Helvetica-Bold", 12)
+    p.setFont(bold, 12)
     p.drawString(50, height - 420, f"Ticket Code: {ticket_data['code']}")
     p.drawString(50, height - 440, f"Reference: {ticket_data['reference']}")
+
+
+def generate_ticket_pdf(ticket_data, vector=True):
+    """Generate a PDF ticket with barcode and QR code
+    
+    Args:
+        ticket_data (dict): Dictionary containing ticket information:
+            - code: Ticket code
+            - customer_name: Name of customer
+            - event: Dict containing event details (name, date, location)
+            - amount: Amount paid
+            - quantity: Number of tickets
+            - reference: Payment reference
+            - qr: Optional string to encode in the QR code
+        vector (bool): Draw the QR code and barcode as vector shapes
+            instead of embedding rasterised PNG images
     
-    # Terms and conditions
-    p.setFont("Helvetica", 8)
-    p.drawString(50, 50, "Terms & Conditions:")
-    p.drawString(50, 40, "1. This ticket must be presented at the event entrance.")
-    p.drawString(50, 30, "2. The QR code will be scanned for verification.")
-    p.drawString(50, 20, "3. Not transferable. Valid only for the named ticket holder.")
+    Returns:
+        BytesIO: PDF file as bytes
+    """
+    buffer = BytesIO()
     
-    # Save the PDF
-    p.showPage()
-    p.save()
+    with _binary_streams():
+        # Create the PDF object, using the BytesIO object as its "file."
+        p = canvas.Canvas(buffer, pagesize=A4)
+        draw_ticket_page(p, ticket_data, vector=vector)
+
+        # Save the PDF
+        p.showPage()
+        p.save()
     
     # Move to the beginning of the BytesIO buffer
     buffer.seek(0)
     return buffer
+
+
+def render_ticket_pdf_bytes(ticket_data):
+    """Render one ticket and return the raw PDF bytes (process-pool friendly)"""
+    return generate_ticket_pdf(ticket_data).getvalue()
+
+
+def generate_tickets_pdf(ticket_data_list, output, vector=True):
+    """Render many tickets into one multi-page PDF written to ``output``
+
+    The event templates are embedded once per document and stamped on every
+    page, so the file grows by roughly the per-ticket fields only.
+    """
+    with _binary_streams():
+        p = canvas.Canvas(output, pagesize=A4)
+        for ticket_data in ticket_data_list:
+            draw_ticket_page(p, ticket_data, vector=vector)
+            p.showPage()
+        p.save()
+    return output
+
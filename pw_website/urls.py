@@ -7,22 +7,35 @@ app_name = 'pw_website'
 urlpatterns = [
     # API endpoints (put these first to avoid path conflicts)
     path('api/verify-ticket/', views.verify_ticket_api, name='verify_ticket_api'),
+    path('api/verify-ticket/batch/', views.verify_tickets_batch_api, name='verify_tickets_batch_api'),
     path('api/inquiry/', views.submit_inquiry, name='submit_inquiry'),
     path('api/booking-quote/', views.create_booking_quote, name='create_booking_quote'),
+    path('api/booking-quote/matrix/', views.booking_quote_matrix_api, name='booking_quote_matrix_api'),
+    path('api/availability/', views.availability_api, name='availability_api'),
     path('api/check-availability/', views.check_availability_api, name='check_availability_api'),
     path('api/download-ticket/<str:code>/', views.download_ticket, name='download_ticket'),
     path('api/verify-payment/', views.verify_paystack_payment, name='verify_paystack_payment'),
     path('api/send-ticket-email/', views.send_ticket_email, name='send_ticket_email'),
+    path('api/ticket-holds/', views.ticket_holds_api, name='ticket_holds_api'),
+    path('api/ticket-holds/<uuid:hold_id>/release/', views.ticket_hold_release_api, name='ticket_hold_release_api'),
     path('api/store-ticket/', views.store_ticket, name='store_ticket'),
     path('api/store-ticket', views.store_ticket, name='store_ticket_no_slash'),
     path('api/generate-ticket-pdf/', views.generate_ticket_pdf_api, name='generate_ticket_pdf'),
     path('api/event-stats/', views.event_stats_api, name='event_stats_api'),
     path('api/event-stats/<uuid:event_id>/', views.event_stats_api, name='event_specific_stats_api'),
+    path('api/reports/daily-sales/', views.daily_sales_api, name='daily_sales_api'),
     path('api/bookings/', views.bookings_api, name='bookings_api'),
     path('api/bookings/<uuid:booking_id>/', views.bookings_api, name='booking_detail_api'),
     path('api/bookings/<uuid:booking_id>/status/', views.update_booking_status, name='update_booking_status'),
     path('api/events/', views.events_api, name='events_api'),
     path('api/events/<uuid:event_id>/', views.events_api, name='event_detail_api'),
+    path('api/events/<uuid:event_id>/tickets/export/', views.export_event_tickets, name='export_event_tickets'),
+    path('api/events/<uuid:event_id>/gate-manifest/', views.gate_manifest_api, name='gate_manifest_api'),
+    path('api/events/<uuid:event_id>/gate-scans/', views.gate_scans_upload_api, name='gate_scans_upload_api'),
+    path('api/exports/<str:kind>.csv', views.export_csv, name='export_csv'),
+    path('api/dashboard/summary/', views.dashboard_summary_api, name='dashboard_summary_api'),
+    path('api/sync/', views.sync_api, name='sync_api'),
+    path('api/live/', views.live_updates_api, name='live_updates_api'),
     path('api/tickets/', views.tickets_api, name='tickets_api'),
     path('api/tickets/<uuid:ticket_id>/', views.tickets_api, name='ticket_detail_api'),
     path('api/tickets/create-batch/', views.tickets_create_batch_api, name='tickets_create_batch_api'),
@@ -1,62 +1,58 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.conf import settings
-from django.http import JsonResponse, HttpResponse, FileResponse
+from django.http import (
+    JsonResponse, HttpResponse, FileResponse, HttpResponseNotAllowed, HttpResponseNotModified, StreamingHttpResponse,
+)
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
 from django.core.paginator import Paginator
 from django.core.mail import EmailMessage
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.contrib.auth.decorators import login_required
+from django.db import models, transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, urlsafe_base64_decode, urlsafe_base64_encode
 from decimal import Decimal, InvalidOperation
-from .models import Event, Booking, Ticket, Payment, Inquiry
-from .ticket_generator import generate_ticket_pdf
+from .models import Event, Booking, Ticket, Payment, Inquiry, TicketHold, TicketInventory, DailySalesRollup, DayFullyBooked
+from .qr import qr_png
+from .ticket_payload import InvalidTicketPayload, resolve_scanned_code, sign_ticket_payload
+from .availability import day_availability, month_availability, parse_month
+from .pricing import PACKAGE_RATES, QUOTE_FIELDS, quote, quote_matrix
+from .csv_export import export_rows, iter_csv, parse_date
+from .dashboard_summary import dashboard_summary
+from .delta_sync import changes_since, decode_token
+from .live_updates import stream as live_stream
+from .list_fields import (
+    BOOKING_FIELDS, EVENT_FIELDS, TICKET_FIELDS, event_values, field_lookups, render_rows, requested_fields,
+)
+from .listing_cache import cached_listing, listing_stamp
+from .idempotency import idempotent
+from .gate_sync import build_manifest, manifest_version, reconcile_scans
+from .ticket_cache import get_ticket_pdf, ticket_pdf_key
+from .ticket_export import filter_event_tickets, iter_tickets_pdf, iter_tickets_zip, ticket_pdf_data
+from asgiref.sync import sync_to_async
+import hashlib
 import json
 import uuid
 from datetime import datetime
 import os
 import requests
-import qrcode
-from io import BytesIO
 
-def generate_qr_code(data):
-    """Generate a QR code for ticket data"""
-    try:
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        # Ensure data is a string and encode special characters
-        if isinstance(data, dict):
-            data = json.dumps(data)
-        qr.add_data(str(data))
-        qr.make(fit=True)
-        
-        # Create an image from the QR Code
-        qr_image = qr.make_image(fill_color="black", back_color="white")
-        
-        # Convert to bytes
-        buffer = BytesIO()
-        qr_image.save(buffer, format='PNG')
-        buffer.seek(0)
-        return buffer.getvalue()
-    except Exception as e:
-        print(f"Error generating QR code: {e}")
-        # Return a simple black square as fallback
-        from PIL import Image
-        fallback = Image.new('RGB', (200, 200), color='white')
-        buffer = BytesIO()
-        fallback.save(buffer, format='PNG')
-        buffer.seek(0)
-        return buffer.getvalue()
+
+def _upcoming_events():
+    return Event.objects.with_inventory().filter(is_active=True, date__gte=timezone.now())
 
 
 def home(request):
     """Homepage with featured events"""
-    featured_events = Event.objects.filter(is_active=True, date__gte=timezone.now())[:3]
+    stamp = listing_stamp()
+    featured_events = cached_listing('featured', stamp, lambda: list(_upcoming_events()[:3]))
     context = {
         'featured_events': featured_events,
+        'listing_stamp': stamp,
+        'listing_cache_ttl': settings.EVENT_LISTING_CACHE_TTL,
         'page_title': 'Home - Palmwine Merchants & Flames'
     }
     return render(request, 'index.html', context)
@@ -72,13 +68,16 @@ def about(request):
 
 def events(request):
     """Events listing page"""
-    events_list = Event.objects.filter(is_active=True, date__gte=timezone.now())
+    stamp = listing_stamp()
+    events_list = cached_listing('upcoming', stamp, lambda: list(_upcoming_events()))
     paginator = Paginator(events_list, 6)  # Show 6 events per page
     page_number = request.GET.get('page')
     events = paginator.get_page(page_number)
     
     context = {
         'events': events,
+        'listing_stamp': stamp,
+        'listing_cache_ttl': settings.EVENT_LISTING_CACHE_TTL,
         'page_title': 'Events - Palmwine Merchants & Flames',
         'paystack_public_key': settings.PAYSTACK_PUBLIC_KEY
     }
@@ -94,98 +93,6 @@ def booking(request):
     return render(request, 'booking.html', context)
 
 
-def check_availability(request):
-    """Check if a date is available for booking"""
-    if request.method == 'POST':
-        try:
-            data = json.loads(request.body)
-            event_date = data.get('event_date')
-            
-            if not event_date:
-                return JsonResponse({'available': False, 'message': 'Date is required'})
-            
-            # Convert string date to datetime object
-            requested_date = datetime.strptime(event_date, '%Y-%m-%d').date()
-            
-            # Check if date is in the past
-            if requested_date <= timezone.now().date():
-                return JsonResponse({
-                    'available': False, 
-                    'message': 'Please select a future date'
-                })
-            
-            # Check if we already have bookings for this date
-            existing_bookings = Booking.objects.filter(
-                event_date=requested_date,
-                status__in=['confirmed', 'pending']
-            ).count()
-            
-            # Limit to 2 bookings per day (you can adjust this)
-            max_bookings_per_day = 2
-            
-            if existing_bookings >= max_bookings_per_day:
-                return JsonResponse({
-                    'available': False,
-                    'message': f'We are currently busy for {requested_date.strftime("%B %d, %Y")}. Please try another day.'
-                })
-            
-            return JsonResponse({
-                'available': True,
-                'message': f'{requested_date.strftime("%B %d, %Y")} is available for booking!'
-            })
-            
-        except Exception as e:
-            return JsonResponse({'available': False, 'message': 'Error checking availability'})
-    
-    return JsonResponse({'available': False, 'message': 'Invalid request method'})
-
-
-def check_availability(request):
-    """Check if a date is available for booking"""
-    if request.method == 'POST':
-        try:
-            data = json.loads(request.body)
-            event_date = data.get('event_date')
-            
-            if not event_date:
-                return JsonResponse({'available': False, 'message': 'Date is required'})
-            
-            # Convert string date to datetime object
-            requested_date = datetime.strptime(event_date, '%Y-%m-%d').date()
-            
-            # Check if date is in the past
-            if requested_date <= timezone.now().date():
-                return JsonResponse({
-                    'available': False, 
-                    'message': 'Please select a future date'
-                })
-            
-            # Check if we already have bookings for this date
-            existing_bookings = Booking.objects.filter(
-                event_date=requested_date,
-                status__in=['confirmed', 'pending']
-            ).count()
-            
-            # Limit to 2 bookings per day (you can adjust this)
-            max_bookings_per_day = 2
-            
-            if existing_bookings >= max_bookings_per_day:
-                return JsonResponse({
-                    'available': False,
-                    'message': f'We are currently busy for {requested_date.strftime("%B %d, %Y")}. Please try another day.'
-                })
-            
-            return JsonResponse({
-                'available': True,
-                'message': f'{requested_date.strftime("%B %d, %Y")} is available for booking!'
-            })
-            
-        except Exception as e:
-            return JsonResponse({'available': False, 'message': 'Error checking availability'})
-    
-    return JsonResponse({'available': False, 'message': 'Invalid request method'})
-
-
 def contact(request):
     """Contact page"""
     context = {
@@ -201,7 +108,8 @@ def menu(request):
 def verify_tickets(request):
     """Ticket verification page"""
     context = {
-        'page_title': 'Verify Tickets - Palmwine Merchants & Flames'
+        'page_title': 'Verify Tickets - Palmwine Merchants & Flames',
+        'batch_verify_size': MAX_BATCH_VERIFY_CODES,
     }
     return render(request, 'verify.html', context)
 
@@ -214,7 +122,8 @@ def verify_ticket_page(request, code):
             'ticket': {
                 'code': ticket.ticket_id,
                 'customer_name': ticket.customer_name,
-                'event_name': ticket.event.name if ticket.event else 'Unknown Event',
+                'event_id': str(ticket.event_id) if ticket.event_id else None,
+        'event_name': ticket.event.name if ticket.event else 'Unknown Event',
                 'event_location': ticket.event.location if ticket.event else '',
                 'event_date': ticket.event.date.isoformat() if ticket.event else '',
                 'email': ticket.customer_email,
@@ -236,40 +145,26 @@ def download_ticket(request, code):
     try:
         ticket = get_object_or_404(Ticket, ticket_id=code)
         
-        # Format event date
-        event_date = ''
-        if ticket.event and ticket.event.date:
-            try:
-                event_date = ticket.event.date.strftime("%A, %B %d, %Y • %I:%M %p")
-            except Exception:
-                event_date = str(ticket.event.date)
-        
         # Prepare ticket data for PDF generation
-        # Determine ticket type based on amount (>= 100,000 is Premium)
-        ticket_type = 'Premium' if (ticket.amount_paid or 0) >= 100000 else 'Regular'
-
-        ticket_data = {
-            'code': ticket.ticket_id,
-            'reference': ticket.order_reference or 'N/A',
-            'customer_name': ticket.customer_name,
-            'quantity': ticket.quantity or 1,
-            'is_premium': (ticket.amount_paid or 0) >= 100000,
-            'ticket_type': ticket_type,
-            'amount': float(ticket.amount_paid) if ticket.amount_paid else 0,
-            'event': {
-                'name': ticket.event.name if ticket.event else 'Bush Party',
-                'date': event_date,
-                'location': ticket.event.location if ticket.event else 'Lagos beachfront'
-            }
-        }
+        ticket_data = ticket_pdf_data(ticket)
         
+        # Repeat downloads of an unchanged ticket skip rendering entirely
+        etag = f'"{ticket_pdf_key(ticket_data)}"'
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+
         try:
-            # Generate PDF
-            pdf_buffer = generate_ticket_pdf(ticket_data)
+            # Generate PDF (served from the PDF cache when already rendered)
+            pdf_bytes, _ = get_ticket_pdf(ticket_data)
             
             # Return PDF file
-            response = HttpResponse(pdf_buffer.read(), content_type='application/pdf')
+            response = HttpResponse(pdf_bytes, content_type='application/pdf')
             response['Content-Disposition'] = f'attachment; filename="ticket-{code}.pdf"'
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
             return response
             
         except Exception as pdf_error:
@@ -293,6 +188,139 @@ def download_ticket(request, code):
         }, status=500)
 
 
+@login_required(login_url='/login/')
+@require_http_methods(["GET"])
+def export_event_tickets(request, event_id):
+    """Stream every ticket of an event as one multi-page PDF or a ZIP of PDFs
+
+    A single PDF is built whole before it is sent, so it is limited to
+    TICKET_EXPORT_PDF_MAX_TICKETS tickets (400 beyond that); the ZIP streams
+    one ticket at a time and has no limit.
+
+    Query parameters:
+        format: "pdf" (default) or "zip"
+        ticket_type: only export this ticket type
+        verified: "true"/"false" to export only checked-in / pending tickets
+        sold: "true" to skip unsold inventory tickets
+        codes: comma-separated ticket codes to export
+    """
+    event = get_object_or_404(Event, id=event_id)
+    output_format = request.GET.get('format', 'pdf').lower()
+    if output_format not in ('pdf', 'zip'):
+        return JsonResponse({'success': False, 'message': 'format must be "pdf" or "zip"'}, status=400)
+
+    verified = request.GET.get('verified')
+    if verified is not None:
+        verified = verified.lower() in ('1', 'true', 'yes')
+    codes = [c.strip() for c in request.GET.get('codes', '').split(',') if c.strip()]
+
+    tickets = filter_event_tickets(
+        event,
+        ticket_type=request.GET.get('ticket_type') or None,
+        verified=verified,
+        sold_only=request.GET.get('sold', '').lower() in ('1', 'true', 'yes'),
+        codes=codes or None,
+    )
+
+    limit = settings.TICKET_EXPORT_PDF_MAX_TICKETS
+    if output_format == 'pdf' and tickets.count() > limit:
+        return JsonResponse({
+            'success': False,
+            'message': f'A single PDF is limited to {limit} tickets; export with format=zip instead',
+        }, status=400)
+
+    slug = f"tickets-{str(event.id)[:8]}"
+    if output_format == 'zip':
+        response = StreamingHttpResponse(iter_tickets_zip(tickets), content_type='application/zip')
+    else:
+        response = StreamingHttpResponse(iter_tickets_pdf(tickets), content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{slug}.{output_format}"'
+    return response
+
+
+@login_required(login_url='/login/')
+@require_http_methods(["GET"])
+def export_csv(request, kind):
+    """Stream tickets, payments or bookings as CSV for accounting
+
+    Query parameters:
+        event: event UUID (tickets and payments only)
+        from, to: inclusive YYYY-MM-DD range on the purchase, payment or event date
+        status: verified/unverified/sold/unsold for tickets, the record status otherwise
+    """
+    try:
+        rows = export_rows(
+            kind,
+            event_id=request.GET.get('event') or None,
+            date_from=parse_date(request.GET.get('from')),
+            date_to=parse_date(request.GET.get('to')),
+            status=request.GET.get('status') or None,
+        )
+    except (ValueError, ValidationError) as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+    response = StreamingHttpResponse(iter_csv(kind, rows), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{kind}-{timezone.now():%Y%m%d}.csv"'
+    return response
+
+
+@login_required(login_url='/login/')
+@require_http_methods(["GET"])
+def dashboard_summary_api(request):
+    """Headline dashboard figures and a per-event breakdown, cached for DASHBOARD_SUMMARY_TTL"""
+    response = JsonResponse(dashboard_summary())
+    response['Cache-Control'] = 'private, max-age=%d' % settings.DASHBOARD_SUMMARY_TTL
+    return response
+
+
+@login_required(login_url='/login/')
+@require_http_methods(["GET"])
+def sync_api(request):
+    """Dashboard delta sync: what changed or was deleted since ``?since=<token>``
+
+    Without ``since`` (or with a token older than SYNC_TOMBSTONE_DAYS) the answer
+    is just a fresh token and ``reset: true``; the client reloads its lists.
+    """
+    since = request.GET.get('since')
+    try:
+        since = decode_token(since) if since else None
+    except ValueError as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+    response = JsonResponse(changes_since(since))
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+async def live_updates_api(request):
+    """Server-Sent Events stream of ticket sales, check-ins and booking changes
+
+    ``?event=<uuid>`` narrows it to that event's ticket figures, which are
+    public like /api/event-stats/; the full stream is for signed-in staff.
+    Needs the ASGI server; under WSGI it answers 503 and pages keep polling.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'success': False, 'message': 'Live updates need the ASGI server'}, status=503)
+
+    event_id = request.GET.get('event')
+    if event_id:
+        try:
+            event_id = str(uuid.UUID(event_id))
+        except ValueError:
+            return JsonResponse({'success': False, 'message': 'Invalid event id'}, status=400)
+    elif not await sync_to_async(lambda: request.user.is_authenticated)():
+        return JsonResponse({'success': False, 'message': 'Authentication required'}, status=403)
+
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    last_seq = int(last_event_id) if last_event_id.isdigit() else None
+    response = StreamingHttpResponse(live_stream(last_seq, event_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx-style proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 # API Views for AJAX functionality
 
 @csrf_exempt
@@ -324,8 +352,6 @@ def submit_inquiry(request):
         }, status=400)
 
 
-from django.contrib.auth.decorators import login_required
-
 @login_required(login_url='/login/')
 def dashboard(request):
     """Unified management dashboard"""
@@ -340,62 +366,130 @@ def management(request):
     return redirect('pw_website:dashboard')
 
 
+def _list_validators(*querysets):
+    """ETag and Last-Modified for a list endpoint from each queryset's row count and newest updated_at.
+
+    Counting catches deletes, which leave no newer updated_at behind.
+    """
+    parts = []
+    last_modified = 0
+    for qs in querysets:
+        stats = qs.order_by().aggregate(count=models.Count('pk'), latest=models.Max('updated_at'))
+        latest = stats['latest'].timestamp() if stats['latest'] else 0
+        parts.append(f"{stats['count']}:{latest}")
+        last_modified = max(last_modified, int(latest))
+    etag = '"%s"' % hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:16]
+    return etag, last_modified
+
+
+def _not_modified(request, etag, last_modified):
+    """A 304 when the client's If-None-Match/If-Modified-Since still matches, else None"""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified or None)
+    if response is not None:
+        response['ETag'] = etag
+    return response
+
+
+def _with_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    # Let browsers keep the body but revalidate it on every poll
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 200
+
+
+def _encode_cursor(value, pk):
+    return urlsafe_base64_encode(f'{value.isoformat()}|{pk}'.encode('utf-8'))
+
+
+def _decode_cursor(cursor):
+    value, pk = urlsafe_base64_decode(cursor).decode('utf-8').split('|', 1)
+    return datetime.fromisoformat(value), uuid.UUID(pk)
+
+
+def _wants_full_list(request):
+    """Legacy clients can still ask for every row in one array with ?all=1"""
+    return request.GET.get('all') in ('1', 'true', 'yes')
+
+
+def _keyset_page(request, queryset, field):
+    """One page of a ``.values()`` queryset, newest first by ``(field, id)``, and the next cursor.
+
+    The values must include ``field`` and ``id``. Reads ``limit`` and ``cursor``
+    from the query string; raises ValueError when either is malformed.
+    """
+    limit = int(request.GET.get('limit') or DEFAULT_PAGE_LIMIT)
+    if limit < 1:
+        raise ValueError('limit must be at least 1')
+    limit = min(limit, MAX_PAGE_LIMIT)
+
+    queryset = queryset.order_by(f'-{field}', '-id')
+    cursor = request.GET.get('cursor')
+    if cursor:
+        value, pk = _decode_cursor(cursor)
+        queryset = queryset.filter(
+            models.Q(**{f'{field}__lt': value}) | models.Q(**{field: value, 'id__lt': pk})
+        )
+
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1][field], rows[-1]['id'])
+    return rows, next_cursor
+
+
 @csrf_exempt
 @require_http_methods(["GET", "POST", "PUT", "DELETE"])
+@idempotent
 def bookings_api(request, booking_id=None):
     """API endpoint for booking CRUD operations"""
     if request.method == "POST":
         try:
             data = json.loads(request.body)
             
-            # Calculate costs based on guests and package type
-            base_rates = {
-                'palmwine': 15000,
-                'cocktails': 25000,
-                'flame': 35000,
-                'full': 50000
-            }
-            
+            # Price the booking (see pricing.py)
             guests = int(data.get('guests', 50))
             package_type = data.get('package_type', 'palmwine')
+            distance_km = int(data.get('distance_km', 0))
+            pricing = quote(package_type, guests, distance_km)
             
-            # Calculate costs
-            base_cost = base_rates.get(package_type, 15000)
-            subtotal = base_cost * guests
-            tax = subtotal * 0.075  # 7.5% VAT
-            total = subtotal + tax
-            deposit_required = total * 0.5  # 50% deposit
-            
-            # Create booking
-            booking = Booking.objects.create(
-                quote_id=data.get('quote_id'),
-                client_name=data.get('client_name'),
-                phone=data.get('phone'),
-                email=data.get('email', ''),
-                event_type=data.get('event_type'),
-                event_date=datetime.strptime(data.get('event_date'), '%Y-%m-%d').date(),
-                venue=data.get('venue'),
-                guests=guests,
-                package_type=package_type,
-                subtotal=subtotal,
-                tax=tax,
-                total=total,
-                deposit_required=deposit_required,
-                status='confirmed'
-            )
-            
-            # Create payment record
-            payment = Payment.objects.create(
-                booking=booking,
-                payer_name=data.get('client_name'),
-                phone=data.get('phone'),
-                email=data.get('email', ''),
-                amount=data.get('payment_amount'),
-                payment_method='paystack',
-                transaction_reference=data.get('payment_reference'),
-                payment_date=timezone.now(),
-                status='completed'
-            )
+            # The booking takes its day's slot as it is inserted; the payment
+            # record goes in the same transaction
+            with transaction.atomic():
+                # Create booking
+                booking = Booking.objects.create(
+                    quote_id=data.get('quote_id'),
+                    client_name=data.get('client_name'),
+                    phone=data.get('phone'),
+                    email=data.get('email', ''),
+                    event_type=data.get('event_type'),
+                    event_date=datetime.strptime(data.get('event_date'), '%Y-%m-%d').date(),
+                    venue=data.get('venue'),
+                    guests=guests,
+                    package_type=package_type,
+                    distance_km=distance_km,
+                    status='confirmed',
+                    **pricing
+                )
+
+                # Create payment record
+                payment = Payment.objects.create(
+                    booking=booking,
+                    payer_name=data.get('client_name'),
+                    phone=data.get('phone'),
+                    email=data.get('email', ''),
+                    amount=data.get('payment_amount'),
+                    payment_method='paystack',
+                    transaction_reference=data.get('payment_reference'),
+                    payment_date=timezone.now(),
+                    status='completed'
+                )
             
             return JsonResponse({
                 'success': True,
@@ -404,6 +498,11 @@ def bookings_api(request, booking_id=None):
                 'status': booking.status
             })
             
+        except DayFullyBooked as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=409)
         except Exception as e:
             print('Error creating booking:', str(e))
             return JsonResponse({
@@ -435,27 +534,26 @@ def bookings_api(request, booking_id=None):
             }
             return JsonResponse(data)
         else:
-            bookings = Booking.objects.all().order_by('-created_at')
-            data = [{
-                'id': str(booking.id),
-                'quote_id': booking.quote_id,
-                'client_name': booking.client_name,
-                'phone': booking.phone,
-                'email': booking.email,
-                'event_type': booking.event_type,
-                'event_date': booking.event_date.isoformat(),
-                'venue': booking.venue,
-                'guests': booking.guests,
-                'package_type': booking.package_type,
-                'subtotal': float(booking.subtotal),
-                'delivery_cost': float(booking.delivery_cost),
-                'tax': float(booking.tax),
-                'total': float(booking.total),
-                'deposit_required': float(booking.deposit_required),
-                'status': booking.status,
-                'created_at': booking.created_at.isoformat()
-            } for booking in bookings]
-            return JsonResponse(data, safe=False)
+            etag, last_modified = _list_validators(Booking.objects.all())
+            not_modified = _not_modified(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+            try:
+                names = requested_fields(request, BOOKING_FIELDS)
+            except ValueError as e:
+                return JsonResponse({'success': False, 'message': str(e)}, status=400)
+            bookings = Booking.objects.values(*field_lookups(BOOKING_FIELDS, names, 'id', 'created_at'))
+            if _wants_full_list(request):
+                bookings, next_cursor = bookings.order_by('-created_at'), None
+            else:
+                try:
+                    bookings, next_cursor = _keyset_page(request, bookings, 'created_at')
+                except (TypeError, ValueError, UnicodeDecodeError):
+                    return JsonResponse({'success': False, 'message': 'Invalid limit or cursor'}, status=400)
+            data = render_rows(request, bookings, BOOKING_FIELDS, names)
+            if not _wants_full_list(request):
+                data = {'results': data, 'next': next_cursor}
+            return _with_validators(JsonResponse(data, safe=False), etag, last_modified)
     
     elif request.method == "PUT":
         try:
@@ -485,6 +583,11 @@ def bookings_api(request, booking_id=None):
                 'success': False,
                 'message': 'Booking not found'
             }, status=404)
+        except DayFullyBooked as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=409)
         except Exception as e:
             return JsonResponse({
                 'success': False,
@@ -530,36 +633,35 @@ def update_booking_status(request, booking_id):
             'booking_id': str(booking.id),
             'new_status': booking.status
         })
+    except DayFullyBooked as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=409)
     except Exception as e:
         return JsonResponse({'success': False, 'message': str(e)}, status=400)
 
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@idempotent
 def create_booking_quote(request):
-    """Generate booking quote"""
+    """Generate booking quote.
+
+    Pricing alone is returned until the client sends ``"accept": true``;
+    only then is the quote stored as a pending Booking.
+    """
     try:
         data = json.loads(request.body)
         
-        # Calculate pricing based on package and guests
-        base_rates = {
-            'palmwine': 15000,
-            'cocktails': 25000,
-            'flame': 35000,
-            'full': 50000
-        }
-        
         package_type = data.get('package_type', 'palmwine')
         guests = int(data.get('guests', 50))
         distance_km = int(data.get('distance_km', 0))
-        
-        # Calculate costs
-        base_cost = base_rates.get(package_type, 15000)
-        subtotal = base_cost * guests
-        delivery_cost = distance_km * 500 if distance_km > 10 else 0
-        tax = subtotal * 0.075  # 7.5% VAT
-        total = subtotal + delivery_cost + tax
-        deposit_required = total * 0.5  # 50% deposit
+        pricing = quote(package_type, guests, distance_km)
+        response = {
+            'success': True,
+            'accepted': bool(data.get('accept')),
+            'pricing': {field: float(amount) for field, amount in pricing.items()}
+        }
+        if not response['accepted']:
+            return JsonResponse(response)
         
         # Generate quote ID
         quote_id = f"PW{datetime.now().strftime('%Y%m%d')}{str(uuid.uuid4())[:6].upper()}"
@@ -576,26 +678,14 @@ def create_booking_quote(request):
             guests=guests,
             package_type=package_type,
             distance_km=distance_km,
-            subtotal=subtotal,
-            delivery_cost=delivery_cost,
-            tax=tax,
-            total=total,
-            deposit_required=deposit_required
+            **pricing
         )
         
-        return JsonResponse({
-            'success': True,
-            'quote_id': quote_id,
-            'pricing': {
-                'subtotal': float(subtotal),
-                'delivery_cost': float(delivery_cost),
-                'tax': float(tax),
-                'total': float(total),
-                'deposit_required': float(deposit_required)
-            },
-            'booking_id': str(booking.id)
-        })
+        response.update(quote_id=quote_id, booking_id=str(booking.id))
+        return JsonResponse(response)
         
+    except DayFullyBooked as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=409)
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -603,12 +693,41 @@ def create_booking_quote(request):
         }, status=400)
 
 
+def _query_list(request, name, default=None):
+    """Comma-separated ``?name=`` values, or ``default`` when absent"""
+    value = request.GET.get(name, '')
+    return [part.strip() for part in value.split(',') if part.strip()] or default
+
+
+@require_http_methods(["GET"])
+def booking_quote_matrix_api(request):
+    """Prices for every ``?packages=`` × ``?guests=`` × ``?distances=`` combination.
+
+    Packages default to all of them and distances to 0; guests is required.
+    Nothing is written, so it is safe for live price tables.
+    """
+    guests = _query_list(request, 'guests')
+    if not guests:
+        return JsonResponse({'success': False, 'message': 'guests is required'}, status=400)
+    try:
+        matrix = quote_matrix(
+            _query_list(request, 'packages', list(PACKAGE_RATES)),
+            guests,
+            _query_list(request, 'distances', [0]),
+        )
+    except ValueError as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+    for field in QUOTE_FIELDS:
+        matrix[field] = [float(amount) for amount in matrix[field]]
+    return JsonResponse({'success': True, 'count': len(matrix['package']), 'columns': matrix})
+
+
 @require_http_methods(["GET", "POST", "PUT", "DELETE"])
 def events_api(request, event_id=None):
     """API endpoint for event CRUD operations"""
     if request.method == "GET":
         if event_id:
-            event = get_object_or_404(Event, id=event_id)
+            event = get_object_or_404(Event.objects.with_inventory(), id=event_id)
             data = {
                 'id': str(event.id),
                 'name': event.name,
@@ -625,22 +744,20 @@ def events_api(request, event_id=None):
             }
             return JsonResponse(data)
         else:
-            events = Event.objects.all()
-            events_data = [{
-                'id': str(ev.id),
-                'name': ev.name,
-                'description': ev.description,
-                'event_type': ev.event_type,
-                'date': ev.date.isoformat(),
-                'location': ev.location,
-                'max_capacity': ev.max_capacity,
-                'tickets_available': ev.tickets_available,
-                # Backward-compatible "price" for the UI: lowest available ticket price
-                'min_ticket_price': float(ev.min_ticket_price),
-                'price_per_ticket': float(ev.min_ticket_price),
-                'featured_image': ev.featured_image.url if ev.featured_image else None
-            } for ev in events]
-            return JsonResponse(events_data, safe=False)
+            # Ticket changes move the availability and prices listed here
+            etag, last_modified = _list_validators(Event.objects.all(), Ticket.objects.all())
+            not_modified = _not_modified(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+            try:
+                names = requested_fields(request, EVENT_FIELDS)
+            except ValueError as e:
+                return JsonResponse({'success': False, 'message': str(e)}, status=400)
+            events = event_values(
+                Event.objects.order_by(*Event._meta.ordering), field_lookups(EVENT_FIELDS, names)
+            )
+            events_data = render_rows(request, events, EVENT_FIELDS, names)
+            return _with_validators(JsonResponse(events_data, safe=False), etag, last_modified)
     
     elif request.method == "POST":
         try:
@@ -756,7 +873,7 @@ def tickets_create_batch_api(request):
             }, status=400)
         
         # Check if there's enough capacity
-        current_tickets = event.tickets.aggregate(total=models.Sum('quantity'))['total'] or 0
+        current_tickets = event.issued_quantity
         if current_tickets + quantity > event.max_capacity:
             return JsonResponse({
                 'success': False,
@@ -767,14 +884,22 @@ def tickets_create_batch_api(request):
         ticket_id = f"{event.name[:3].upper()}-{ticket_type[:3].upper()}-{uuid.uuid4().hex[:8].upper()}"
         total_amount = Decimal(str(quantity)) * price
         
-        ticket = Ticket.objects.create(
-            ticket_id=ticket_id,
-            event=event,
-            ticket_type=ticket_type,
-            price_per_ticket=price,
-            quantity=quantity,  # Store the full quantity in one ticket record
-            amount_paid=total_amount  # Total amount paid for the batch
-        )
+        with transaction.atomic():
+            ticket = Ticket.objects.create(
+                ticket_id=ticket_id,
+                event=event,
+                ticket_type=ticket_type,
+                price_per_ticket=price,
+                quantity=quantity,  # Store the full quantity in one ticket record
+                amount_paid=total_amount  # Total amount paid for the batch
+            )
+            # Put the batch on sale
+            inventory, created = TicketInventory.objects.get_or_create(
+                event=event, ticket_type=ticket_type,
+                defaults={'price_per_ticket': price, 'total_quantity': quantity, 'remaining_quantity': quantity}
+            )
+            if not created:
+                inventory.add_stock(quantity)
         
         return JsonResponse({
             'success': True,
@@ -798,96 +923,76 @@ def tickets_create_batch_api(request):
 
 
 def check_availability_api(request):
-    """API endpoint to check if we're available for booking on a specific date"""
+    """Availability of one date: ``?date=YYYY-MM-DD`` or POST ``{"event_date": ...}``
+
+    Kept for older pages; answered from the cached month used by /api/availability/.
+    """
     if request.method == 'POST':
         try:
-            data = json.loads(request.body)
-            event_date = data.get('event_date')
-            
-            if not event_date:
-                return JsonResponse({'available': False, 'message': 'Date is required'})
-            
-            # Convert string date to datetime object
-            requested_date = datetime.strptime(event_date, '%Y-%m-%d').date()
-            
-            # Check if date is in the past
-            if requested_date <= timezone.now().date():
-                return JsonResponse({
-                    'available': False, 
-                    'message': 'Please select a future date'
-                })
-            
-            # Check if we already have bookings for this date
-            existing_bookings = Booking.objects.filter(
-                event_date=requested_date,
-                status__in=['confirmed', 'pending']
-            ).count()
-            
-            # Limit to 2 bookings per day (you can adjust this)
-            max_bookings_per_day = 2
-            
-            if existing_bookings >= max_bookings_per_day:
-                return JsonResponse({
-                    'available': False,
-                    'message': f'We are currently busy for {requested_date.strftime("%B %d, %Y")}. Please try another day.'
-                })
-            
-            return JsonResponse({
-                'available': True,
-                'message': f'{requested_date.strftime("%B %d, %Y")} is available for booking!'
-            })
-            
-        except Exception as e:
-            return JsonResponse({'available': False, 'message': 'Error checking availability'})
-    
+            date_str = json.loads(request.body).get('event_date')
+        except json.JSONDecodeError:
+            return JsonResponse({'available': False, 'message': 'Invalid JSON data'}, status=400)
+        if not date_str:
+            return JsonResponse({'available': False, 'message': 'Date is required'})
     elif request.method == "GET":
-        try:
-            date_str = request.GET.get('date')
-            if not date_str:
-                return JsonResponse({'available': True, 'message': 'No date specified'})
-            
-            check_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-            
-            # Check if there are confirmed bookings or events on that date
-            bookings_on_date = Booking.objects.filter(
-                event_date=check_date,
-                status__in=['confirmed', 'completed']
-            ).count()
-            
-            events_on_date = Event.objects.filter(
-                date__date=check_date,
-                is_active=True
-            ).count()
-            
-            # You can customize this logic - maybe allow multiple small events but not large ones
-            is_available = bookings_on_date == 0 and events_on_date == 0
-            
-            return JsonResponse({
-                'available': is_available,
-                'message': 'Available' if is_available else 'We are currently busy for that day. Please try another date.',
-                'bookings_count': bookings_on_date,
-                'events_count': events_on_date
-            })
-            
-        except ValueError:
-            return JsonResponse({
-                'available': False,
-                'message': 'Invalid date format. Use YYYY-MM-DD.'
-            }, status=400)
-        except Exception as e:
-            return JsonResponse({
-                'available': False,
-                'message': 'Error checking availability'
-            }, status=500)
+        date_str = request.GET.get('date')
+        if not date_str:
+            return JsonResponse({'available': True, 'message': 'No date specified'})
     else:
         return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
 
+    try:
+        requested_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return JsonResponse({
+            'available': False,
+            'message': 'Invalid date format. Use YYYY-MM-DD.'
+        }, status=400)
+    try:
+        available, message = day_availability(requested_date)
+    except ValueError as e:
+        return JsonResponse({'available': False, 'message': str(e)}, status=400)
+    return JsonResponse({'available': available, 'message': message})
+
+
+@require_http_methods(["GET"])
+def availability_api(request):
+    """Booking availability of every day in ``?month=YYYY-MM`` (the current month by default)"""
+    today = timezone.localdate()
+    try:
+        year, month = parse_month(request.GET['month']) if request.GET.get('month') else (today.year, today.month)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+    response = JsonResponse({'month': f'{year:04d}-{month:02d}', 'days': month_availability(year, month)})
+    response['Cache-Control'] = 'public, max-age=%d' % settings.AVAILABILITY_CACHE_TTL
+    return response
+
 
 def ticket_management(request):
     """Render the admin-like ticket management page."""
     return render(request, 'ticket_management.html')
 
 
+def _ticket_info(ticket):
+    """Serialize a checked-in ticket the way the gate scanners expect"""
+    return {
+        'code': ticket.ticket_id,
+        'customer_name': ticket.customer_name,
+        'event_id': str(ticket.event_id) if ticket.event_id else None,
+        'event_name': ticket.event.name if ticket.event else 'Unknown Event',
+        'event_location': ticket.event.location if ticket.event else '',
+        'event_date': ticket.event.date.isoformat() if ticket.event else '',
+        'email': ticket.customer_email,
+        'amount': float(ticket.amount_paid) if ticket.amount_paid else 0,
+        'purchase_date': ticket.purchase_date.isoformat() if ticket.purchase_date else '',
+        'verified_at': ticket.verified_at.isoformat() if ticket.verified_at else None,
+        'verified_by': ticket.verified_by,
+        # Prefer the stored quantity as the source of truth
+        'ticket_quantity': ticket.quantity or 1,
+        'order_reference': ticket.order_reference
+    }
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def verify_ticket_api(request):
@@ -899,13 +1004,15 @@ def verify_ticket_api(request):
         # Accept either 'ticket_id' or 'code' (used by frontend)
         ticket_id = data.get('ticket_id') or data.get('code') or data.get('qrData')
         
-        # If ticket_id is a string containing JSON, try to parse it
-        if isinstance(ticket_id, str) and '{' in ticket_id:
-            try:
-                json_data = json.loads(ticket_id)
-                ticket_id = json_data.get('code')
-            except json.JSONDecodeError:
-                pass
+        # Signed QR payloads are authenticated before touching the database
+        try:
+            ticket_id, signed_payload = resolve_scanned_code(ticket_id)
+        except InvalidTicketPayload as e:
+            return JsonResponse({
+                'success': False,
+                'valid': False,
+                'message': f'Invalid ticket QR code: {e}'
+            }, status=400)
                 
         print(f"DEBUG: Final ticket_id to verify: {ticket_id}")
         
@@ -917,95 +1024,57 @@ def verify_ticket_api(request):
             }, status=400)
         
         try:
-            ticket = Ticket.objects.get(ticket_id=ticket_id)
-            
-            # For debugging:
-            print(f"DEBUG: Current ticket state - verified: {ticket.verified}, verified_at: {ticket.verified_at}, verified_by: {ticket.verified_by}")
-            
-            # Prefer the stored quantity as the source of truth
-            total_tickets = ticket.quantity or 1
+            verified_by = request.user.username if request.user.is_authenticated else 'System'
+            tickets = Ticket.objects.filter(ticket_id=ticket_id)
             
             # Reset verification if requested
             reset_verification = data.get('reset_verification', False)
             
             if reset_verification:
                 # Reset verification status
-                ticket.verified = False
-                ticket.verified_at = None
-                ticket.verified_by = None
-                ticket.save()
+                if not tickets.exists():
+                    raise Ticket.DoesNotExist
+                tickets.reset_check_in()
                 return JsonResponse({
                     'success': True,
                     'message': 'Verification status reset successfully',
                     'ticket_info': {
-                        'code': ticket.ticket_id,
+                        'code': ticket_id,
                         'verified': False,
                         'verified_at': None
                     }
                 })
-                
-            # Check verification status
-            # Only consider a ticket verified if both verified=True AND verified_at has a value
-            if ticket.verified and ticket.verified_at:
+            
+            # Check in under the row lock with a conditional UPDATE, so when two
+            # gates scan the same code only one of them gets the check-in; the
+            # locked read is also the ticket we answer with
+            ticket, newly_verified = tickets.select_related('event').check_in_one(
+                verified_by, event_id=signed_payload.event_id if signed_payload else None
+            )
+            
+            if signed_payload and signed_payload.event_id and signed_payload.event_id != ticket.event_id:
+                return JsonResponse({
+                    'success': False,
+                    'valid': False,
+                    'message': 'Ticket QR code does not belong to this ticket\'s event'
+                }, status=400)
+            
+            if not newly_verified:
                 verification_time = ticket.verified_at.strftime('%Y-%m-%d %H:%M:%S')
                 return JsonResponse({
                     'success': True,
                     'valid': True,
                     'already_verified': True,
                     'message': f'Ticket was already verified on {verification_time} by {ticket.verified_by or "System"}',
-                    'ticket_info': {
-                        'code': ticket.ticket_id,
-                        'customer_name': ticket.customer_name,
-                        'event_name': ticket.event.name if ticket.event else 'Unknown Event',
-                        'event_location': ticket.event.location if ticket.event else '',
-                        'event_date': ticket.event.date.isoformat() if ticket.event else '',
-                        'email': ticket.customer_email,
-                        'amount': float(ticket.amount_paid) if ticket.amount_paid else 0,
-                        'purchase_date': ticket.purchase_date.isoformat() if ticket.purchase_date else '',
-                        'verified_at': ticket.verified_at.isoformat(),
-                        'verified_by': ticket.verified_by,
-                        'ticket_quantity': total_tickets,
-                        'order_reference': ticket.order_reference
-                    }
+                    'ticket_info': _ticket_info(ticket)
                 })
-                
-            # If we reach here, the ticket is not verified or has inconsistent state
-            # Fix any inconsistent state
-            if ticket.verified and not ticket.verified_at:
-                ticket.verified = False
-            elif not ticket.verified and ticket.verified_at:
-                ticket.verified_at = None
-                ticket.verified_by = None
-            ticket.save()
-            
-            # Set both verified flags and timestamps
-            ticket.verified = True
-            ticket.verified_at = timezone.now()
-            ticket.verified_by = request.user.username if request.user.is_authenticated else 'System'
-            ticket.save()
-            
-            # For debugging:
-            print(f"DEBUG: Updated ticket state - verified: {ticket.verified}, verified_at: {ticket.verified_at}, verified_by: {ticket.verified_by}")
             
             return JsonResponse({
                 'success': True,
                 'valid': True,
                 'already_verified': False,
                 'message': 'Ticket verified successfully',
-                'ticket_info': {
-                    'code': ticket.ticket_id,
-                    'customer_name': ticket.customer_name,
-                    'event_name': ticket.event.name if ticket.event else 'Unknown Event',
-                    'event_location': ticket.event.location if ticket.event else '',
-                    'event_date': ticket.event.date.isoformat() if ticket.event else '',
-                    'email': ticket.customer_email,
-                    'amount': float(ticket.amount_paid) if ticket.amount_paid else 0,
-                    'purchase_date': ticket.purchase_date.isoformat() if ticket.purchase_date else '',
-                    'verified_at': ticket.verified_at.isoformat(),
-                    'verified_by': ticket.verified_by,
-                    'ticket_quantity': total_tickets,
-                    'order_reference': ticket.order_reference
-                }
+                'ticket_info': _ticket_info(ticket)
             })
             
         except Ticket.DoesNotExist:
@@ -1030,6 +1099,175 @@ def verify_ticket_api(request):
         }, status=500)
 
 
+MAX_BATCH_VERIFY_CODES = 100
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def verify_tickets_batch_api(request):
+    """Verify a group of ticket codes in one request
+
+    Expected JSON payload: { "codes": ["PMF-...", "PW....", ...] }
+
+    All codes are resolved with a single query and checked in with a single
+    UPDATE inside one transaction. Each entry of ``results`` mirrors the
+    single-code response of verify_ticket_api.
+    """
+    try:
+        data = json.loads(request.body or b"{}")
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'message': 'Invalid JSON data'}, status=400)
+
+    raw_codes = data.get('codes')
+    if not isinstance(raw_codes, list) or not raw_codes:
+        return JsonResponse({'success': False, 'message': 'codes must be a non-empty list'}, status=400)
+    if len(raw_codes) > MAX_BATCH_VERIFY_CODES:
+        return JsonResponse({
+            'success': False,
+            'message': f'At most {MAX_BATCH_VERIFY_CODES} codes can be verified per request'
+        }, status=400)
+
+    verified_by = request.user.username if request.user.is_authenticated else 'System'
+    scans = []
+    for raw in raw_codes:
+        if not isinstance(raw, str):
+            scans.append((raw, None, None, 'Ticket code must be a string'))
+            continue
+        try:
+            code, payload = resolve_scanned_code(raw.strip())
+            if not isinstance(code, str):
+                code = None
+            scans.append((raw, code, payload, None))
+        except InvalidTicketPayload as e:
+            scans.append((raw, None, None, f'Invalid ticket QR code: {e}'))
+
+    with transaction.atomic():
+        tickets = {
+            t.ticket_id: t
+            for t in Ticket.objects.select_for_update(of=('self',)).select_related('event').filter(
+                ticket_id__in={code for _, code, _, _ in scans if code}
+            )
+        }
+        pending = {
+            t.pk for _, code, payload, _ in scans
+            if (t := tickets.get(code)) and not (t.verified and t.verified_at)
+            and not (payload and payload.event_id and payload.event_id != t.event_id)
+        }
+        now = timezone.now()
+        checked_in = Ticket.objects.filter(pk__in=pending).check_in(verified_by, at=now)
+        if checked_in != len(pending):
+            # Another gate got to some of these first (possible on databases
+            # without row locks); only rows carrying our timestamp are ours
+            pending = set(Ticket.objects.filter(
+                pk__in=pending, verified_at=now, verified_by=verified_by
+            ).values_list('pk', flat=True))
+            for ticket in tickets.values():
+                ticket.refresh_from_db(fields=['verified', 'verified_at', 'verified_by'])
+
+    results = []
+    for raw, code, payload, error in scans:
+        ticket = tickets.get(code)
+        if error or ticket is None:
+            results.append({
+                'code': code or raw,
+                'success': False,
+                'valid': False,
+                'message': error or f'Invalid ticket ID: {code or raw}'
+            })
+        elif payload and payload.event_id and payload.event_id != ticket.event_id:
+            results.append({
+                'code': code,
+                'success': False,
+                'valid': False,
+                'message': 'Ticket QR code does not belong to this ticket\'s event'
+            })
+        elif ticket.pk in pending:
+            # First occurrence in this batch admits the ticket; repeats are duplicates
+            pending.discard(ticket.pk)
+            ticket.verified, ticket.verified_at, ticket.verified_by = True, now, verified_by
+            results.append({
+                'code': code,
+                'success': True,
+                'valid': True,
+                'already_verified': False,
+                'message': 'Ticket verified successfully',
+                'ticket_info': _ticket_info(ticket)
+            })
+        else:
+            verification_time = ticket.verified_at.strftime('%Y-%m-%d %H:%M:%S')
+            results.append({
+                'code': code,
+                'success': True,
+                'valid': True,
+                'already_verified': True,
+                'message': f'Ticket was already verified on {verification_time} by {ticket.verified_by or "System"}',
+                'ticket_info': _ticket_info(ticket)
+            })
+
+    return JsonResponse({
+        'success': True,
+        'verified_count': sum(1 for r in results if r['valid'] and not r['already_verified']),
+        'results': results
+    })
+
+
+@login_required(login_url='/login/')
+@require_http_methods(["GET"])
+def gate_manifest_api(request, event_id):
+    """Download the offline verification manifest for one event
+
+    Scanners keep the manifest's ``version`` and send it back in
+    If-None-Match to skip the download when nothing changed.
+    """
+    event = get_object_or_404(Event, id=event_id)
+    version = manifest_version(event)
+    etag = f'"{version}"'
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    response = JsonResponse(build_manifest(event, version=version))
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@login_required(login_url='/login/')
+@require_http_methods(["POST"])
+def gate_scans_upload_api(request, event_id):
+    """Reconcile a batch of scans recorded offline by one gate device
+
+    Authenticated by the staff session, so uploads must also send the
+    ``csrftoken`` cookie's value in an X-CSRFToken header.
+
+    Expected JSON payload:
+    {
+        "device_id": "gate-2",
+        "scans": [{"code": "PW....", "scanned_at": "2026-01-10T21:14:03+01:00"}, ...]
+    }
+    """
+    event = get_object_or_404(Event, id=event_id)
+    try:
+        data = json.loads(request.body or b"{}")
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'message': 'Invalid JSON data'}, status=400)
+
+    scans = data.get('scans') if isinstance(data, dict) else None
+    if not isinstance(scans, list):
+        return JsonResponse({'success': False, 'message': 'scans must be a list'}, status=400)
+
+    device_id = data.get('device_id')
+    device_id = (device_id.strip() if isinstance(device_id, str) else '') or request.user.username
+    result = reconcile_scans(event, device_id, scans)
+    return JsonResponse({
+        'success': True,
+        'device_id': device_id,
+        'manifest_version': manifest_version(event),
+        **result,
+    })
+
+
 @csrf_exempt
 @require_http_methods(["GET", "POST", "PUT", "DELETE"])
 def tickets_api(request, ticket_id=None):
@@ -1060,27 +1298,27 @@ def tickets_api(request, ticket_id=None):
             }
             return JsonResponse(data)
         else:
-            # Get all tickets
-            tickets = Ticket.objects.select_related('event').order_by('-purchase_date')
-            data = [{
-                'id': str(t.id),
-                'ticket_id': t.ticket_id,
-                'event': {
-                    'id': str(t.event.id),
-                    'name': t.event.name,
-                    'date': t.event.date.isoformat(),
-                    'location': t.event.location,
-                } if t.event else None,
-                'ticket_type': t.ticket_type,
-                'price_per_ticket': float(t.price_per_ticket),
-                'quantity': t.quantity,
-                'customer_name': t.customer_name,
-                'customer_email': t.customer_email,
-                'verified': t.verified,
-                'purchased_at': t.purchase_date.isoformat(),
-                'verified_at': t.verified_at.isoformat() if t.verified_at else None,
-            } for t in tickets]
-            return JsonResponse(data, safe=False)
+            # Get all tickets; event details are embedded, so event edits count too
+            etag, last_modified = _list_validators(Ticket.objects.all(), Event.objects.all())
+            not_modified = _not_modified(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+            try:
+                names = requested_fields(request, TICKET_FIELDS)
+            except ValueError as e:
+                return JsonResponse({'success': False, 'message': str(e)}, status=400)
+            tickets = Ticket.objects.values(*field_lookups(TICKET_FIELDS, names, 'id', 'purchase_date'))
+            if _wants_full_list(request):
+                tickets, next_cursor = tickets.order_by('-purchase_date'), None
+            else:
+                try:
+                    tickets, next_cursor = _keyset_page(request, tickets, 'purchase_date')
+                except (TypeError, ValueError, UnicodeDecodeError):
+                    return JsonResponse({'success': False, 'message': 'Invalid limit or cursor'}, status=400)
+            data = render_rows(request, tickets, TICKET_FIELDS, names)
+            if not _wants_full_list(request):
+                data = {'results': data, 'next': next_cursor}
+            return _with_validators(JsonResponse(data, safe=False), etag, last_modified)
 
     elif request.method == 'POST':
         try:
@@ -1177,29 +1415,27 @@ def event_stats_api(request, event_id=None):
     """API endpoint for event statistics"""
     try:
         if event_id:
-            # Get stats for specific event
+            # Get stats for specific event from its ticket counters
             event = get_object_or_404(Event, id=event_id)
-            total_tickets = Ticket.objects.filter(event=event).count()
-            verified_tickets = Ticket.objects.filter(event=event, verified=True).count()
-            
             return JsonResponse({
                 'event_name': event.name,
                 'event_date': event.date.isoformat(),
-                'total_tickets': total_tickets,
-                'verified_tickets': verified_tickets,
-                'unverified_tickets': total_tickets - verified_tickets,
-                'verification_rate': round((verified_tickets / total_tickets * 100) if total_tickets > 0 else 0, 1)
+                **event.ticket_stats(),
             })
         else:
-            # Get overall stats
-            total_events = Event.objects.filter(is_active=True).count()
-            upcoming_events = Event.objects.filter(is_active=True, date__gte=timezone.now()).count()
-            total_tickets = Ticket.objects.count()
-            verified_tickets = Ticket.objects.filter(verified=True).count()
+            # Get overall stats in one aggregate over the event counters
+            stats = Event.objects.aggregate(
+                total_events=models.Count('id', filter=models.Q(is_active=True)),
+                upcoming_events=models.Count('id', filter=models.Q(is_active=True, date__gte=timezone.now())),
+                total_tickets=models.Sum('issued_quantity'),
+                verified_tickets=models.Sum('verified_quantity'),
+            )
+            total_tickets = stats['total_tickets'] or 0
+            verified_tickets = stats['verified_tickets'] or 0
             
             return JsonResponse({
-                'total_events': total_events,
-                'upcoming_events': upcoming_events,
+                'total_events': stats['total_events'],
+                'upcoming_events': stats['upcoming_events'],
                 'total_tickets': total_tickets,
                 'verified_tickets': verified_tickets,
                 'verification_rate': round((verified_tickets / total_tickets * 100) if total_tickets > 0 else 0, 1)
@@ -1213,6 +1449,52 @@ def event_stats_api(request, event_id=None):
         }, status=500)
 
 
+@login_required(login_url='/login/')
+@require_http_methods(["GET"])
+def daily_sales_api(request):
+    """Ticket sales and check-ins per day from the daily sales rollup
+
+    Query parameters:
+        event: event UUID (all events by default)
+        from, to: inclusive YYYY-MM-DD range
+    """
+    rows = DailySalesRollup.objects.all()
+    try:
+        if request.GET.get('event'):
+            rows = rows.filter(event_id=uuid.UUID(request.GET['event']))
+        date_from = parse_date(request.GET.get('from'))
+        date_to = parse_date(request.GET.get('to'))
+    except ValueError as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+    if date_from:
+        rows = rows.filter(day__gte=date_from)
+    if date_to:
+        rows = rows.filter(day__lte=date_to)
+
+    rows = rows.values('day', 'ticket_type').annotate(
+        tickets_sold=models.Sum('tickets_sold'),
+        quantity_sold=models.Sum('quantity_sold'),
+        revenue=models.Sum('revenue'),
+        checkins=models.Sum('checkins'),
+    ).order_by('day', 'ticket_type')
+
+    metrics = ('tickets_sold', 'quantity_sold', 'revenue', 'checkins')
+    days = {}
+    totals = dict.fromkeys(metrics, 0)
+    for row in rows:
+        counts = {metric: row[metric] for metric in metrics}
+        counts['revenue'] = float(counts['revenue'])
+        day = days.setdefault(row['day'], {
+            'day': row['day'].isoformat(), **dict.fromkeys(metrics, 0), 'by_type': {},
+        })
+        day['by_type'][row['ticket_type']] = counts
+        for metric, value in counts.items():
+            day[metric] += value
+            totals[metric] += value
+
+    return JsonResponse({'days': list(days.values()), 'totals': totals})
+
+
 # ---- Payments ----
 
 @csrf_exempt
@@ -1300,37 +1582,17 @@ def send_ticket_email(request):
         ev_location = ev.get('location') or ''
         valid_until = data.get('validUntil') or ''
 
-        # Generate and attach the PDF ticket
-        ticket = get_object_or_404(Ticket, ticket_id=code)
-        event_date = ''
-        if ticket.event and ticket.event.date:
-            try:
-                event_date = ticket.event.date.strftime("%A, %B %d, %Y • %I:%M %p")
-            except Exception:
-                event_date = str(ticket.event.date)
+        # Generate and attach the PDF ticket; the same payload as download_ticket
+        # and the exports, so all three share one cached rendering
+        ticket = get_object_or_404(Ticket.objects.select_related('event'), ticket_id=code)
+        ticket_data = ticket_pdf_data(ticket)
 
-        ticket_data = {
-            'code': ticket.ticket_id,
-            'reference': ticket.order_reference or 'N/A',
-            'customer_name': ticket.customer_name,
-            'quantity': ticket.quantity or 1,
-            'is_premium': ticket.amount_paid >= 100000 if ticket.amount_paid else False,
-            'amount': float(ticket.amount_paid) if ticket.amount_paid else 0,
-            'event': {
-                'name': ticket.event.name if ticket.event else 'Bush Party',
-                'date': event_date,
-                'location': ticket.event.location if ticket.event else 'Lagos beachfront'
-            }
-        }
-
-        # Generate QR code
-        qr_data = {
-            'code': code,
-            'event': ev_name,
-            'date': ev_date,
-            'customer': name
-        }
-        qr_image = generate_qr_code(qr_data)
+        # Same QR payload as the PDF ticket, so both reuse one cached encoding
+        try:
+            qr_image = qr_png(ticket_data['qr'])
+        except Exception as qr_error:
+            print(f"Warning: Could not generate QR code: {qr_error}")
+            qr_image = None
 
         subject = f"Your Ticket for {ev_name}"
         # Format amount properly
@@ -1377,12 +1639,13 @@ def send_ticket_email(request):
         )
 
         # Attach the QR code
-        email.attach(f'ticket-qr-{code}.png', qr_image, 'image/png')
+        if qr_image:
+            email.attach(f'ticket-qr-{code}.png', qr_image, 'image/png')
 
         # Generate and attach the PDF ticket
         try:
-            pdf_buffer = generate_ticket_pdf(ticket_data)
-            email.attach(f'ticket-{code}.pdf', pdf_buffer.read(), 'application/pdf')
+            pdf_bytes, _ = get_ticket_pdf(ticket_data)
+            email.attach(f'ticket-{code}.pdf', pdf_bytes, 'application/pdf')
         except Exception as pdf_error:
             print(f"Warning: Could not attach PDF ticket: {pdf_error}")
 
@@ -1451,13 +1714,18 @@ def generate_ticket_pdf_api(request):
                 'location': data['event']['location']
             }
         }
+        # Sign the QR payload when the ticket has already been stored
+        stored_ticket = Ticket.objects.filter(ticket_id=ticket_data['code']).only('ticket_id', 'event_id', 'quantity').first()
+        if stored_ticket:
+            ticket_data['qr'] = sign_ticket_payload(stored_ticket.ticket_id, stored_ticket.event_id, stored_ticket.quantity or 1)
         
-        # Generate PDF
-        pdf_buffer = generate_ticket_pdf(ticket_data)
+        # Generate PDF (served from the PDF cache when already rendered)
+        pdf_bytes, key = get_ticket_pdf(ticket_data)
         
         # Return PDF file
-        response = HttpResponse(pdf_buffer.read(), content_type='application/pdf')
+        response = HttpResponse(pdf_bytes, content_type='application/pdf')
         response['Content-Disposition'] = f'attachment; filename="ticket-{ticket_data["code"]}.pdf"'
+        response['ETag'] = f'"{key}"'
         return response
         
     except Exception as e:
@@ -1467,8 +1735,120 @@ def generate_ticket_pdf_api(request):
         }, status=500)
 
 
+def _client_ip(request):
+    """The buyer's address; behind the hosting proxy it is the last X-Forwarded-For entry"""
+    forwarded = request.headers.get('X-Forwarded-For', '')
+    if forwarded:
+        return forwarded.split(',')[-1].strip()[:64]
+    return request.META.get('REMOTE_ADDR', '')
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
+def ticket_holds_api(request):
+    """Reserve tickets while the buyer completes payment.
+
+    Expected JSON: {"event_id": "...", "ticket_type": "regular", "quantity": 2}
+    The hold is released automatically after TICKET_HOLD_TTL seconds. One hold
+    takes at most TICKET_MAX_PER_ORDER tickets, and one address may keep
+    TICKET_HOLDS_PER_CLIENT holds open at a time (429 beyond that).
+    """
+    try:
+        data = json.loads(request.body or b"{}")
+        quantity = int(data.get('quantity') or 0)
+        if quantity < 1:
+            return JsonResponse({'success': False, 'message': 'Quantity must be at least 1'}, status=400)
+        if quantity > settings.TICKET_MAX_PER_ORDER:
+            return JsonResponse({
+                'success': False,
+                'message': f'At most {settings.TICKET_MAX_PER_ORDER} tickets can be bought in one order',
+            }, status=400)
+        try:
+            event = Event.objects.get(id=data.get('event_id'), is_active=True)
+        except (Event.DoesNotExist, ValidationError, ValueError):
+            return JsonResponse({'success': False, 'message': 'Event not found'}, status=404)
+
+        try:
+            inventory = TicketInventory.for_ticket_type(event, data.get('ticket_type'))
+        except TicketInventory.DoesNotExist as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=400)
+        if inventory is None:
+            # Events without per-type stock are checked against capacity at purchase
+            return JsonResponse({'success': True, 'hold': None})
+
+        client = _client_ip(request)
+        if TicketHold.objects.active().filter(client=client).count() >= settings.TICKET_HOLDS_PER_CLIENT:
+            return JsonResponse({
+                'success': False,
+                'message': 'Too many checkouts in progress. Please finish or close one and try again.',
+            }, status=429)
+
+        hold = inventory.hold(quantity, client=client)
+        if hold is None:
+            inventory.refresh_from_db(fields=['remaining_quantity'])
+            return JsonResponse({
+                'success': False,
+                'message': f'Only {inventory.remaining_quantity} {inventory.get_ticket_type_display()} tickets left',
+                'remaining': inventory.remaining_quantity,
+            }, status=409)
+
+        return JsonResponse({
+            'success': True,
+            'hold': {
+                'id': str(hold.id),
+                'ticket_type': inventory.ticket_type,
+                'quantity': hold.quantity,
+                'expires_at': hold.expires_at.isoformat(),
+            }
+        })
+    except (json.JSONDecodeError, AttributeError, TypeError, ValueError):
+        return JsonResponse({'success': False, 'message': 'Invalid request'}, status=400)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def ticket_hold_release_api(request, hold_id):
+    """Give held tickets back when the buyer closes the payment popup"""
+    released = TicketHold.objects.filter(pk=hold_id).release()
+    return JsonResponse({'success': True, 'released': bool(released)})
+
+
+def _claim_ticket_stock(event, ticket_type, quantity, hold_id=''):
+    """Take stock for a new sale, from the buyer's hold when they have one.
+
+    Returns ``(inventory, ok)``; ``inventory`` is None for events without
+    per-type stock. Raises TicketInventory.DoesNotExist when the event does
+    not sell ``ticket_type``. Must run inside the transaction that creates the
+    ticket.
+    """
+    hold = None
+    if hold_id:
+        try:
+            hold = TicketHold.objects.select_related('inventory').get(pk=hold_id, inventory__event=event)
+        except (TicketHold.DoesNotExist, ValidationError, ValueError):
+            hold = None
+    if hold and ticket_type and hold.inventory.ticket_type != ticket_type:
+        # A hold on another type can't pay for this one; it expires on its own
+        hold = None
+    if hold and hold.consume():
+        inventory = hold.inventory
+        extra = quantity - hold.quantity
+        if extra > 0:
+            return inventory, inventory.reserve(extra)
+        if extra < 0:
+            inventory.release(-extra)
+        return inventory, True
+
+    # No hold, or it expired and was swept: buy straight from the stock
+    inventory = TicketInventory.for_ticket_type(event, ticket_type)
+    if inventory is None:
+        return None, True
+    return inventory, inventory.reserve(quantity)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@idempotent
 def store_ticket(request):
     """Persist ticket/payment details when possible.
 
@@ -1586,16 +1966,53 @@ def store_ticket(request):
                         }
                     }, status=400)
             
-            # Create or update Ticket
-            ticket, created = Ticket.objects.get_or_create(ticket_id=code, defaults={
-                'event': event_obj,
-                'customer_name': name,
-                'customer_email': email,
-                'phone': phone,
-                'quantity': ticket_quantity,
-                'amount_paid': amount,
-                'order_reference': ref,
-            })
+            ticket_type = (d.get('ticket_type') or '').strip().lower()
+            hold_id = (d.get('hold') or d.get('hold_id') or '').strip()
+            sold_out = JsonResponse({
+                'success': False,
+                'message': 'Sorry, these tickets sold out before your payment completed. '
+                           f'Please contact support with your payment reference ({ref}) for a refund.',
+            }, status=409)
+
+            with transaction.atomic():
+                ticket = Ticket.objects.filter(ticket_id=code).first()
+                created = ticket is None
+                if created:
+                    # New sale: take the stock before writing the ticket
+                    try:
+                        inventory, ok = _claim_ticket_stock(event_obj, ticket_type, ticket_quantity, hold_id)
+                    except TicketInventory.DoesNotExist as e:
+                        transaction.set_rollback(True)
+                        return JsonResponse({
+                            'success': False,
+                            'message': f'{e}. Please contact support with your payment reference ({ref}) '
+                                       'for a refund.',
+                        }, status=400)
+                    if not ok:
+                        transaction.set_rollback(True)
+                        return sold_out
+                    ticket = Ticket(
+                        ticket_id=code,
+                        event=event_obj,
+                        customer_name=name,
+                        customer_email=email,
+                        phone=phone,
+                        quantity=ticket_quantity,
+                        amount_paid=amount,
+                        order_reference=ref,
+                    )
+                    if inventory is not None:
+                        ticket.ticket_type = inventory.ticket_type
+                        ticket.price_per_ticket = inventory.price_per_ticket
+                    elif ticket_type in dict(Ticket.TICKET_TYPES):
+                        ticket.ticket_type = ticket_type
+                    ticket.save()
+                    if inventory is None and Event.objects.filter(
+                        pk=event_obj.pk, sold_quantity__gt=models.F('max_capacity')
+                    ).exists():
+                        # Events without per-type stock are capped by max_capacity
+                        transaction.set_rollback(True)
+                        return sold_out
             if not created:
                 # Update fields if ticket already exists (idempotent writes)
                 ticket.event = ticket.event or event_obj
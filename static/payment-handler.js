@@ -336,6 +336,54 @@ function initializePaystack() {
     });
 }
 
+// Read the ticket types and quantity picked in the ticket modal
+function pmfSelectedTickets() {
+    let quantity = 0;
+    const types = [];
+    document.querySelectorAll('#tm-ticket-list input[data-price]').forEach(inp => {
+        const qty = Math.max(0, parseInt(inp.value || '0', 10) || 0);
+        if (!qty) return;
+        quantity += qty;
+        const type = inp.getAttribute('data-type') || '';
+        if (!types.includes(type)) types.push(type);
+    });
+    return { quantity, ticketType: types[0] || '', types };
+}
+
+// Hold the selected tickets while the Paystack popup is open
+async function pmfCreateTicketHold(eventId) {
+    const { quantity, ticketType } = pmfSelectedTickets();
+    if (!eventId || !quantity) return null;
+    let response;
+    let result;
+    try {
+        response = await fetch('/api/ticket-holds/', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', 'X-CSRFToken': getCookie('csrftoken') || '' },
+            body: JSON.stringify({ event_id: eventId, ticket_type: ticketType, quantity: quantity })
+        });
+        result = await response.json();
+    } catch (error) {
+        // The purchase is still checked against stock when the ticket is stored
+        console.warn('Could not hold tickets:', error);
+        return null;
+    }
+    if (response.status === 409) {
+        throw new Error(result.message || 'Sorry, these tickets are sold out.');
+    }
+    return result.success ? result.hold : null;
+}
+
+// Give held tickets back when the checkout is abandoned
+function pmfReleaseTicketHold(hold) {
+    if (!hold) return;
+    fetch(`/api/ticket-holds/${hold.id}/release/`, {
+        method: 'POST',
+        headers: { 'X-CSRFToken': getCookie('csrftoken') || '' },
+        keepalive: true
+    }).catch(() => {});
+}
+
 // Clean up payment state
 function resetPaymentState() {
     console.log('Resetting payment state');
@@ -409,7 +457,8 @@ async function handlePaymentSuccess(transaction, customerInfo, eventDetails) {
             // Keep fields for backend compatibility
             premiumTables: premiumQty,   // premium count (not tables)
             regularTickets: regularQty,
-            ticket_type: ticketType,
+            ticket_type: pmfSelectedTickets().ticketType || ticketType,
+            hold: customerInfo.holdId || undefined,
             event_id: eventDetails.id || eventDetails.name,
             event: {
                 name: eventDetails.name,
@@ -425,7 +474,9 @@ async function handlePaymentSuccess(transaction, customerInfo, eventDetails) {
             method: 'POST',
             headers: { 
                 'Content-Type': 'application/json',
-                'X-CSRFToken': getCookie('csrftoken') || ''
+                'X-CSRFToken': getCookie('csrftoken') || '',
+                // Retries of this save are answered once per payment
+                'Idempotency-Key': transaction.reference
             },
             body: JSON.stringify(ticketData)
         });
@@ -642,6 +693,7 @@ async function initializePaymentHandler() {
     // Add click handler
     btnPaystackCard.addEventListener('click', async function(e) {
         e.preventDefault();
+        let hold = null;
         
         if (isProcessing) {
             console.log('Payment already in progress');
@@ -672,12 +724,21 @@ async function initializePaymentHandler() {
                 throw new Error('Please select at least one ticket');
             }
 
+            // One order is stored as one ticket of one type (and held as one)
+            if (pmfSelectedTickets().types.length > 1) {
+                throw new Error('Please buy one ticket type per order');
+            }
+
             // Initialize Paystack
             const paystackReady = await initializePaystack();
             if (!paystackReady) {
                 throw new Error('Payment system is not ready. Please refresh the page.');
             }
 
+            // Reserve the tickets for the duration of the checkout
+            const eventId = window.__currentEventId || '';
+            hold = await pmfCreateTicketHold(eventId);
+
             // Show loading indicator
             const loading = document.createElement('div');
             loading.className = 'loading-indicator';
@@ -693,6 +754,7 @@ async function initializePaymentHandler() {
 
             // Get event details
             const eventDetails = {
+                id: eventId,
                 name: document.getElementById('tm-title')?.textContent || 'Event',
                 date: document.getElementById('tm-event-meta')?.textContent || '',
                 location: document.querySelector('[data-event-location]')?.getAttribute('data-event-location') || ''
@@ -720,13 +782,16 @@ async function initializePaymentHandler() {
             };
 
             // Add callbacks
+            let paid = false;
             paystackConfig.callback = function(response) {
+                paid = true;
                 resetPaymentState();
-                handlePaymentSuccess(response, { name, email, phone, amount }, eventDetails);
+                handlePaymentSuccess(response, { name, email, phone, amount, holdId: hold ? hold.id : '' }, eventDetails);
             };
 
             paystackConfig.onClose = function() {
                 console.log('Payment window closed');
+                if (!paid) pmfReleaseTicketHold(hold);
                 resetPaymentState();
             };
 
@@ -736,6 +801,7 @@ async function initializePaymentHandler() {
 
         } catch (error) {
             console.error('Payment error:', error);
+            pmfReleaseTicketHold(hold);
             if (window.showError) {
                 showError(error.message || 'Could not process payment. Please try again.', 'Payment Error');
             } else {
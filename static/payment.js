@@ -188,7 +188,9 @@ const PaymentHandler = {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
-                'X-CSRFToken': getCookie('csrftoken')
+                'X-CSRFToken': getCookie('csrftoken'),
+                // Retries of this save are answered once per payment
+                'Idempotency-Key': response.reference
             },
             body: JSON.stringify({
                 quote_id: metadata.quoteId,
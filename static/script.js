@@ -205,7 +205,7 @@ document.addEventListener('DOMContentLoaded', function(){
           <div class="tm-price">${naira(t.price || 0)}</div>
           <div class="tm-qty">
             <label class="sr-only" for="${id}">Quantity for ${t.label||'ticket'}</label>
-            <input id="${id}" type="number" min="0" step="1" value="0" data-price="${t.price||0}" />
+            <input id="${id}" type="number" min="0" step="1" value="0" data-price="${t.price||0}" data-type="${t.type||''}" />
           </div>`;
         listEl.appendChild(row);
       });
@@ -1762,9 +1762,12 @@ if (row && scroller && text){
   async function storeTicketInDatabase(ticketData) {
     console.log('Sending ticket data:', ticketData);
     try {
+      const headers = { 'Content-Type': 'application/json' };
+      // Retries of this save are answered once per payment
+      if (ticketData.ref) headers['Idempotency-Key'] = ticketData.ref;
       const response = await fetch('/api/store-ticket/', {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers,
         body: JSON.stringify(ticketData)
       });
       